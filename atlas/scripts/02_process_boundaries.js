@@ -157,7 +157,8 @@ async function processRegions() {
             name_local: props.name_local,
             type: props.type,
             region: props.region,
-            region_cod: props.region_cod
+            region_cod: props.region_cod,
+            geonunit: props.geonunit  // constituent country (England, Scotland...)
         })
     });
 }
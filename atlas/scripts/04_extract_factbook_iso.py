@@ -8,14 +8,20 @@ This version:
 - Uses FIPS to ISO mapping for correct country codes
 - Processes latest factbook.json data (updated weekly)
 - Handles nested text structures properly
+- Appends each extraction to the weekly history (factbook_history.py)
 """
 
 import os
-import json
 import sys
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from factbook_history import FactbookHistory
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "viewer"))
+
+import jsoncodec  # noqa: E402
+
 
 class FactbookExtractorISO:
     """Extract and process CIA World Factbook data with ISO codes"""
@@ -25,8 +31,8 @@ class FactbookExtractorISO:
         self.output_file = self.data_dir / "cia_factbook_2025_iso.json"
 
         # Load FIPS to ISO mapping
-        with open(mapping_file, 'r', encoding='utf-8') as f:
-            mapping_data = json.load(f)
+        with open(mapping_file, 'rb') as f:
+            mapping_data = jsoncodec.load(f)
 
         self.fips_to_iso = {}
         for entry in mapping_data:
@@ -75,8 +81,8 @@ class FactbookExtractorISO:
     def process_country_file(self, json_file: Path) -> Optional[Dict[str, Any]]:
         """Process a single country JSON file"""
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(json_file, 'rb') as f:
+                data = jsoncodec.load(f)
 
             fips_code = json_file.stem.upper()
 
@@ -294,8 +300,8 @@ class FactbookExtractorISO:
             'countries': all_countries
         }
 
-        with open(self.output_file, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        with open(self.output_file, 'wb') as f:
+            jsoncodec.dump(output_data, f, pretty=True)
 
         print("\n" + "="*60)
         print(f"✅ Processing complete!")
@@ -324,7 +330,16 @@ def main():
         return
 
     extractor = FactbookExtractorISO(data_dir, mapping_file)
-    extractor.process_all()
+    output_data = extractor.process_all()
+
+    # Keep this week's figures; the output file is overwritten next run
+    if output_data:
+        history = FactbookHistory(data_dir / "history")
+        week = history.append(output_data)
+        if week:
+            print(f"📊 Recorded {week} in history ({len(history)} weeks): {data_dir / 'history'}")
+        else:
+            print("⚠️  This week is already in history; kept the first extraction of the week")
 
 
 if __name__ == "__main__":
@@ -8,7 +8,6 @@ Requirements: pip3 install requests beautifulsoup4 lxml
 """
 
 import os
-import json
 import sys
 import time
 import re
@@ -23,6 +22,12 @@ except ImportError:
     print("   Install with: pip3 install requests beautifulsoup4 lxml")
     sys.exit(1)
 
+from name_index import MIN_ISO_CONFIDENCE, NameIndex
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "viewer"))
+
+import jsoncodec  # noqa: E402
+
 
 class FactbookScraper2025:
     """Scrape live CIA Factbook data (2025)"""
@@ -228,6 +233,35 @@ class FactbookScraper2025:
 
         return economy
 
+    def assign_iso_codes(self, countries: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+        """Add iso, iso_confidence and iso_match to each scraped country; returns {iso: slug}
+
+        Uses name_index.json from 17_build_name_index.py, trying both the
+        slug and the page name. iso is only set from MIN_ISO_CONFIDENCE up;
+        a less certain match is recorded as iso_guess instead.
+        """
+        index_file = self.output_dir / 'name_index.json'
+        if not index_file.exists():
+            print(f"⚠️  Name index not found: {index_file}")
+            print("   Run: python3 scripts/17_build_name_index.py (then re-run to add ISO codes)")
+            return {}
+
+        with open(index_file, 'rb') as f:
+            index = NameIndex.from_dict(jsoncodec.load(f))
+
+        iso_index = {}
+        for slug, data in countries.items():
+            matches = [m for m in (index.resolve(slug), index.resolve(data['name'])) if m]
+            best = max(matches, key=lambda m: m['confidence'], default=None)
+            confident = best is not None and best['confidence'] >= MIN_ISO_CONFIDENCE
+            data['iso'] = best['iso'] if confident else None
+            data['iso_guess'] = best['iso'] if best and not confident else None
+            data['iso_confidence'] = best['confidence'] if best else None
+            data['iso_match'] = best['match'] if best else None
+            if confident:
+                iso_index.setdefault(best['iso'], slug)
+        return iso_index
+
     def scrape_all(self, limit: Optional[int] = None) -> Dict[str, Any]:
         """Scrape all countries"""
         print("\n" + "="*60)
@@ -264,19 +298,23 @@ class FactbookScraper2025:
             if i < total:
                 time.sleep(2)  # 2 second delay between requests
 
+        # ISO codes, so the scrape can be joined with the ISO-keyed data
+        iso_index = self.assign_iso_codes(all_data)
+
         # Save results
         output = {
             'version': '2.0.0',
             'source': 'CIA World Factbook (scraped)',
             'scraped_at': time.strftime('%Y-%m-%d'),
-            'countries': all_data
+            'countries': all_data,
+            'iso_index': iso_index
         }
 
         output_file = self.output_dir / 'cia_factbook_2025.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        with open(output_file, 'wb') as f:
+            jsoncodec.dump(output, f, pretty=True)
 
-        print(f"\n✅ Scraped {len(all_data)} countries")
+        print(f"\n✅ Scraped {len(all_data)} countries ({len(iso_index)} with an ISO code)")
         print(f"📁 Saved to: {output_file}")
         print(f"📊 File size: {output_file.stat().st_size / 1024:.1f} KB")
 
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+"""
+Airport Binary Exporter
+Converts airports_iata.json into the memory-mapped airports_iata.bin format
+
+The binary file stores fixed-width records sorted by IATA code, float32
+lat/lon columns and a shared string heap (see airport_binary.py). Loading it
+is a single mmap call, so processes that only need a handful of lookups no
+longer pay for parsing the full JSON document.
+
+Usage: python3 07_export_airports_binary.py [--compare]
+"""
+
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, Any
+
+from airport_binary import write_airport_binary, open_airports
+
+
+def compare_formats(json_file: Path, binary_file: Path, lookups: int = 100000) -> Dict[str, Any]:
+    """Measure size, startup and lookup latency of JSON vs binary"""
+    start = time.perf_counter()
+    with open(json_file, 'r', encoding='utf-8') as f:
+        airports = json.load(f)['airports']
+    by_iata = {a['iata']: a for a in airports.values()}
+    json_startup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = open_airports(binary_file)
+    binary_startup = time.perf_counter() - start
+
+    codes = list(by_iata)
+    random.seed(42)
+    sample = [random.choice(codes) for _ in range(lookups)]
+
+    start = time.perf_counter()
+    for code in sample:
+        by_iata[code]
+    json_lookup = (time.perf_counter() - start) / lookups
+
+    start = time.perf_counter()
+    for code in sample:
+        index.get(code)
+    binary_lookup = (time.perf_counter() - start) / lookups
+
+    start = time.perf_counter()
+    for code in sample:
+        index.find_iata(code)
+    binary_search = (time.perf_counter() - start) / lookups
+
+    # Round-trip check (float32 coordinates are within ~1 m of the source)
+    mismatches = 0
+    for code, airport in by_iata.items():
+        decoded = index.get(code)
+        if (decoded is None or decoded['icao'] != airport['icao'] or decoded['name'] != airport['name']
+                or abs(decoded['lat'] - airport['lat']) > 1e-4 or abs(decoded['lon'] - airport['lon']) > 1e-4
+                or index.find_icao(airport['icao']) != index.find_iata(code)):
+            mismatches += 1
+
+    index.close()
+
+    return {
+        'json_bytes': json_file.stat().st_size,
+        'binary_bytes': binary_file.stat().st_size,
+        'json_startup_ms': json_startup * 1000,
+        'binary_startup_ms': binary_startup * 1000,
+        'json_lookup_us': json_lookup * 1e6,
+        'binary_lookup_us': binary_lookup * 1e6,
+        'binary_search_us': binary_search * 1e6,
+        'mismatches': mismatches
+    }
+
+
+def main():
+    """Main execution"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export airports_iata.json to airports_iata.bin')
+    parser.add_argument('--compare', action='store_true',
+                        help='Compare size and latency against the JSON file')
+    args = parser.parse_args()
+
+    script_dir = Path(__file__).parent
+    resources_dir = script_dir.parent / "resources"
+    json_file = resources_dir / "airports_iata.json"
+    binary_file = resources_dir / "airports_iata.bin"
+
+    print("\n" + "="*60)
+    print("Airport Binary Exporter")
+    print("="*60)
+
+    if not json_file.exists():
+        print(f"\n❌ Airports not found: {json_file}")
+        print("   Run: node scripts/03_build_airports.js")
+        return
+
+    with open(json_file, 'r', encoding='utf-8') as f:
+        airports = json.load(f)['airports']
+
+    size = write_airport_binary(airports, binary_file)
+    print(f"\n✅ Exported {len(airports)} airports")
+    print(f"📁 Saved to: {binary_file}")
+    print(f"📊 Size: {size / 1024:.1f} KB (JSON: {json_file.stat().st_size / 1024:.1f} KB)")
+
+    if args.compare:
+        print("\n⏱️  Comparing formats...")
+        stats = compare_formats(json_file, binary_file)
+        print(f"   {'':18} {'JSON':>12} {'Binary':>12}")
+        print(f"   {'Size (KB)':18} {stats['json_bytes'] / 1024:>12.1f} {stats['binary_bytes'] / 1024:>12.1f}")
+        print(f"   {'Startup (ms)':18} {stats['json_startup_ms']:>12.2f} {stats['binary_startup_ms']:>12.3f}")
+        print(f"   {'Lookup (µs)':18} {stats['json_lookup_us']:>12.3f} {stats['binary_lookup_us']:>12.3f}")
+        print(f"   {'Search only (µs)':18} {'':>12} {stats['binary_search_us']:>12.3f}")
+        if stats['mismatches']:
+            print(f"\n⚠️  {stats['mismatches']} airports did not round-trip")
+        else:
+            print("\n✅ All airports round-trip (IATA and ICAO)")
+
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
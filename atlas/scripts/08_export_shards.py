@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+
+"""
+Per-Country Shard Exporter
+Splits the unified database into one small file per ISO code for lazy loading
+
+Each shard holds a country's entity from countries_v2.json, all of its
+airports from airports_iata.json and its boundary feature from
+countries_50m.geojson. Shard file names carry a prefix of their SHA-256, so a
+shard's URL changes whenever its content does and it can be cached forever.
+
+manifest.json lists every shard with its file name, hash and byte size.
+Clients fetch the (small) manifest first and then only the shards for the
+countries the user actually visits.
+
+Output:
+    resources/shards/manifest.json
+    resources/shards/{ISO}.{hash}.json
+
+Usage: python3 08_export_shards.py
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from export_utils import clean_name, encode, write_atomic
+
+MANIFEST_VERSION = 1
+
+# Hex digits of the SHA-256 used in shard file names
+NAME_HASH_LENGTH = 12
+
+
+def group_airports(airports: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Airports by country code, each keyed by IATA code"""
+    by_country: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for airport in sorted(airports.values(), key=lambda a: a['iata'].upper()):
+        by_country.setdefault(airport.get('country') or '', {})[airport['iata'].upper()] = airport
+    return by_country
+
+
+def group_boundaries(features: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """One boundary feature per ISO code; split features are merged into a MultiPolygon"""
+    by_country: Dict[str, Dict[str, Any]] = {}
+    for feature in features:
+        iso = clean_name((feature.get('properties') or {}).get('iso_a2'))
+        if not iso or iso == '-99':
+            continue  # Skip invalid codes
+
+        existing = by_country.get(iso)
+        if existing is None:
+            by_country[iso] = feature
+            continue
+
+        polygons = []
+        for geometry in (existing['geometry'], feature['geometry']):
+            if geometry['type'] == 'Polygon':
+                polygons.append(geometry['coordinates'])
+            elif geometry['type'] == 'MultiPolygon':
+                polygons.extend(geometry['coordinates'])
+        by_country[iso] = dict(existing, geometry={'type': 'MultiPolygon', 'coordinates': polygons})
+    return by_country
+
+
+def build_shards(database: Dict[str, Any], airports: Dict[str, Dict[str, Any]],
+                 boundaries: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Shard documents keyed by ISO code"""
+    shards = {}
+    for iso, entity in sorted(database['entities'].items()):
+        shards[iso] = {
+            'version': database.get('version'),
+            'code': iso,
+            'entity': entity,
+            'airports': airports.get(iso, {}),
+            'boundary': boundaries.get(iso)
+        }
+    return shards
+
+
+def export_shards(shards: Dict[str, Dict[str, Any]], output_dir: Path, version: Optional[str]) -> Dict[str, Any]:
+    """Write shard files and the manifest; returns the manifest"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_file = output_dir / 'manifest.json'
+
+    previous_files = set()
+    if manifest_file.exists():
+        try:
+            previous = json.loads(manifest_file.read_text(encoding='utf-8'))
+            previous_files = {entry['file'] for entry in previous.get('shards', {}).values()}
+        except (ValueError, KeyError, AttributeError):
+            pass
+
+    entries = {}
+    for iso, shard in shards.items():
+        data = encode(shard)
+        digest = hashlib.sha256(data).hexdigest()
+        name = f"{iso}.{digest[:NAME_HASH_LENGTH]}.json"
+        path = output_dir / name
+        # Same name means same content, so unchanged shards are not rewritten
+        if not path.exists():
+            write_atomic(path, data)
+        entries[iso] = {
+            'file': name,
+            'sha256': digest,
+            'bytes': len(data),
+            'name': clean_name(shard['entity'].get('name')),
+            'airports': len(shard['airports']),
+            'has_boundary': shard['boundary'] is not None
+        }
+
+    manifest = {
+        'manifest_version': MANIFEST_VERSION,
+        'version': version,
+        'generated_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'total_shards': len(entries),
+        'total_bytes': sum(e['bytes'] for e in entries.values()),
+        'shards': entries
+    }
+    # Shards first, manifest last: a client never sees a manifest whose shards are missing
+    write_atomic(manifest_file, encode(manifest))
+
+    # Shards of the previous manifest stay one more run for clients still holding it
+    keep = {e['file'] for e in entries.values()} | previous_files | {manifest_file.name}
+    for path in output_dir.glob('*.json'):
+        if path.name not in keep:
+            path.unlink()
+
+    return manifest
+
+
+def main():
+    """Main execution"""
+    script_dir = Path(__file__).parent
+    resources_dir = script_dir.parent / "resources"
+    database_file = resources_dir / "countries_v2.json"
+    airports_file = resources_dir / "airports_iata.json"
+    boundaries_file = resources_dir / "countries_50m.geojson"
+    output_dir = resources_dir / "shards"
+
+    print("\n" + "="*60)
+    print("Per-Country Shard Exporter")
+    print("="*60)
+
+    if not database_file.exists():
+        print(f"\n❌ Unified database not found: {database_file}")
+        print("   Run: node scripts/05_build_unified_db.js")
+        return
+
+    with open(database_file, 'r', encoding='utf-8') as f:
+        database = json.load(f)
+
+    airports = {}
+    if airports_file.exists():
+        with open(airports_file, 'r', encoding='utf-8') as f:
+            airports = group_airports(json.load(f)['airports'])
+    else:
+        print(f"⚠️  Airports not found, shards will have none: {airports_file}")
+
+    boundaries = {}
+    if boundaries_file.exists():
+        with open(boundaries_file, 'r', encoding='utf-8') as f:
+            boundaries = group_boundaries(json.load(f)['features'])
+    else:
+        print(f"⚠️  Boundaries not found, shards will have none: {boundaries_file}")
+        print("   Run: node scripts/02_process_boundaries.js")
+
+    shards = build_shards(database, airports, boundaries)
+    manifest = export_shards(shards, output_dir, database.get('version'))
+
+    sizes = sorted(e['bytes'] for e in manifest['shards'].values())
+    print(f"\n✅ Exported {manifest['total_shards']} shards")
+    print(f"📁 Saved to: {output_dir}")
+    print(f"📊 Total: {manifest['total_bytes'] / 1024:.1f} KB "
+          f"(countries_v2.json: {database_file.stat().st_size / 1024:.1f} KB)")
+    if sizes:
+        print(f"   Median shard: {sizes[len(sizes) // 2] / 1024:.1f} KB, largest: {sizes[-1] / 1024:.1f} KB")
+    print(f"   Manifest: {(output_dir / 'manifest.json').stat().st_size / 1024:.1f} KB")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+"""
+Dataset Delta Exporter
+Records each build of countries_v2.json and the per-entity patch from the one before
+
+Run after 05_build_unified_db.js. The previous build is kept in data/builds/,
+so each run can diff it against the new countries_v2.json (see
+dataset_delta.py for the patch format). The chain of builds and patches is
+written to resources/countries_v2.deltas.json, which serve.py uses to answer
+/api/delta?from=<build id> with only what changed since a client's copy.
+
+Builds are identified by their "version" field; a rebuild that changed the
+content without bumping the version gets "<version>+<sha256 prefix>". The
+last MAX_BUILDS builds are kept; clients older than that download the full
+file again.
+
+Usage: python3 09_export_deltas.py
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any
+
+from dataset_delta import apply_patch, diff_builds
+from export_utils import encode, write_atomic
+
+HISTORY_VERSION = 1
+
+# Builds (and therefore patches) kept in the history
+MAX_BUILDS = 10
+
+
+def new_history() -> Dict[str, Any]:
+    return {'history_version': HISTORY_VERSION, 'current': None, 'builds': [], 'patches': []}
+
+
+def load_history(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return new_history()
+    with open(path, 'r', encoding='utf-8') as f:
+        history = json.load(f)
+    if history.get('history_version') != HISTORY_VERSION:
+        print("⚠️  Delta history has an old format - starting a new chain")
+        return new_history()
+    return history
+
+
+def build_file(builds_dir: Path, build_id: str) -> Path:
+    return builds_dir / f"countries_v2.{build_id}.json"
+
+
+def record_build(history: Dict[str, Any], database: Dict[str, Any], raw: bytes,
+                 builds_dir: Path) -> bool:
+    """Append the build to history with its patch; False if it is already the latest"""
+    digest = hashlib.sha256(raw).hexdigest()
+    builds = history['builds']
+    if builds and builds[-1]['sha256'] == digest:
+        return False
+
+    version = str(database.get('version') or '0')
+    build_id = version if all(b['id'] != version for b in builds) else f"{version}+{digest[:8]}"
+
+    if builds:
+        previous = builds[-1]
+        previous_file = build_file(builds_dir, previous['id'])
+        if previous_file.exists():
+            with open(previous_file, 'r', encoding='utf-8') as f:
+                previous_database = json.load(f)
+            patch = diff_builds(previous_database, database, previous['id'], build_id)
+            if apply_patch(previous_database, patch) != database:
+                raise RuntimeError(f"Patch {previous['id']} -> {build_id} does not reproduce the build")
+            history['patches'].append(patch)
+        else:
+            print(f"⚠️  Previous build {previous['id']} not found in {builds_dir} - starting a new chain")
+            builds.clear()
+            history['patches'].clear()
+
+    builds.append({
+        'id': build_id,
+        'version': version,
+        'sha256': digest,
+        'bytes': len(raw),
+        'recorded_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    })
+    history['current'] = build_id
+    write_atomic(build_file(builds_dir, build_id), raw)
+
+    while len(builds) > MAX_BUILDS:
+        dropped = builds.pop(0)
+        history['patches'].pop(0)
+        build_file(builds_dir, dropped['id']).unlink(missing_ok=True)
+
+    return True
+
+
+def main():
+    """Main execution"""
+    script_dir = Path(__file__).parent
+    atlas_dir = script_dir.parent
+    database_file = atlas_dir / "resources" / "countries_v2.json"
+    history_file = atlas_dir / "resources" / "countries_v2.deltas.json"
+    builds_dir = atlas_dir / "data" / "builds"
+
+    print("\n" + "="*60)
+    print("Dataset Delta Exporter")
+    print("="*60)
+
+    if not database_file.exists():
+        print(f"\n❌ Unified database not found: {database_file}")
+        print("   Run: node scripts/05_build_unified_db.js")
+        return
+
+    raw = database_file.read_bytes()
+    database = json.loads(raw)
+    history = load_history(history_file)
+
+    if not record_build(history, database, raw, builds_dir):
+        print(f"\n✅ Build {history['current']} is already recorded - nothing to do")
+        print("="*60)
+        return
+
+    write_atomic(history_file, encode(history))
+
+    print(f"\n✅ Recorded build {history['current']} ({len(history['builds'])} in history)")
+    if history['patches']:
+        patch = history['patches'][-1]
+        size = len(encode(patch))
+        print(f"📊 Patch {patch['from']} -> {patch['to']}: {len(patch['changed'])} changed, "
+              f"{len(patch['added'])} added, {len(patch['removed'])} removed entities")
+        print(f"   {size / 1024:.1f} KB vs {len(raw) / 1024:.1f} KB full download")
+    print(f"📁 Saved to: {history_file}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
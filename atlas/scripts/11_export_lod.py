@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+"""
+Boundary Level-of-Detail Exporter
+Pre-simplifies country and region boundaries into several zoom levels
+
+Each input is converted to a shared-arc topology (see topology.py) and every
+arc point gets its Visvalingam-Whyatt effective area once. A level keeps the
+points whose area is at least tolerance², so a zoomed-out globe, where one
+pixel covers most of a degree, downloads a small fraction of the vertices.
+This is shared-arc simplification: junctions between borders are never
+removed and each border is a single arc shared by both countries, so
+neighbours still meet exactly at every level, and every ring keeps at least
+three points. Arcs are simplified independently, though, with no check for
+crossings, so at coarse levels two nearby borders can cross.
+
+Output: resources/{countries_50m,regions_10m}.lod.json
+
+    {"type": "TopologyLOD", "bbox": [...], "transform": {...},
+     "objects": {...},                 # shared by all levels
+     "levels": [{"max_zoom": 1, "tolerance": 0.5, "points": 1234,
+                 "arcs": [...]}, ...]} # delta-encoded, finest level last
+
+serve.py answers /api/boundaries?set=countries&zoom=N with the first level
+whose max_zoom is at least N, as a regular TopoJSON Topology.
+
+Usage: python3 11_export_lod.py
+"""
+
+import gzip
+import json
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from topology import (build_topology, delta_decode, delta_encode, effective_areas, keep_ring_points,
+                      simplify_arc)
+from export_utils import encode, write_atomic
+
+# (zoom levels served, tolerance in degrees); a web-map pixel at zoom z spans
+# about 360 / (256 * 2^z) degrees. The last level (tolerance 0) is the full
+# quantized topology.
+LOD_LEVELS: List[Tuple[Optional[int], float]] = [
+    (1, 0.5),
+    (3, 0.1),
+    (5, 0.02),
+    (None, 0.0),
+]
+
+# Input file -> topology object name
+LOD_INPUTS = {
+    'countries_50m.geojson': 'countries',
+    'regions_10m.geojson': 'regions',
+}
+
+
+def build_levels(collection: Dict[str, Any], object_name: str) -> Dict[str, Any]:
+    """TopologyLOD document with one arc set per entry of LOD_LEVELS"""
+    topology = build_topology(collection, object_name)
+    arcs = [delta_decode(arc) for arc in topology['arcs']]
+    areas = [effective_areas(arc) for arc in arcs]
+    keep_ring_points(topology['objects'], areas)
+    sx, sy = topology['transform']['scale']
+
+    levels = []
+    for max_zoom, tolerance in LOD_LEVELS:
+        # Effective areas are in grid units; tolerance is in degrees
+        min_area = tolerance * tolerance / (sx * sy)
+        simplified = [simplify_arc(arc, arc_areas, min_area) for arc, arc_areas in zip(arcs, areas)]
+        levels.append({
+            'max_zoom': max_zoom,
+            'tolerance': tolerance,
+            'points': sum(len(arc) for arc in simplified),
+            'arcs': [delta_encode(arc) for arc in simplified]
+        })
+
+    return {
+        'type': 'TopologyLOD',
+        'bbox': topology['bbox'],
+        'transform': topology['transform'],
+        'objects': topology['objects'],
+        'levels': levels
+    }
+
+
+def main():
+    """Main execution"""
+    script_dir = Path(__file__).parent
+    resources_dir = script_dir.parent / "resources"
+
+    print("\n" + "="*60)
+    print("Boundary Level-of-Detail Exporter")
+    print("="*60)
+
+    exported = 0
+    for input_name, object_name in LOD_INPUTS.items():
+        input_file = resources_dir / input_name
+        if not input_file.exists():
+            print(f"\n⚠️  Skipping {input_name} (not found)")
+            continue
+
+        with open(input_file, 'r', encoding='utf-8') as f:
+            collection = json.load(f)
+
+        start = time.perf_counter()
+        document = build_levels(collection, object_name)
+        build_time = time.perf_counter() - start
+
+        output_file = input_file.with_name(input_name.replace('.geojson', '.lod.json'))
+        write_atomic(output_file, encode(document))
+        exported += 1
+
+        print(f"\n✅ {input_name}: {len(collection['features'])} features, "
+              f"{len(document['levels'])} levels ({build_time:.1f}s)")
+        print(f"📁 Saved to: {output_file}")
+
+        full_points = document['levels'][-1]['points']
+        print(f"   {'Zoom':>6} {'Tolerance':>10} {'Points':>10} {'Share':>7} {'Gzipped':>10}")
+        for level in document['levels']:
+            level_topology = {'type': 'Topology', 'bbox': document['bbox'], 'transform': document['transform'],
+                              'objects': document['objects'], 'arcs': level['arcs']}
+            size = len(gzip.compress(encode(level_topology), 6))
+            zoom = '≤' + str(level['max_zoom']) if level['max_zoom'] is not None else 'all'
+            print(f"   {zoom:>6} {level['tolerance']:>9}° {level['points']:>10,} "
+                  f"{level['points'] / max(1, full_points):>6.1%} {size / 1024:>8.1f}KB")
+
+    if not exported:
+        print("\n❌ No boundary files found")
+        print("   Run: node scripts/02_process_boundaries.js")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
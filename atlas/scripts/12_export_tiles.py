@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+"""
+Vector Tile Exporter
+Cuts boundaries and airports into z/x/y vector tiles for the low zoom levels
+
+Zoom 0 to PREGENERATED_MAX_ZOOM (341 tiles) are written ahead of time;
+serve.py cuts deeper zooms (up to MAX_ZOOM) on demand and keeps them in an
+LRU disk cache under data/cache/tiles/. The tiling code is shared with
+serve.py (viewer/tiles.py), so both produce identical tiles.
+
+metadata.json (TileJSON) records which versions of countries_50m.geojson
+and airports_iata.json the tiles were cut from; serve.py ignores the
+pregenerated tiles once either file changes, until this script is re-run.
+
+Output:
+    resources/tiles/{z}/{x}/{y}.mvt
+    resources/tiles/metadata.json
+
+Usage: python3 12_export_tiles.py
+"""
+
+import hashlib
+import json
+import shutil
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "viewer"))
+
+from indexes import AIRPORTS_FILE, BOUNDARIES_FILE, CLUSTERS_FILE  # noqa: E402
+from tiles import (MAX_ZOOM, PREGENERATED_MAX_ZOOM, TILE_EXTENT, TILE_METADATA, TILES_DIR,  # noqa: E402
+                   TileSource, airport_min_zooms, source_key, tile_path)
+from export_utils import write_atomic  # noqa: E402
+
+
+def main():
+    """Main execution"""
+    script_dir = Path(__file__).parent
+    atlas_dir = script_dir.parent
+    boundaries_file = atlas_dir / BOUNDARIES_FILE
+    airports_file = atlas_dir / AIRPORTS_FILE
+    clusters_file = atlas_dir / CLUSTERS_FILE
+    output_dir = atlas_dir / TILES_DIR
+
+    print("\n" + "="*60)
+    print("Vector Tile Exporter")
+    print("="*60)
+
+    if not airports_file.exists():
+        print(f"\n❌ Airports not found: {airports_file}")
+        print("   Run: node scripts/03_build_airports.js")
+        return
+    if not boundaries_file.exists():
+        print(f"\n⚠️  Boundaries not found: {boundaries_file} - tiles will only hold airports")
+    if not clusters_file.exists():
+        print(f"\n⚠️  Clusters not found: {clusters_file} - every zoom will hold every airport")
+        print("   Run: python3 scripts/13_cluster_airports.py")
+
+    sources = {}
+    for relative, path in ((BOUNDARIES_FILE, boundaries_file), (AIRPORTS_FILE, airports_file),
+                           (CLUSTERS_FILE, clusters_file)):
+        sources[relative] = hashlib.sha256(path.read_bytes()).hexdigest() if path.exists() else None
+
+    boundaries = None
+    if boundaries_file.exists():
+        with open(boundaries_file, 'r', encoding='utf-8') as f:
+            boundaries = json.load(f)
+    with open(airports_file, 'r', encoding='utf-8') as f:
+        airports = {a['iata'].upper(): a for a in json.load(f).get('airports', {}).values()}
+    min_zooms = None
+    if clusters_file.exists():
+        with open(clusters_file, 'r', encoding='utf-8') as f:
+            min_zooms = airport_min_zooms(json.load(f)['levels'])
+
+    start = time.perf_counter()
+    source = TileSource(boundaries, airports, min_zooms)
+
+    # Write next to the old tiles and swap, so serve.py never sees a half-written pyramid
+    staging_dir = output_dir.with_name(output_dir.name + '.tmp')
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+    sizes = {}
+    for z in range(PREGENERATED_MAX_ZOOM + 1):
+        sizes[z] = []
+        for x in range(2 ** z):
+            for y in range(2 ** z):
+                data = source.tile(z, x, y)
+                write_atomic(tile_path(staging_dir, z, x, y), data)
+                sizes[z].append(len(data))
+
+    metadata = {
+        'tilejson': '3.0.0',
+        'name': 'atlas',
+        'tiles': ['/tiles/{z}/{x}/{y}'],
+        'minzoom': 0,
+        'maxzoom': MAX_ZOOM,
+        'pregenerated_maxzoom': PREGENERATED_MAX_ZOOM,
+        'extent': TILE_EXTENT,
+        'vector_layers': [
+            {'id': 'boundaries', 'fields': {'iso_a2': 'String', 'iso_a3': 'String', 'name': 'String'}},
+            {'id': 'airports', 'fields': {'iata': 'String', 'name': 'String', 'country': 'String'}}
+        ],
+        'source': source_key(sources),
+        'sources': sources
+    }
+    write_atomic(staging_dir / TILE_METADATA, json.dumps(metadata, indent=2).encode('utf-8'))
+
+    old_dir = output_dir.with_name(output_dir.name + '.old')
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if output_dir.exists():
+        output_dir.rename(old_dir)
+    staging_dir.rename(output_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - start
+    total = sum(sum(s) for s in sizes.values())
+    world = sum(path.stat().st_size for path in (boundaries_file, airports_file) if path.exists())
+
+    print(f"\n✅ {sum(len(s) for s in sizes.values())} tiles for zoom 0-{PREGENERATED_MAX_ZOOM} "
+          f"({elapsed:.1f}s, {total / 1024:.0f} KB)")
+    print(f"📁 Saved to: {output_dir}")
+    print(f"   {'Zoom':>4} {'Tiles':>6} {'Avg':>9} {'Max':>9}")
+    for z, tile_sizes in sizes.items():
+        print(f"   {z:>4} {len(tile_sizes):>6} {sum(tile_sizes) / len(tile_sizes) / 1024:>7.1f}KB "
+              f"{max(tile_sizes) / 1024:>7.1f}KB")
+    deepest = sizes[PREGENERATED_MAX_ZOOM]
+    print(f"📊 Whole-world files: {world / 1024:.0f} KB; a zoom {PREGENERATED_MAX_ZOOM} view of "
+          f"~4 tiles fetches {4 * sum(deepest) / len(deepest) / 1024:.0f} KB on average")
+    print(f"   Zoom {PREGENERATED_MAX_ZOOM + 1}-{MAX_ZOOM} are cut on demand by serve.py")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+
+"""
+Airport Cluster Builder
+Groups airports into a cluster tree with one level per map zoom
+
+Starting from the individual airports (the level below MAX_CLUSTER_ZOOM),
+each zoom level is built from the one below it by greedy grid clustering in
+Web Mercator space: items are visited largest first, and each unclaimed item
+claims every unclaimed item within RADIUS_PX screen pixels at that zoom
+(found through a grid of radius-sized cells, so only the 3x3 neighbouring
+cells are searched). A cluster stores its airport count, its count-weighted
+centroid and a representative airport - the representative of its largest
+child, so the same major airport labels a region at every zoom. Between
+items of equal count, international airports win over other airports, and
+those over heliports, seaplane bases and airstrips.
+
+Because cluster seeds are at least RADIUS_PX apart, a viewport of W x H
+pixels never holds more than about (W / RADIUS_PX) x (H / RADIUS_PX)
+clusters, however many airports it covers.
+
+Output: resources/airport_clusters.json
+
+    {"radius_px": 60, "max_zoom": 12,
+     "levels": [{"zoom": 0, "lat": [...], "lon": [...], "count": [...],
+                 "airport": [IATA...], "parent": []},
+                ...
+                {"zoom": 13, ...one entry per airport...}]}
+
+"parent" holds each item's index in the level above (zoom - 1), so the
+levels form a tree. serve.py answers /api/airports/clusters from this file.
+
+Usage: python3 13_cluster_airports.py
+"""
+
+import json
+import math
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "viewer"))
+
+from tiles import project  # noqa: E402
+from export_utils import encode, write_atomic  # noqa: E402
+
+CLUSTERS_VERSION = 1
+
+# Cluster levels for zoom 0..MAX_CLUSTER_ZOOM; deeper zooms show every airport
+MAX_CLUSTER_ZOOM = 12
+
+# Clustering radius in screen pixels, for 256-pixel tiles
+RADIUS_PX = 60
+TILE_SIZE = 256
+
+
+def airport_rank(airport: Dict[str, Any]) -> int:
+    """Rough importance from the name: 2 international, 1 airport, 0 anything else"""
+    name = (airport.get('name') or '').lower()
+    if 'international' in name:
+        return 2
+    if 'airport' in name and 'heliport' not in name:
+        return 1
+    return 0
+
+
+def unproject(x: float, y: float) -> Tuple[float, float]:
+    """(lat, lon) of a Web Mercator position in world units"""
+    lon = x * 360.0 - 180.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1.0 - 2.0 * y))))
+    return lat, lon
+
+
+def cluster_level(items: List[Dict[str, Any]], zoom: int) -> Tuple[List[Dict[str, Any]], List[int]]:
+    """Clusters of items at zoom, and the cluster index of each item"""
+    radius = RADIUS_PX / (TILE_SIZE * 2 ** zoom)
+
+    def cell(item):
+        return int(item['x'] // radius), int(item['y'] // radius)
+
+    grid = defaultdict(list)
+    for i, item in enumerate(items):
+        grid[cell(item)].append(i)
+
+    assigned = [-1] * len(items)
+    clusters: List[Dict[str, Any]] = []
+    # Largest first, so big clusters absorb their surroundings
+    order = sorted(range(len(items)), key=lambda i: (-items[i]['count'], -items[i]['rank'], items[i]['airport']))
+    for i in order:
+        if assigned[i] >= 0:
+            continue
+        seed = items[i]
+        cx, cy = cell(seed)
+        members = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for j in grid.get((cx + dx, cy + dy), ()):
+                    other = items[j]
+                    if assigned[j] < 0 and math.hypot(other['x'] - seed['x'], other['y'] - seed['y']) <= radius:
+                        members.append(j)
+
+        count = sum(items[j]['count'] for j in members)
+        for j in members:
+            assigned[j] = len(clusters)
+        clusters.append({
+            'x': sum(items[j]['x'] * items[j]['count'] for j in members) / count,
+            'y': sum(items[j]['y'] * items[j]['count'] for j in members) / count,
+            'count': count,
+            'airport': seed['airport'],
+            'rank': seed['rank']
+        })
+    return clusters, assigned
+
+
+def level_columns(zoom: int, items: List[Dict[str, Any]], parents: List[int]) -> Dict[str, Any]:
+    lats, lons = [], []
+    for item in items:
+        lat, lon = item.get('lat_lon') or unproject(item['x'], item['y'])
+        lats.append(round(lat, 5))
+        lons.append(round(lon, 5))
+    return {
+        'zoom': zoom,
+        'lat': lats,
+        'lon': lons,
+        'count': [item['count'] for item in items],
+        'airport': [item['airport'] for item in items],
+        'parent': parents
+    }
+
+
+def build_clusters(airports: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Cluster tree document for airports keyed by IATA code"""
+    items = []
+    for iata in sorted(airports):
+        airport = airports[iata]
+        if airport.get('lat') is None or airport.get('lon') is None:
+            continue
+        x, y = project(airport['lon'], airport['lat'])
+        items.append({'x': x, 'y': y, 'count': 1, 'airport': iata, 'rank': airport_rank(airport),
+                      'lat_lon': (airport['lat'], airport['lon'])})
+
+    levels = []
+    for zoom in range(MAX_CLUSTER_ZOOM, -1, -1):
+        clusters, parents = cluster_level(items, zoom)
+        levels.append(level_columns(zoom + 1, items, parents))
+        items = clusters
+    levels.append(level_columns(0, items, []))
+    levels.reverse()
+
+    return {
+        'clusters_version': CLUSTERS_VERSION,
+        'generated_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'radius_px': RADIUS_PX,
+        'max_zoom': MAX_CLUSTER_ZOOM,
+        'levels': levels
+    }
+
+
+def main():
+    """Main execution"""
+    script_dir = Path(__file__).parent
+    resources_dir = script_dir.parent / "resources"
+    airports_file = resources_dir / "airports_iata.json"
+    output_file = resources_dir / "airport_clusters.json"
+
+    print("\n" + "="*60)
+    print("Airport Cluster Builder")
+    print("="*60)
+
+    if not airports_file.exists():
+        print(f"\n❌ Airports not found: {airports_file}")
+        print("   Run: node scripts/03_build_airports.js")
+        return
+
+    with open(airports_file, 'r', encoding='utf-8') as f:
+        airports = {a['iata'].upper(): a for a in json.load(f).get('airports', {}).values()}
+
+    start = time.perf_counter()
+    document = build_clusters(airports)
+    elapsed = time.perf_counter() - start
+
+    encoded = encode(document)
+    write_atomic(output_file, encoded)
+
+    print(f"\n✅ {len(airports):,} airports -> {MAX_CLUSTER_ZOOM + 1} cluster levels ({elapsed:.1f}s)")
+    print(f"📁 Saved to: {output_file} ({len(encoded) / 1024:.0f} KB)")
+    print(f"   {'Zoom':>4} {'Clusters':>9} {'Largest':>8}  Representative")
+    for level in document['levels'][:MAX_CLUSTER_ZOOM + 1]:
+        largest = max(range(len(level['count'])), key=lambda i: level['count'][i])
+        print(f"   {level['zoom']:>4} {len(level['count']):>9,} {level['count'][largest]:>8,}  "
+              f"{level['airport'][largest]}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
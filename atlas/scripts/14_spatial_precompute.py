@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+
+"""
+Spatial Precompute
+Computes each country's bounding box, visual centroid and neighbours
+
+Computed once from countries_50m.geojson so consumers (camera fly-to,
+viewport culling, "neighbouring countries") do not have to process the full
+polygons themselves. The result is its own resource, countries_spatial.json,
+keyed by the same codes as countries_v2.json, so rebuilding the database
+with 05_build_unified_db.js does not lose it:
+
+    {"spatial_version": 1, "generated_at": "...", "entities": {
+      "FR": {
+        "bbox": [west, south, east, north],   # west > east crosses the antimeridian
+        "centroid": {"lat": 46.6, "lon": 2.4},
+        "neighbors": ["ES", "BE", ...],       # longest shared border first
+        "border_km": {"ES": 623.4, ...}
+      }, ...}}
+
+- bbox: the smallest longitude range covering every polygon (so Fiji or
+  Russia get a narrow box across 180° instead of one spanning the globe).
+- centroid: the pole of inaccessibility of the largest polygon - the
+  interior point farthest from its edges, where a label or camera target
+  belongs (unlike the area centroid, it is always inside the shape). With
+  NumPy installed each distance is one vectorized pass over the edges.
+- neighbors: countries sharing at least one border segment. Natural Earth
+  stores shared borders with identical vertices, so every segment is hashed
+  by its (ordered) end points; a segment found under two countries is a
+  piece of their common border. One pass over all segments, no pairwise
+  polygon comparison. Countries touching at a single point are not
+  neighbours.
+
+serve.py sends the file as the "spatial" part of /api/bundle.
+
+Usage: python3 14_spatial_precompute.py
+"""
+
+import heapq
+import math
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "viewer"))
+
+import jsoncodec  # noqa: E402
+from export_utils import clean_name, encode, write_atomic  # noqa: E402
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SPATIAL_VERSION = 1
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Pole-of-inaccessibility search stops at this fraction of the polygon's size
+CENTROID_PRECISION = 0.01
+
+# ...or once this many grid cells have been measured (a few hundred is typical)
+MAX_CENTROID_CELLS = 2000
+
+Ring = List[List[float]]
+
+
+def polygons_by_country(collection: Dict[str, Any]) -> Dict[str, List[List[Ring]]]:
+    """Every polygon (list of rings) of each ISO code; split features are merged"""
+    countries: Dict[str, List[List[Ring]]] = defaultdict(list)
+    for feature in collection.get('features', []):
+        code = clean_name((feature.get('properties') or {}).get('iso_a2'))
+        geometry = feature.get('geometry') or {}
+        if not code or code == '-99':
+            continue
+        if geometry.get('type') == 'Polygon':
+            countries[code].append(geometry['coordinates'])
+        elif geometry.get('type') == 'MultiPolygon':
+            countries[code].extend(geometry['coordinates'])
+    return countries
+
+
+def ring_area(ring: Ring) -> float:
+    """Signed planar area in square degrees"""
+    total = 0.0
+    for i in range(len(ring) - 1):
+        total += ring[i][0] * ring[i + 1][1] - ring[i + 1][0] * ring[i][1]
+    return total / 2
+
+
+def bounding_box(polygons: List[List[Ring]]) -> List[float]:
+    """[west, south, east, north]; west > east when the box crosses 180°"""
+    spans = []
+    south, north = 90.0, -90.0
+    for polygon in polygons:
+        lons = [p[0] for p in polygon[0]]
+        lats = [p[1] for p in polygon[0]]
+        spans.append((min(lons), max(lons)))
+        south, north = min(south, min(lats)), max(north, max(lats))
+
+    # The box is the circle minus its largest longitude gap between polygons
+    spans.sort()
+    best_gap, west, east = -1.0, spans[0][0], spans[0][1]
+    reach = spans[0][1]
+    merged_start = spans[0][0]
+    for start, end in spans[1:]:
+        if start > reach and start - reach > best_gap:
+            best_gap, west, east = start - reach, start, reach
+        reach = max(reach, end)
+    wrap_gap = merged_start + 360.0 - reach
+    if wrap_gap >= best_gap:
+        west, east = merged_start, reach
+    return [round(west, 6), round(south, 6), round(east, 6), round(north, 6)]
+
+
+def _segments(polygon: List[Ring]) -> List[Tuple[float, float, float, float, float]]:
+    """(ax, ay, dx, dy, squared length) of every edge of every ring"""
+    segments = []
+    for ring in polygon:
+        for i in range(len(ring) - 1):
+            ax, ay = ring[i][0], ring[i][1]
+            dx, dy = ring[i + 1][0] - ax, ring[i + 1][1] - ay
+            segments.append((ax, ay, dx, dy, dx * dx + dy * dy))
+    return segments
+
+
+def _signed_distance(x: float, y: float, segments) -> float:
+    """Distance from a point to the nearest edge (positive inside the polygon)"""
+    inside = False
+    min_sq = math.inf
+    for ax, ay, dx, dy, length_sq in segments:
+        by = ay + dy
+        if (ay > y) != (by > y) and x < dx * (y - ay) / dy + ax:
+            inside = not inside
+        if length_sq:
+            t = ((x - ax) * dx + (y - ay) * dy) / length_sq
+            t = 0.0 if t < 0.0 else 1.0 if t > 1.0 else t
+            ex, ey = ax + t * dx - x, ay + t * dy - y
+        else:
+            ex, ey = ax - x, ay - y
+        d = ex * ex + ey * ey
+        if d < min_sq:
+            min_sq = d
+    return math.sqrt(min_sq) if inside else -math.sqrt(min_sq)
+
+
+def _signed_distances(points: List[Tuple[float, float]], segments) -> List[float]:
+    """_signed_distance of several points, as one NumPy pass over a 5 x n array of segments"""
+    ax, ay, dx, dy, length_sq = segments
+    x, y = np.array(points, dtype=np.float64).T[:, :, np.newaxis]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crossings = ((ay > y) != (ay + dy > y)) & (x < dx * (y - ay) / dy + ax)
+        t = np.where(length_sq > 0, np.clip(((x - ax) * dx + (y - ay) * dy) / length_sq, 0.0, 1.0), 0.0)
+    ex, ey = ax + t * dx - x, ay + t * dy - y
+    distances = np.sqrt((ex * ex + ey * ey).min(axis=1))
+    inside = np.count_nonzero(crossings, axis=1) % 2 == 1
+    return np.where(inside, distances, -distances).tolist()
+
+
+def pole_of_inaccessibility(polygon: List[Ring]) -> Tuple[float, float]:
+    """(lon, lat) of the interior point farthest from the polygon's edges
+
+    Grid cells are refined best-first, pruning any cell that cannot beat
+    the best point found so far (the polylabel algorithm). The search stops
+    at CENTROID_PRECISION of the polygon's smaller side, or after
+    MAX_CENTROID_CELLS cells.
+    """
+    lons = [p[0] for p in polygon[0]]
+    lats = [p[1] for p in polygon[0]]
+    min_x, min_y, max_x, max_y = min(lons), min(lats), max(lons), max(lats)
+    cell_size = min(max_x - min_x, max_y - min_y)
+    if cell_size == 0:
+        return min_x, min_y
+    precision = cell_size * CENTROID_PRECISION
+    segments = _segments(polygon)
+    if np is not None:
+        segments = np.array(segments, dtype=np.float64).T
+    measured = 0
+
+    def cells(points, h):
+        nonlocal measured
+        measured += len(points)
+        if np is not None:
+            distances = _signed_distances(points, segments)
+        else:
+            distances = [_signed_distance(x, y, segments) for x, y in points]
+        # Priority: the best distance any point in a cell could reach
+        return [(-(d + h * math.sqrt(2)), d, x, y, h) for (x, y), d in zip(points, distances)]
+
+    def cell(x, y, h):
+        return cells([(x, y)], h)[0]
+
+    h = cell_size / 2
+    grid = []
+    x = min_x
+    while x < max_x:
+        y = min_y
+        while y < max_y:
+            grid.append((x + h, y + h))
+            y += cell_size
+        x += cell_size
+    queue = cells(grid, h)
+    heapq.heapify(queue)
+
+    # Start from the area centroid, which is often already a good answer
+    ring = polygon[0]
+    area = ring_area(ring)
+    if area:
+        cx = cy = 0.0
+        for i in range(len(ring) - 1):
+            f = ring[i][0] * ring[i + 1][1] - ring[i + 1][0] * ring[i][1]
+            cx += (ring[i][0] + ring[i + 1][0]) * f
+            cy += (ring[i][1] + ring[i + 1][1]) * f
+        best = cell(cx / (6 * area), cy / (6 * area), 0)
+    else:
+        best = cell(lons[0], lats[0], 0)
+    box = cell(min_x + (max_x - min_x) / 2, min_y + (max_y - min_y) / 2, 0)
+    if box[1] > best[1]:
+        best = box
+
+    while queue:
+        candidate = heapq.heappop(queue)
+        _, d, x, y, h = candidate
+        if d > best[1]:
+            best = candidate
+        if -candidate[0] - best[1] <= precision or measured >= MAX_CENTROID_CELLS:
+            continue
+        h /= 2
+        for child in cells([(x + dx, y + dy) for dx in (-h, h) for dy in (-h, h)], h):
+            heapq.heappush(queue, child)
+
+    return best[2], best[3]
+
+
+def visual_centroid(polygons: List[List[Ring]]) -> Dict[str, float]:
+    largest = max(polygons, key=lambda polygon: abs(ring_area(polygon[0])))
+    lon, lat = pole_of_inaccessibility(largest)
+    return {'lat': round(lat, 4), 'lon': round(lon, 4)}
+
+
+def segment_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    """Length of a short (lon, lat) segment (equirectangular; border segments are short)"""
+    dlat = math.radians(b[1] - a[1])
+    dlon = math.radians(b[0] - a[0]) * math.cos(math.radians((a[1] + b[1]) / 2))
+    return EARTH_RADIUS_KM * math.sqrt(dlat * dlat + dlon * dlon)
+
+
+def shared_borders(countries: Dict[str, List[List[Ring]]]) -> Dict[str, Dict[str, float]]:
+    """{code: {neighbour: shared border km}} from a hash of segment end points"""
+    owner: Dict[Tuple, str] = {}
+    shared: Dict[Tuple[str, str], List[Tuple]] = defaultdict(list)
+
+    for code, polygons in countries.items():
+        for polygon in polygons:
+            for ring in polygon:
+                points = list(map(tuple, ring))
+                for a, b in zip(points, points[1:]):
+                    key = (a, b) if a < b else (b, a)
+                    other = owner.setdefault(key, code)
+                    if other != code:
+                        shared[(other, code)].append(key)
+
+    borders: Dict[str, Dict[str, float]] = defaultdict(dict)
+    for (first, second), segments in shared.items():
+        length = sum(segment_km(a, b) for a, b in segments)
+        borders[first][second] = borders[first].get(second, 0.0) + length
+        borders[second][first] = borders[second].get(first, 0.0) + length
+    return borders
+
+
+def main():
+    """Main execution"""
+    script_dir = Path(__file__).parent
+    resources_dir = script_dir.parent / "resources"
+    boundaries_file = resources_dir / "countries_50m.geojson"
+    database_file = resources_dir / "countries_v2.json"
+    output_file = resources_dir / "countries_spatial.json"
+
+    print("\n" + "="*60)
+    print("Spatial Precompute")
+    print("="*60)
+
+    if not boundaries_file.exists():
+        print(f"\n❌ Not found: {boundaries_file}")
+        print("   Run: node scripts/02_process_boundaries.js")
+        return
+
+    with open(boundaries_file, 'rb') as f:
+        countries = polygons_by_country(jsoncodec.load(f))
+
+    start = time.perf_counter()
+    boxes = {code: bounding_box(polygons) for code, polygons in countries.items()}
+    box_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    centroids = {code: visual_centroid(polygons) for code, polygons in countries.items()}
+    centroid_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    borders = shared_borders(countries)
+    border_time = time.perf_counter() - start
+
+    spatial = {}
+    for code in sorted(countries):
+        neighbours = sorted(borders.get(code, {}).items(), key=lambda item: (-item[1], item[0]))
+        spatial[code] = {
+            'bbox': boxes[code],
+            'centroid': centroids[code],
+            'neighbors': [other for other, _ in neighbours],
+            'border_km': {other: round(km, 1) for other, km in neighbours}
+        }
+
+    write_atomic(output_file, encode({
+        'spatial_version': SPATIAL_VERSION,
+        'generated_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'source': 'Natural Earth 50m (countries_50m.geojson)',
+        'entities': spatial
+    }))
+
+    pairs = sum(len(n) for n in borders.values()) // 2
+    print(f"\n✅ Spatial data for {len(spatial)} countries")
+    print(f"   Bounding boxes:   {box_time * 1000:>7.0f} ms")
+    print(f"   Visual centroids: {centroid_time * 1000:>7.0f} ms")
+    print(f"   Adjacency:        {border_time * 1000:>7.0f} ms ({pairs} neighbouring pairs)")
+    if database_file.exists():
+        with open(database_file, 'rb') as f:
+            entities = jsoncodec.load(f).get('entities', {})
+        missing = sorted(set(countries) - set(entities))
+        if missing:
+            print(f"⚠️  Boundaries without an entity in {database_file.name}: {', '.join(missing)}")
+    print(f"📁 Saved to: {output_file}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
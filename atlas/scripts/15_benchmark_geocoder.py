@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+"""
+Geocoder Benchmark
+Measures the lookup rate of the two-level geocoder against a flat polygon scan
+
+The flat scan is what resolving a point took before viewer/geocoder.py:
+test every country polygon, then every polygon in regions_10m.geojson,
+each behind a bounding-box check. The geocoder finds the country through a
+grid and then searches only that country's admin-1 polygons. Both are run
+on the same random points - half spread over the world, half inside the
+countries with regional boundaries - and their answers are compared.
+
+Reads the same files as serve.py (countries_50m.geojson, regions_10m.geojson,
+regional_flags.json, countries_v2.json); writes nothing.
+
+Usage: python3 15_benchmark_geocoder.py [--points 20000] [--flat-points 500]
+"""
+
+import pickle
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "viewer"))
+
+from geocoder import Geocoder, polygons_of  # noqa: E402
+from indexes import (BOUNDARIES_FILE, COUNTRIES_FILE, REGIONAL_FLAGS_FILE, REGIONS_FILE,  # noqa: E402
+                     build_countries, clean_name, load_resources)
+
+
+def ring_contains(ring, x: float, y: float) -> bool:
+    inside = False
+    for i in range(len(ring) - 1):
+        ax, ay = ring[i][0], ring[i][1]
+        bx, by = ring[i + 1][0], ring[i + 1][1]
+        if (ay > y) != (by > y) and x < ax + (y - ay) * (bx - ax) / (by - ay):
+            inside = not inside
+    return inside
+
+
+class FlatScan:
+    """Every polygon in one list, tested in turn behind its bounding box"""
+
+    def __init__(self, collection: Optional[Dict[str, Any]]):
+        self.polygons: List[Tuple[Tuple[float, float, float, float], list, Dict[str, Any]]] = []
+        for feature in (collection or {}).get('features', []):
+            value = feature.get('properties') or {}
+            for polygon in polygons_of(feature.get('geometry')):
+                xs = [p[0] for p in polygon[0]]
+                ys = [p[1] for p in polygon[0]]
+                self.polygons.append(((min(xs), min(ys), max(xs), max(ys)), polygon, value))
+
+    def lookup(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+        """Properties of the first feature containing the point"""
+        for (west, south, east, north), polygon, value in self.polygons:
+            if west <= lon <= east and south <= lat <= north:
+                if sum(ring_contains(ring, lon, lat) for ring in polygon) % 2:
+                    return value
+        return None
+
+
+def sample_points(regions: Dict[str, Any], count: int) -> List[Tuple[float, float]]:
+    """Half uniform over the inhabited latitudes, half inside regional-boundary countries"""
+    random.seed(42)
+    boxes = []
+    for feature in regions.get('features', []):
+        for polygon in polygons_of(feature.get('geometry')):
+            xs = [p[0] for p in polygon[0]]
+            ys = [p[1] for p in polygon[0]]
+            boxes.append((min(xs), min(ys), max(xs), max(ys)))
+
+    points = []
+    for i in range(count):
+        if i % 2 and boxes:
+            west, south, east, north = random.choice(boxes)
+            points.append((random.uniform(south, north), random.uniform(west, east)))
+        else:
+            points.append((random.uniform(-60.0, 75.0), random.uniform(-180.0, 180.0)))
+    return points
+
+
+def rate(lookup, points) -> Tuple[float, list]:
+    """(lookups per second, answers)"""
+    start = time.perf_counter()
+    answers = [lookup(lat, lon) for lat, lon in points]
+    return len(points) / (time.perf_counter() - start), answers
+
+
+def main():
+    """Main execution"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the two-level geocoder')
+    parser.add_argument('--points', type=int, default=20000, help='Points for the geocoder')
+    parser.add_argument('--flat-points', type=int, default=500,
+                        help='Points for the (much slower) flat scan, also used for the comparison')
+    args = parser.parse_args()
+
+    atlas_dir = Path(__file__).resolve().parent.parent
+
+    print("\n" + "="*60)
+    print("Geocoder Benchmark")
+    print("="*60)
+
+    resources = load_resources(atlas_dir, (BOUNDARIES_FILE, REGIONS_FILE, REGIONAL_FLAGS_FILE, COUNTRIES_FILE))
+    if resources[BOUNDARIES_FILE] is None:
+        print(f"\n❌ Boundaries not found: {atlas_dir / BOUNDARIES_FILE}")
+        print("   Run: node scripts/02_process_boundaries.js")
+        return
+    if resources[REGIONS_FILE] is None:
+        print(f"\n⚠️  Regions not found: {atlas_dir / REGIONS_FILE} - benchmarking countries only")
+    regions = resources[REGIONS_FILE] or {}
+
+    start = time.perf_counter()
+    geocoder = Geocoder(resources[BOUNDARIES_FILE], regions, resources[REGIONAL_FLAGS_FILE],
+                        build_countries(resources))
+    build_time = time.perf_counter() - start
+    size = len(pickle.dumps(geocoder, protocol=5))
+
+    flat_countries = FlatScan(resources[BOUNDARIES_FILE])
+    flat_regions = FlatScan(regions)
+
+    def flat_lookup(lat, lon):
+        country = clean_name((flat_countries.lookup(lat, lon) or {}).get('iso_a2')) or None
+        region = flat_regions.lookup(lat, lon) or {}
+        # A region counts only inside its own country's boundary, as in the geocoder
+        if clean_name(region.get('iso_a2')) != country:
+            return country, None
+        return country, clean_name(region.get('iso_3166_2')) or None
+
+    def indexed_lookup(lat, lon):
+        result = geocoder.lookup(lat, lon)
+        return (result['country'], result['region']) if result else (None, None)
+
+    points = sample_points(regions, args.points)
+    geocoder_rate, _ = rate(geocoder.lookup, points)
+    country_rate, _ = rate(geocoder.country_of, points)
+
+    flat_sample = points[:args.flat_points]
+    flat_rate, flat_answers = rate(flat_lookup, flat_sample)
+    _, indexed_answers = rate(indexed_lookup, flat_sample)
+    mismatches = sum(a != b for a, b in zip(flat_answers, indexed_answers))
+
+    in_region = sum(1 for _, region in indexed_answers if region)
+    flagged = sum(1 for lat, lon in flat_sample
+                  if (geocoder.lookup(lat, lon) or {}).get('flag_type') == 'regional')
+
+    print(f"\n✅ Index built in {build_time:.2f}s: {len(geocoder.countries)} countries, "
+          f"{len(geocoder.regions)} regions in {len(geocoder.region_indexes)} countries "
+          f"({size / 1024:.0f} KB pickled)")
+    print(f"\n   {'':26} {'Lookups/s':>12} {'µs/lookup':>11}")
+    for label, value in (("Geocoder (country+region)", geocoder_rate),
+                         ("Geocoder (country only)", country_rate),
+                         ("Flat scan", flat_rate)):
+        print(f"   {label:26} {value:>12,.0f} {1e6 / value:>11.1f}")
+    print(f"\n📊 {geocoder_rate / flat_rate:,.0f}x faster than the flat scan; "
+          f"{in_region} of {len(flat_sample)} sample points in a region, {flagged} with a regional flag")
+    if mismatches:
+        print(f"⚠️  {mismatches} of {len(flat_sample)} points resolved differently from the flat scan")
+    else:
+        print(f"✅ Same answers as the flat scan for all {len(flat_sample)} sample points")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+"""
+Record Memory Benchmark
+Compares the memory of records.py's compact records with plain json.load dicts
+
+Each representation is loaded from the resource file under tracemalloc; the
+memory still allocated once loading returns is what a consumer keeps for
+as long as it holds the data (peak includes the transient parse). Load time
+is measured in a separate run without tracing. Every record is then checked
+against the JSON it came from.
+
+Usage: python3 16_benchmark_records.py
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+from records import load_airports, load_countries
+
+
+def measure(load: Callable[[], Any]) -> Tuple[Any, Dict[str, float]]:
+    """(loaded value, retained/peak bytes and load seconds)"""
+    gc.collect()
+    start = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    value = load()
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, {'retained': retained, 'peak': peak, 'seconds': elapsed}
+
+
+def cleaned(record: Dict[str, Any]) -> Dict[str, Any]:
+    """record with strings stripped of NUL padding and spaces, as the loaders do"""
+    return {k: v.replace('\x00', '').strip() if isinstance(v, str) else v for k, v in record.items()}
+
+
+def load_json(path: Path, collection: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)[collection]
+
+
+def main():
+    """Main execution"""
+    script_dir = Path(__file__).parent
+    resources_dir = script_dir.parent / "resources"
+    airports_file = resources_dir / "airports_iata.json"
+    countries_file = resources_dir / "countries_v2.json"
+
+    print("\n" + "="*60)
+    print("Record Memory Benchmark")
+    print("="*60)
+
+    for path, hint in ((airports_file, "node scripts/03_build_airports.js"),
+                       (countries_file, "node scripts/05_build_unified_db.js")):
+        if not path.exists():
+            print(f"\n❌ Not found: {path}")
+            print(f"   Run: {hint}")
+            return
+
+    airport_dicts, airport_dict_stats = measure(lambda: load_json(airports_file, 'airports'))
+    airport_table, airport_table_stats = measure(lambda: load_airports(airports_file))
+    country_dicts, country_dict_stats = measure(lambda: load_json(countries_file, 'entities'))
+    country_records, country_record_stats = measure(lambda: load_countries(countries_file))
+
+    rows = (("Airports: dicts", airport_dict_stats, len(airport_dicts)),
+            ("Airports: AirportTable", airport_table_stats, len(airport_table)),
+            ("Countries: dicts", country_dict_stats, len(country_dicts)),
+            ("Countries: Country", country_record_stats, len(country_records)))
+
+    print(f"\n   {'':24} {'Retained':>10} {'Peak':>10} {'Per record':>11} {'Load':>8}")
+    for label, stats, count in rows:
+        print(f"   {label:24} {stats['retained'] / 2**20:>8.2f}MB {stats['peak'] / 2**20:>8.2f}MB "
+              f"{stats['retained'] / count:>10,.0f}B {stats['seconds'] * 1000:>6.0f}ms")
+
+    print(f"\n📊 Airports: {airport_dict_stats['retained'] / airport_table_stats['retained']:.1f}x smaller; "
+          f"countries: {country_dict_stats['retained'] / country_record_stats['retained']:.1f}x smaller")
+
+    # Decoding the factbook text of one country on demand
+    sample = list(country_records.values())
+    start = time.perf_counter()
+    for country in sample:
+        country.government
+    print(f"   Lazy factbook access: {(time.perf_counter() - start) / len(sample) * 1e6:.0f} µs per country")
+
+    mismatches = 0
+    for airport in airport_dicts.values():
+        record = airport_table.get(airport['iata'])
+        if record is None or record.to_dict() != cleaned(dict(airport, iata=airport['iata'].upper())):
+            mismatches += 1
+    for code, entity in country_dicts.items():
+        if country_records[code].entity() != entity:
+            mismatches += 1
+
+    if mismatches:
+        print(f"\n⚠️  {mismatches} records differ from the JSON")
+    else:
+        print("\n✅ All records match the JSON")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+"""
+Name Index Builder
+Builds the name -> ISO code index used to join scraped Factbook data to the database
+
+Collects country names from the FIPS mapping (fips_iso_mapping.json, as
+used by 04_extract_factbook_iso.py) and the Natural Earth names in
+countries_v2.json, and saves them for NameIndex (see name_index.py), which
+06_scrape_factbook_2025.py uses to give every scraped slug an ISO code.
+
+If a scrape (cia_factbook_2025.json) exists, every slug in it is resolved
+and the matches are reported by kind, so new or renamed Factbook pages show
+up before they reach the build.
+
+Output: data/cia_factbook/name_index.json
+
+Usage: python3 17_build_name_index.py
+"""
+
+import json
+import time
+from collections import Counter
+from pathlib import Path
+
+from name_index import MIN_ISO_CONFIDENCE, NON_COUNTRIES, NameIndex, normalize
+from export_utils import write_atomic
+
+
+def main():
+    """Main execution"""
+    script_dir = Path(__file__).parent
+    base_dir = script_dir.parent
+    mapping_file = script_dir / "fips_iso_mapping.json"
+    countries_file = base_dir / "resources" / "countries_v2.json"
+    data_dir = base_dir / "data" / "cia_factbook"
+    scraped_file = data_dir / "cia_factbook_2025.json"
+    output_file = data_dir / "name_index.json"
+
+    print("\n" + "="*60)
+    print("Name Index Builder")
+    print("="*60)
+
+    mapping = entities = None
+    if mapping_file.exists():
+        with open(mapping_file, 'r', encoding='utf-8') as f:
+            mapping = json.load(f)
+    else:
+        print(f"\n⚠️  FIPS to ISO mapping not found: {mapping_file} - using Natural Earth names only")
+    if countries_file.exists():
+        with open(countries_file, 'r', encoding='utf-8') as f:
+            entities = json.load(f).get('entities', {})
+    else:
+        print(f"\n⚠️  Database not found: {countries_file} - using the FIPS mapping only")
+    if mapping is None and entities is None:
+        print("\n❌ No names to index")
+        return
+
+    start = time.perf_counter()
+    index = NameIndex.from_sources(mapping, entities)
+    elapsed = time.perf_counter() - start
+
+    data_dir.mkdir(parents=True, exist_ok=True)
+    write_atomic(output_file, json.dumps(index.to_dict(), ensure_ascii=False).encode('utf-8'))
+
+    sources = Counter(source for _, _, source in index.names)
+    print(f"\n✅ Indexed {len(index.names)} names for {len({iso for _, iso, _ in index.names})} codes "
+          f"({elapsed * 1000:.0f} ms)")
+    print(f"   {', '.join(f'{source}: {count}' for source, count in sorted(sources.items()))}")
+    print(f"📁 Saved to: {output_file}")
+
+    if scraped_file.exists():
+        with open(scraped_file, 'r', encoding='utf-8') as f:
+            scraped = json.load(f).get('countries', {})
+
+        start = time.perf_counter()
+        results = {slug: index.resolve(slug) for slug in scraped}
+        elapsed = time.perf_counter() - start
+
+        matches = Counter(result['match'] if result else
+                          'not a country' if normalize(slug) in NON_COUNTRIES else 'unresolved'
+                          for slug, result in results.items())
+        print(f"\n📊 Resolved {len(scraped)} scraped slugs in {elapsed * 1000:.1f} ms: "
+              f"{', '.join(f'{kind} {count}' for kind, count in matches.most_common())}")
+        for slug, result in sorted(results.items()):
+            if result is None and normalize(slug) not in NON_COUNTRIES:
+                print(f"   ⚠️  {slug}: no match")
+            elif result is not None and result['confidence'] < MIN_ISO_CONFIDENCE:
+                print(f"   ⚠️  {slug}: {result['iso']} ({result['match']}, confidence {result['confidence']})")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
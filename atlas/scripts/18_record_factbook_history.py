@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+"""
+Factbook History Recorder
+Appends weekly Factbook extractions to the columnar history store
+
+04_extract_factbook_iso.py records every new extraction itself; this script
+adds extractions kept from earlier runs (oldest first, by their extracted_at
+date) and reports what the store holds. A week that is already recorded is
+skipped, so running it twice changes nothing.
+
+The newest week is read back and compared with the extraction it came from,
+and a population series over the last 52 weeks is timed.
+
+Output: data/cia_factbook/history/
+
+Usage: python3 18_record_factbook_history.py [extraction.json ...]
+"""
+
+import json
+import time
+from pathlib import Path
+
+from factbook_history import FactbookHistory, flatten, week_of
+
+SERIES_FIELD = 'people.population.total'
+SERIES_WEEKS = 52
+
+
+def main():
+    """Main execution"""
+    import argparse
+
+    script_dir = Path(__file__).parent
+    data_dir = script_dir.parent / "data" / "cia_factbook"
+
+    parser = argparse.ArgumentParser(description='Append Factbook extractions to the weekly history')
+    parser.add_argument('extractions', nargs='*', type=Path,
+                        default=[data_dir / "cia_factbook_2025_iso.json"],
+                        help='cia_factbook_2025_iso.json files (default: the current extraction)')
+    parser.add_argument('--history', type=Path, default=data_dir / "history",
+                        help='history directory')
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("Factbook History Recorder")
+    print("="*60)
+
+    documents = []
+    for path in args.extractions:
+        if not path.exists():
+            print(f"\n❌ Not found: {path}")
+            print("   Run: python3 04_extract_factbook_iso.py")
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            documents.append((path, json.load(f)))
+    documents.sort(key=lambda item: item[1].get('extracted_at') or '')
+
+    history = FactbookHistory(args.history)
+    latest = None
+    for path, document in documents:
+        label = history.append(document)
+        if label is None:
+            print(f"\n⚠️  {path.name}: week {week_of(document['extracted_at'])} already recorded - skipped")
+        else:
+            print(f"\n✅ {path.name}: recorded as {label} ({len(document.get('countries', {}))} countries)")
+            latest = document
+
+    if not len(history):
+        print("\n❌ History is empty")
+        return
+
+    stored = sum(p.stat().st_size for p in args.history.iterdir() if p.is_file())
+    kinds = [info['kind'] for info in history.fields.values()]
+    print(f"\n📊 {len(history)} weeks ({history.weeks[0]} to {history.weeks[-1]}), "
+          f"{len(history.countries)} countries, {kinds.count('number')} number and "
+          f"{kinds.count('text')} text fields")
+    print(f"   Stored: {stored / 1024:.1f} KB ({stored / len(history) / 1024:.1f} KB per week)")
+    print(f"📁 Saved to: {args.history}")
+
+    if latest is not None:
+        snapshot = history.snapshot(-1)
+        expected = {code: flatten(entry) for code, entry in latest.get('countries', {}).items()}
+        mismatches = sorted(code for code in set(expected) | set(snapshot)
+                            if flatten(snapshot.get(code, {})) != expected.get(code))
+        if mismatches:
+            print(f"\n⚠️  {len(mismatches)} countries read back differently: {', '.join(mismatches[:10])}")
+        else:
+            print(f"\n✅ {history.weeks[-1]} reads back identical to the extraction")
+
+    if SERIES_FIELD in history.fields:
+        start = time.perf_counter()
+        series = FactbookHistory(args.history).series(SERIES_FIELD, last=SERIES_WEEKS)
+        elapsed = time.perf_counter() - start
+        print(f"   {SERIES_FIELD} of {len(series['values'])} countries over {len(series['weeks'])} weeks: "
+              f"{elapsed * 1000:.1f} ms")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+"""
+Trip Statistics
+Computes distance, countries and per-country aggregates of a trip log with NumPy
+
+Reads a CSV trip log (trip, from, to as IATA codes, or from_lat, from_lon,
+to_lat, to_lon; optional depart and arrive times), resolves every leg
+against airports_iata.json and aggregates it in batches with trip_stats.py.
+The result is written as columns:
+
+    {"summary": {...}, "trips": {"trip": [...], "distance_km": [...], ...},
+     "countries": {"country": [...], "departures": [...], ...}}
+
+With --benchmark N, N random legs between airports are generated and the
+legs per second of the engine are compared with computing them one record
+at a time.
+
+Output: <log>.stats.json next to the log (or --output)
+
+Usage: python3 19_trip_stats.py trips.csv [--output stats.json]
+       python3 19_trip_stats.py --benchmark 5000000
+"""
+
+import json
+import math
+import time
+from pathlib import Path
+
+from export_utils import write_atomic
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Record-by-record baseline only runs on this many legs
+BASELINE_LEGS = 200000
+
+
+def record_by_record(legs, airports_by_iata):
+    """Total km and per-country departures the way the back office did it: one dict per leg"""
+    from trip_stats import EARTH_RADIUS_KM
+
+    total = 0.0
+    departures = {}
+    for source, destination in legs:
+        a, b = airports_by_iata[source], airports_by_iata[destination]
+        phi1, phi2 = math.radians(a['lat']), math.radians(b['lat'])
+        h = (math.sin((phi2 - phi1) / 2) ** 2
+             + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(b['lon'] - a['lon']) / 2) ** 2)
+        total += 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+        departures[a['country']] = departures.get(a['country'], 0) + 1
+    return total, departures
+
+
+def benchmark(airports_file: Path, legs: int, batch_legs: int):
+    """Legs per second of TripStats on random legs vs the record-by-record loop"""
+    from records import AirportTable
+    from trip_stats import AirportIndex, TripStats
+
+    with open(airports_file, 'r', encoding='utf-8') as f:
+        airports = json.load(f)['airports']
+    index = AirportIndex(AirportTable(airports))
+
+    rng = np.random.default_rng(42)
+    source = index.codes[rng.integers(0, len(index), legs)]
+    destination = index.codes[rng.integers(0, len(index), legs)]
+    trip = np.sort(rng.integers(0, max(1, legs // 4), legs))
+
+    stats = TripStats(index)
+    start = time.perf_counter()
+    for offset in range(0, legs, batch_legs):
+        part = slice(offset, offset + batch_legs)
+        stats.add(trip[part], source[part], destination[part])
+    vectorized = time.perf_counter() - start
+    result = stats.result()
+
+    sample = min(legs, BASELINE_LEGS)
+    by_iata = {a['iata'].upper(): a for a in airports.values()}
+    pairs = list(zip(source[:sample].astype(str), destination[:sample].astype(str)))
+    start = time.perf_counter()
+    baseline_km, _ = record_by_record(pairs, by_iata)
+    baseline = time.perf_counter() - start
+
+    check = TripStats(index)
+    check.add(trip[:sample], source[:sample], destination[:sample])
+    check_km = float(check.trip_km.sum())
+
+    print(f"\n   {'':22} {'Legs':>10} {'Seconds':>9} {'Legs/s':>14}")
+    print(f"   {'TripStats (NumPy)':22} {legs:>10,} {vectorized:>9.3f} {legs / vectorized:>14,.0f}")
+    print(f"   {'Record by record':22} {sample:>10,} {baseline:>9.3f} {sample / baseline:>14,.0f}")
+    print(f"\n📊 {(legs / vectorized) / (sample / baseline):.0f}x faster; "
+          f"{result['summary']['trips']:,} trips, {result['summary']['distance_km']:,.0f} km")
+    if math.isclose(check_km, baseline_km, rel_tol=1e-9):
+        print(f"✅ Distances agree with the record-by-record loop ({baseline_km:,.1f} km over {sample:,} legs)")
+    else:
+        print(f"⚠️  Distances differ: {check_km:,.3f} km vs {baseline_km:,.3f} km")
+
+
+def main():
+    """Main execution"""
+    import argparse
+
+    script_dir = Path(__file__).parent
+    airports_file = script_dir.parent / "resources" / "airports_iata.json"
+
+    parser = argparse.ArgumentParser(description='Trip log statistics with NumPy')
+    parser.add_argument('log', nargs='?', type=Path, help='CSV trip log')
+    parser.add_argument('--output', type=Path, help='output file (default: <log>.stats.json)')
+    parser.add_argument('--batch', type=int, default=None, help='legs per batch')
+    parser.add_argument('--benchmark', type=int, metavar='LEGS', help='time LEGS random legs instead')
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("Trip Statistics")
+    print("="*60)
+
+    if not NUMPY_AVAILABLE:
+        print("\n❌ numpy not installed")
+        print("   Install with: pip3 install numpy")
+        return
+    from trip_stats import BATCH_LEGS, AirportIndex, TripStats, read_trip_log
+
+    if not airports_file.exists():
+        print(f"\n❌ Airports not found: {airports_file}")
+        print("   Run: node scripts/03_build_airports.js")
+        return
+    batch_legs = args.batch or BATCH_LEGS
+
+    if args.benchmark:
+        benchmark(airports_file, args.benchmark, batch_legs)
+        print("="*60)
+        return
+    if args.log is None:
+        parser.error('a trip log or --benchmark is required')
+    if not args.log.exists():
+        print(f"\n❌ Trip log not found: {args.log}")
+        return
+
+    index = AirportIndex.load(airports_file)
+    stats = TripStats(index)
+    labels = {}
+    start = time.perf_counter()
+    for batch in read_trip_log(args.log, labels, batch_legs):
+        stats.add(**batch)
+    result = stats.result(list(labels))
+    elapsed = time.perf_counter() - start
+
+    output_file = args.output or args.log.with_suffix('.stats.json')
+    write_atomic(output_file, json.dumps(result, ensure_ascii=False).encode('utf-8'))
+
+    summary = result['summary']
+    print(f"\n✅ {summary['legs']:,} legs in {summary['trips']:,} trips ({elapsed:.2f} s)")
+    print(f"   Distance: {summary['distance_km']:,.1f} km, countries: {summary['countries']}")
+    if summary['longest_leg']:
+        leg = summary['longest_leg']
+        print(f"   Longest leg: {leg['from'] or '?'} -> {leg['to'] or '?'} "
+              f"({leg['distance_km']:,.1f} km, trip {leg['trip']})")
+    if summary['unresolved_legs']:
+        print(f"⚠️  {summary['unresolved_legs']:,} legs with an unknown airport or no coordinates")
+    print(f"📁 Saved to: {output_file}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
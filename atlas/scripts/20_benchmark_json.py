@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+"""
+JSON Codec Benchmark
+Compares the jsoncodec.py backends on the resource files
+
+Every backend decodes each file, encodes it back compact (as serve.py sends
+it) and pretty (indent=2, as the extractors and the scraper write it), and
+writes the pretty form to a file the way the pipeline did before
+(json.dump to a text file) and does now (jsoncodec.dump). Times are the best
+of --repeat runs. Each backend's output is then compared with the stdlib's:
+byte-identical, or else equal once parsed.
+
+Usage: python3 20_benchmark_json.py [--repeat 5] [file.json ...]
+"""
+
+import json
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "viewer"))
+
+import jsoncodec  # noqa: E402
+
+
+def best_of(repeat: int, run: Callable[[], Any]) -> float:
+    """Fastest of repeat runs, in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def equivalence(expected: bytes, actual: bytes) -> str:
+    """'identical', 'equal' (same value once parsed) or 'DIFFERENT'"""
+    if actual == expected:
+        return 'identical'
+    return 'equal' if json.loads(actual) == json.loads(expected) else 'DIFFERENT'
+
+
+def received_over_socket(data: Any) -> bytes:
+    """What jsoncodec.send puts on a connected socket"""
+    left, right = socket.socketpair()
+    chunks = []
+    with left, right:
+        reader = threading.Thread(target=lambda: chunks.extend(iter(lambda: right.recv(1 << 16), b'')))
+        reader.start()
+        jsoncodec.send(data, left)
+        left.shutdown(socket.SHUT_WR)
+        reader.join()
+    return b''.join(chunks)
+
+
+def benchmark_file(path: Path, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Timings and equivalence per backend for one file"""
+    raw = path.read_bytes()
+    value = json.loads(raw)
+    expected = {'compact': json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+                'pretty': json.dumps(value, ensure_ascii=False, indent=2).encode('utf-8')}
+
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        target = Path(temp_dir) / path.name
+
+        def write_stdlib():
+            with open(target, 'w', encoding='utf-8') as f:
+                json.dump(value, f, indent=2, ensure_ascii=False)
+
+        for name in jsoncodec.BACKENDS:
+            jsoncodec.use(name)
+
+            def write_codec():
+                with open(target, 'wb') as f:
+                    jsoncodec.dump(value, f, pretty=True)
+
+            results[name] = {
+                'decode': best_of(repeat, lambda: jsoncodec.loads(raw)),
+                'compact': best_of(repeat, lambda: jsoncodec.dumps(value)),
+                'pretty': best_of(repeat, lambda: jsoncodec.dumps(value, pretty=True)),
+                'file': best_of(repeat, write_codec),
+                'decoded': 'equal' if jsoncodec.loads(raw) == value else 'DIFFERENT',
+                'compact_output': equivalence(expected['compact'], jsoncodec.dumps(value)),
+                'pretty_output': equivalence(expected['pretty'], jsoncodec.dumps(value, pretty=True)),
+                'file_output': equivalence(expected['pretty'], target.read_bytes()),
+                'socket_output': equivalence(expected['compact'], received_over_socket(value)),
+            }
+        results['json.dump (text file)'] = {'file': best_of(repeat, write_stdlib)}
+    jsoncodec.use()
+    return results
+
+
+def main():
+    """Main execution"""
+    import argparse
+
+    script_dir = Path(__file__).parent
+    resources_dir = script_dir.parent / "resources"
+
+    parser = argparse.ArgumentParser(description='Benchmark the jsoncodec.py backends')
+    parser.add_argument('files', nargs='*', type=Path, help='JSON files (default: resources/*.json, *.geojson)')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement (best is kept)')
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("JSON Codec Benchmark")
+    print("="*60)
+
+    files = args.files or sorted([*resources_dir.glob('*.json'), *resources_dir.glob('*.geojson')])
+    files = [path for path in files if path.is_file()]
+    if not files:
+        print(f"\n❌ No JSON files in {resources_dir}")
+        print("   Run: node scripts/05_build_unified_db.js")
+        return
+
+    print(f"\n   Backends: {', '.join(jsoncodec.BACKENDS)} (default: {jsoncodec.BACKEND})")
+    if 'orjson' not in jsoncodec.BACKENDS:
+        print("⚠️  orjson not installed - only the stdlib backend is available")
+        print("   Install with: pip3 install orjson")
+
+    totals: Dict[str, Dict[str, float]] = {}
+    problems = []
+    for path in files:
+        size = path.stat().st_size
+        results = benchmark_file(path, args.repeat)
+        print(f"\n📄 {path.name} ({size / 2**20:.2f} MB)")
+        print(f"   {'':22} {'Decode':>9} {'Compact':>9} {'Pretty':>9} {'To file':>9}")
+        for name, result in results.items():
+            cells = [f"{result[key] * 1000:>7.1f}ms" if key in result else f"{'':>9}"
+                     for key in ('decode', 'compact', 'pretty', 'file')]
+            print(f"   {name:22} {' '.join(cells)}")
+            for key in ('decode', 'compact', 'pretty', 'file'):
+                if key in result:
+                    totals.setdefault(name, {}).setdefault(key, 0.0)
+                    totals[name][key] += result[key]
+            outputs = {key: result[key] for key in result if key == 'decoded' or key.endswith('_output')}
+            if outputs:
+                print(f"   {'':22} " + ', '.join(f"{key.replace('_output', '')} {state}"
+                                             for key, state in outputs.items()))
+            problems += [f"{path.name}: {name} {key}" for key, state in outputs.items() if state == 'DIFFERENT']
+
+    best = jsoncodec.BACKEND
+    if best != 'json':
+        stdlib, fast = totals['json'], totals[best]
+        print(f"\n📊 {best} vs stdlib over {len(files)} files: decode {stdlib['decode'] / fast['decode']:.1f}x, "
+              f"compact {stdlib['compact'] / fast['compact']:.1f}x, pretty {stdlib['pretty'] / fast['pretty']:.1f}x, "
+              f"to file {totals['json.dump (text file)']['file'] / fast['file']:.1f}x faster than json.dump")
+    if problems:
+        print(f"\n⚠️  {len(problems)} outputs differ from the stdlib: {'; '.join(problems)}")
+    else:
+        print("\n✅ Every backend decodes to the same values and writes the same JSON as the stdlib")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
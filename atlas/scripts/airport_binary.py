@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+
+"""
+Compact binary airport database
+
+Writes and reads airports_iata.bin, a memory-mapped alternative to
+airports_iata.json. Opening the file costs one mmap call instead of parsing
+2.2 MB of JSON, and lookups by IATA or ICAO are binary searches directly over
+the mapped bytes.
+
+File layout (little-endian):
+- Header: magic, format version, record size, record count, section offsets
+- Records: fixed-width entries sorted by IATA code
+- ICAO index: record numbers sorted by ICAO code
+- Latitude column: float32 per record
+- Longitude column: float32 per record
+- String heap: UTF-8 airport names and cities
+"""
+
+import mmap
+import struct
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator, List
+
+from export_utils import write_atomic
+
+MAGIC = b'ATAP'
+FORMAT_VERSION = 1
+
+# magic, version, record_size, count, icao_index, lat_column, lon_column, heap
+HEADER = struct.Struct('<4sHHIIIII')
+
+# iata, icao, country, pad, elevation, name_offset, city_offset,
+# name_length, city_length, pad
+RECORD = struct.Struct('<3s4s2sxhIIBB2x')
+
+INDEX_ENTRY = struct.Struct('<I')
+# Four bytes of a code field read as one big-endian integer
+CODE_KEY = struct.Struct('>I')
+COORDINATE = struct.Struct('<f')
+
+NO_ELEVATION = -32768
+NO_STRING = 0xFFFFFFFF
+
+
+def _pad(code: Optional[str], width: int) -> bytes:
+    """Encode a fixed-width upper-case ASCII code, padded with spaces"""
+    return (code or '').upper().encode('ascii')[:width].ljust(width)
+
+
+def write_airport_binary(airports: Dict[str, Dict[str, Any]], output_file: Path) -> int:
+    """Write airports (as loaded from airports_iata.json) to a binary file
+
+    Returns the number of bytes written.
+    """
+    entries = sorted(airports.values(), key=lambda a: _pad(a['iata'], 3))
+    count = len(entries)
+
+    heap = bytearray()
+    heap_offsets: Dict[str, int] = {}
+
+    def add_string(value: Optional[str]) -> tuple:
+        if value is None:
+            return NO_STRING, 0
+        encoded = value.encode('utf-8')[:255]
+        offset = heap_offsets.get(value)
+        if offset is None:
+            offset = len(heap)
+            heap_offsets[value] = offset
+            heap.extend(encoded)
+        return offset, len(encoded)
+
+    records = bytearray()
+    for airport in entries:
+        name_offset, name_length = add_string(airport.get('name'))
+        city_offset, city_length = add_string(airport.get('city'))
+        elevation = airport.get('elevation')
+        records += RECORD.pack(
+            _pad(airport['iata'], 3),
+            _pad(airport['icao'], 4),
+            _pad(airport.get('country'), 2),
+            NO_ELEVATION if elevation is None else max(-32767, min(32767, int(elevation))),
+            name_offset,
+            city_offset,
+            name_length,
+            city_length
+        )
+
+    icao_order = sorted(range(count), key=lambda i: _pad(entries[i]['icao'], 4))
+    icao_index = b''.join(INDEX_ENTRY.pack(i) for i in icao_order)
+    lat_column = struct.pack(f'<{count}f', *(a['lat'] for a in entries))
+    lon_column = struct.pack(f'<{count}f', *(a['lon'] for a in entries))
+
+    icao_offset = HEADER.size + len(records)
+    lat_offset = icao_offset + len(icao_index)
+    lon_offset = lat_offset + len(lat_column)
+    heap_offset = lon_offset + len(lon_column)
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size, count,
+                         icao_offset, lat_offset, lon_offset, heap_offset)
+
+    # Readers keep the old file mapped, so it is replaced rather than rewritten
+    output_file = Path(output_file)
+    write_atomic(output_file, b''.join((header, records, icao_index, lat_column, lon_column, heap)))
+
+    return output_file.stat().st_size
+
+
+def _code_key(code: Any) -> int:
+    """Fixed-width code bytes as an integer, ordered as the bytes are"""
+    return int.from_bytes(code, 'big')
+
+
+class _CodeColumn:
+    """Sequence view over one fixed-width code field, for bisect
+
+    Items are _code_key integers unpacked straight from the mapping, without
+    copying each probed code into a bytes object. A 3-byte code is read with
+    the byte after it (the next field) and shifted out.
+    """
+
+    def __init__(self, index: 'AirportBinaryIndex', field_offset: int, width: int,
+                 order_offset: Optional[int] = None):
+        self.index = index
+        self.field_offset = field_offset
+        self.width = width
+        self.order_offset = order_offset
+        self.shift = (CODE_KEY.size - width) * 8
+
+    def __len__(self) -> int:
+        return self.index.count
+
+    def __getitem__(self, position: int) -> int:
+        record = position
+        if self.order_offset is not None:
+            record = INDEX_ENTRY.unpack_from(self.index.buffer,
+                                             self.order_offset + position * INDEX_ENTRY.size)[0]
+        start = HEADER.size + record * RECORD.size + self.field_offset
+        return CODE_KEY.unpack_from(self.index.buffer, start)[0] >> self.shift
+
+
+class AirportBinaryIndex:
+    """Read-only, memory-mapped view of airports_iata.bin"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, record_size, self.count, self.icao_offset,
+         self.lat_offset, self.lon_offset, self.heap_offset) = HEADER.unpack_from(self.buffer)
+
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not an airport binary file: {self.path}")
+        if version != FORMAT_VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"Unsupported airport binary format v{version} ({record_size}-byte records)")
+
+        self._iata_keys = _CodeColumn(self, 0, 3)
+        self._icao_keys = _CodeColumn(self, 3, 4, order_offset=self.icao_offset)
+
+    def close(self):
+        """Unmap the file"""
+        self.buffer.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for record in range(self.count):
+            yield self.record(record)
+
+    def _string(self, offset: int, length: int) -> Optional[str]:
+        if offset == NO_STRING:
+            return None
+        start = self.heap_offset + offset
+        return self.buffer[start:start + length].decode('utf-8', errors='replace')
+
+    def record(self, number: int) -> Dict[str, Any]:
+        """Decode record number (in IATA order) into the airports_iata.json shape"""
+        (iata, icao, country, elevation, name_offset, city_offset,
+         name_length, city_length) = RECORD.unpack_from(self.buffer, HEADER.size + number * RECORD.size)
+
+        return {
+            'icao': icao.decode('ascii').rstrip(),
+            'iata': iata.decode('ascii').rstrip(),
+            'name': self._string(name_offset, name_length),
+            'city': self._string(city_offset, city_length),
+            'country': country.decode('ascii').rstrip() or None,
+            'lat': COORDINATE.unpack_from(self.buffer, self.lat_offset + number * COORDINATE.size)[0],
+            'lon': COORDINATE.unpack_from(self.buffer, self.lon_offset + number * COORDINATE.size)[0],
+            'elevation': None if elevation == NO_ELEVATION else elevation,
+            'timezone': None
+        }
+
+    def find_iata(self, iata: str) -> Optional[int]:
+        """Record number for an IATA code, or None"""
+        key = _code_key(_pad(iata, 3))
+        position = bisect_left(self._iata_keys, key)
+        if position < self.count and self._iata_keys[position] == key:
+            return position
+        return None
+
+    def find_icao(self, icao: str) -> Optional[int]:
+        """Record number for an ICAO code, or None"""
+        key = _code_key(_pad(icao, 4))
+        position = bisect_left(self._icao_keys, key)
+        if position < self.count and self._icao_keys[position] == key:
+            return INDEX_ENTRY.unpack_from(self.buffer, self.icao_offset + position * INDEX_ENTRY.size)[0]
+        return None
+
+    def get(self, iata: str) -> Optional[Dict[str, Any]]:
+        """Look up an airport by IATA code"""
+        number = self.find_iata(iata)
+        return None if number is None else self.record(number)
+
+    def get_by_icao(self, icao: str) -> Optional[Dict[str, Any]]:
+        """Look up an airport by ICAO code"""
+        number = self.find_icao(icao)
+        return None if number is None else self.record(number)
+
+    def coordinates(self, number: int) -> tuple:
+        """(lat, lon) for a record number without decoding strings"""
+        return (COORDINATE.unpack_from(self.buffer, self.lat_offset + number * COORDINATE.size)[0],
+                COORDINATE.unpack_from(self.buffer, self.lon_offset + number * COORDINATE.size)[0])
+
+    def iata_codes(self) -> List[str]:
+        """All IATA codes in sorted order"""
+        starts = (HEADER.size + i * RECORD.size for i in range(self.count))
+        return [self.buffer[start:start + 3].decode('ascii').rstrip() for start in starts]
+
+
+def open_airports(path: Path) -> AirportBinaryIndex:
+    """Open airports_iata.bin for lookups"""
+    return AirportBinaryIndex(path)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+"""
+Per-entity JSON diffs between two builds of countries_v2.json
+
+A patch only lists what changed, entity by entity:
+
+    {
+      "from": "2.0.0", "to": "2.0.1",
+      "meta":    {"set": [[["generated_at"], "2025-11-06"]], "unset": []},
+      "added":   {"XK": {...entity...}},
+      "removed": ["AN"],
+      "changed": {"GB": {"set": [[["people", "population", "total"], 69138192]],
+                         "unset": [["economy", "gdp", "note"]]}}
+    }
+
+Paths are lists of object keys; "meta" covers the top-level fields other than
+the entities. Objects are diffed key by key, while any other value
+(including arrays) is replaced as a whole when it differs. Unlike a JSON
+merge patch, this represents null values in the data unambiguously.
+
+apply_patch(old, patch) == new holds for every patch made by diff_builds.
+"""
+
+import copy
+from typing import Dict, Any, List, Tuple
+
+Path = List[str]
+
+
+def _diff_values(old: Any, new: Any, path: Path, sets: List[Tuple[Path, Any]], unsets: List[Path]):
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                unsets.append(path + [key])
+        for key, value in new.items():
+            if key not in old:
+                sets.append((path + [key], value))
+            else:
+                _diff_values(old[key], value, path + [key], sets, unsets)
+    elif old != new or type(old) is not type(new):
+        sets.append((path, new))
+
+
+def diff_objects(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List]:
+    """{'set': [[path, value]...], 'unset': [path...]} turning old into new"""
+    sets: List[Tuple[Path, Any]] = []
+    unsets: List[Path] = []
+    _diff_values(old, new, [], sets, unsets)
+    return {'set': [[p, v] for p, v in sets], 'unset': unsets}
+
+
+def diff_builds(old: Dict[str, Any], new: Dict[str, Any], from_id: str, to_id: str) -> Dict[str, Any]:
+    """Patch turning build old into build new"""
+    old_entities = old.get('entities', {})
+    new_entities = new.get('entities', {})
+
+    changed = {}
+    for code in sorted(set(old_entities) & set(new_entities)):
+        diff = diff_objects(old_entities[code], new_entities[code])
+        if diff['set'] or diff['unset']:
+            changed[code] = diff
+
+    return {
+        'from': from_id,
+        'to': to_id,
+        'meta': diff_objects({k: v for k, v in old.items() if k != 'entities'},
+                             {k: v for k, v in new.items() if k != 'entities'}),
+        'added': {code: new_entities[code] for code in sorted(set(new_entities) - set(old_entities))},
+        'removed': sorted(set(old_entities) - set(new_entities)),
+        'changed': changed
+    }
+
+
+def _apply_diff(target: Dict[str, Any], diff: Dict[str, List]):
+    for path in diff.get('unset', []):
+        parent = target
+        for key in path[:-1]:
+            parent = parent[key]
+        del parent[path[-1]]
+    for path, value in diff.get('set', []):
+        if not path:
+            raise ValueError('cannot replace the whole object')
+        parent = target
+        for key in path[:-1]:
+            parent = parent.setdefault(key, {})
+        parent[path[-1]] = copy.deepcopy(value)
+
+
+def apply_patch(build: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
+    """New build from an old one and a patch (the input is not modified)"""
+    result = {k: copy.deepcopy(v) for k, v in build.items() if k != 'entities'}
+    entities = dict(build.get('entities', {}))
+
+    _apply_diff(result, patch.get('meta', {}))
+    for code in patch.get('removed', []):
+        entities.pop(code, None)
+    for code, diff in patch.get('changed', {}).items():
+        entity = copy.deepcopy(entities[code])
+        _apply_diff(entity, diff)
+        entities[code] = entity
+    for code, entity in patch.get('added', {}).items():
+        entities[code] = copy.deepcopy(entity)
+
+    result['entities'] = entities
+    return result
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+"""
+Helpers shared by the export scripts and the tile cache
+
+write_atomic() replaces a file via a temporary file in the same directory,
+so a reader (serve.py, the reloader) sees either the old or the new
+contents, never a partial write. encode() is the compact UTF-8 JSON every
+exported artefact is written and hashed in. clean_name() is
+indexes.clean_name, for the NUL-padded codes and names in Natural Earth
+properties.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "viewer"))
+
+from indexes import clean_name  # noqa: E402,F401
+
+
+def encode(value: Any) -> bytes:
+    """UTF-8 JSON without insignificant whitespace"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def write_atomic(path: Path, data: bytes):
+    """Write data to path via a temporary file and rename"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+
+"""
+Append-only weekly history of the extracted CIA Factbook
+
+04_extract_factbook_iso.py rewrites cia_factbook_2025_iso.json on every run,
+so last week's figures are gone once the new ones are written. FactbookHistory
+keeps every weekly extraction as columns, one per field, so a question like
+"population of every country over the last 52 weeks" reads one column
+instead of 52 JSON files:
+
+    history/
+      manifest.json        weeks, country codes, fields and their file sizes
+      present.col          one byte per country per week: in that extraction?
+      <field>.num          numbers: float64 per country per week, NaN if missing
+      <field>.txt          text: per week, only the countries whose value changed
+                           since the week before (count, rows, dictionary codes)
+      <field>.dict         each distinct value once, one JSON value per line
+      <field>.other.txt    values of a number field that are not numbers ("N/A"),
+      <field>.other.dict   as a text column next to the float64 one
+
+Fields are the leaves of a country entry as dotted paths
+("people.population.total", "geography.climate"). A field is a number
+field if its first value is a number, and a text field otherwise; text
+fields keep lists, booleans and numbers as JSON, so they read back with
+their type, and number fields read back as ints until a float turns up.
+Country codes keep their row for good; a new code gets the next row.
+Factbook text hardly changes from week to week, so a week of a text field
+usually costs a few bytes.
+
+Every file is only ever appended to. The manifest, written last and
+atomically, records how many bytes of each file belong to complete weeks;
+anything past that (an interrupted append) is cut off by the next append.
+"""
+
+import json
+import math
+import sys
+from array import array
+from datetime import date
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterable, Tuple, Union
+
+from export_utils import write_atomic
+
+HISTORY_VERSION = 2
+
+NO_VALUE = 0xFFFFFFFF
+
+# Top-level entry fields that are not stored as columns
+SKIPPED_FIELDS = {'code'}
+
+Value = Any
+
+
+def week_of(extracted_at: str) -> str:
+    """ISO week label of an extraction date ("2025-11-06" -> "2025-W45")"""
+    year, week, _ = date.fromisoformat(extracted_at[:10]).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def flatten(entry: Dict[str, Any], prefix: str = '') -> Dict[str, Any]:
+    """{dotted path: value} for the non-null leaves of a country entry"""
+    fields = {}
+    for key, value in entry.items():
+        if not prefix and key in SKIPPED_FIELDS:
+            continue
+        path = prefix + key
+        if isinstance(value, dict):
+            fields.update(flatten(value, path + '.'))
+        elif value is not None:
+            fields[path] = value
+    return fields
+
+
+def unflatten(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Nested entry for {dotted path: value}"""
+    entry: Dict[str, Any] = {}
+    for path, value in fields.items():
+        *parents, key = path.split('.')
+        node = entry
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[key] = value
+    return entry
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _pack(values: array) -> bytes:
+    """Little-endian bytes of an array"""
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+class FactbookHistory:
+    """Weekly Factbook extractions stored as append-only columns in a directory"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        manifest_file = self.directory / 'manifest.json'
+        if manifest_file.exists():
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('history_version') != HISTORY_VERSION:
+                raise ValueError(f"Unsupported history version {manifest.get('history_version')}")
+        else:
+            manifest = {'history_version': HISTORY_VERSION, 'weeks': [], 'countries': [],
+                        'present_bytes': 0, 'fields': {}}
+        self.manifest = manifest
+        self._columns: Dict[Tuple[str, str], Any] = {}
+
+    @property
+    def weeks(self) -> List[str]:
+        return [week['week'] for week in self.manifest['weeks']]
+
+    @property
+    def countries(self) -> List[str]:
+        return self.manifest['countries']
+
+    @property
+    def fields(self) -> Dict[str, Dict[str, Any]]:
+        return self.manifest['fields']
+
+    def __len__(self) -> int:
+        return len(self.manifest['weeks'])
+
+    def _read(self, name: str, size: int) -> bytes:
+        if not size:
+            return b''
+        with open(self.directory / name, 'rb') as f:
+            return f.read(size)
+
+    def _week_rows(self, first_week: int = 0) -> List[Tuple[int, int]]:
+        """(first row in the column file, row count) of every week from first_week on"""
+        rows = []
+        offset = 0
+        for week in self.manifest['weeks'][first_week:]:
+            rows.append((offset, week['countries']))
+            offset += week['countries']
+        return rows
+
+    def _present(self) -> List[array]:
+        key = ('present', '')
+        if key not in self._columns:
+            present = _unpack('B', self._read('present.col', self.manifest['present_bytes']))
+            self._columns[key] = [present[start:start + count] for start, count in self._week_rows()]
+        return self._columns[key]
+
+    def _numbers(self, field: str) -> List[array]:
+        """Per week (from the field's first week on), the values of every row"""
+        key = ('num', field)
+        if key not in self._columns:
+            info = self.fields[field]
+            values = _unpack('d', self._read(f'{field}.num', info['bytes']))
+            self._columns[key] = [values[start:start + count]
+                                  for start, count in self._week_rows(info['first_week'])]
+        return self._columns[key]
+
+    def _dictionary(self, stem: str, info: Dict[str, Any]) -> List[str]:
+        """The JSON lines of a text column's dictionary, undecoded"""
+        key = ('dict', stem)
+        if key not in self._columns:
+            data = self._read(f'{stem}.dict', info['dict_bytes'])
+            # JSON escapes newlines inside strings, so every line is one value
+            self._columns[key] = [line for line in data.decode('utf-8').split('\n') if line]
+        return self._columns[key]
+
+    def _codes(self, stem: str, info: Dict[str, Any]) -> List[array]:
+        """Per week (from the column's first week on), the dictionary code of every row"""
+        key = ('txt', stem)
+        if key not in self._columns:
+            data = _unpack('I', self._read(f'{stem}.txt', info['bytes']))
+            weeks = []
+            codes = array('I')
+            position = 0
+            for _, count in self._week_rows(info['first_week']):
+                codes = codes + array('I', [NO_VALUE]) * (count - len(codes))
+                changes = data[position]
+                rows = data[position + 1:position + 1 + changes]
+                values = data[position + 1 + changes:position + 1 + 2 * changes]
+                position += 1 + 2 * changes
+                for row, code in zip(rows, values):
+                    codes[row] = code
+                weeks.append(codes)
+                codes = array('I', codes)
+            self._columns[key] = weeks
+        return self._columns[key]
+
+    def _week_index(self, week: Union[int, str, None]) -> int:
+        weeks = self.weeks
+        if not weeks:
+            raise KeyError('History is empty')
+        if week is None:
+            return len(weeks) - 1
+        if isinstance(week, str):
+            if week not in weeks:
+                raise KeyError(f"No extraction for week {week}")
+            return weeks.index(week)
+        if not -len(weeks) <= week < len(weeks):
+            raise KeyError(f"No week {week}")
+        return week % len(weeks)
+
+    def _text(self, stem: str, info: Dict[str, Any]) -> List[List[Value]]:
+        """Per week (from the column's first week on), the decoded value of every row"""
+        dictionary = [json.loads(line) for line in self._dictionary(stem, info)]
+        return [[None if code == NO_VALUE else dictionary[code] for code in codes]
+                for codes in self._codes(stem, info)]
+
+    def _column(self, field: str) -> Tuple[int, List[List[Value]]]:
+        """(first week, per week the value of every row) of a field"""
+        info = self.fields.get(field)
+        if info is None:
+            raise KeyError(f"Unknown field: {field}")
+        if info['kind'] != 'number':
+            return info['first_week'], self._text(field, info)
+
+        integer = info.get('integer', False)
+        weeks = [[None if math.isnan(v) else int(v) if integer else v for v in values]
+                 for values in self._numbers(field)]
+        other = info.get('other')
+        if other is not None:
+            # Rows that held something other than a number are NaN in the .num file
+            for values, others in zip(weeks[other['first_week'] - info['first_week']:],
+                                      self._text(f'{field}.other', other)):
+                for row, value in enumerate(others):
+                    if value is not None:
+                        values[row] = value
+        return info['first_week'], weeks
+
+    def series(self, field: str, last: Optional[int] = None,
+               codes: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Values of one field over the last `last` weeks (all by default)
+
+        {'field', 'weeks': [labels], 'values': {code: [value per week]}}, with
+        None where a country had no value (or was not in that extraction).
+        """
+        first_week, column = self._column(field)
+        start = 0 if last is None else max(0, len(self) - last)
+        present = self._present()
+        rows = {code: i for i, code in enumerate(self.countries)}
+        selected = list(rows) if codes is None else [c for c in codes if c in rows]
+
+        values: Dict[str, List[Value]] = {code: [] for code in selected}
+        for w in range(start, len(self)):
+            week_values = column[w - first_week] if w >= first_week else ()
+            week_present = present[w]
+            for code in selected:
+                row = rows[code]
+                values[code].append(week_values[row] if row < len(week_values) and week_present[row] else None)
+
+        return {'field': field, 'weeks': self.weeks[start:], 'values': values}
+
+    def snapshot(self, week: Union[int, str, None] = None) -> Dict[str, Any]:
+        """One week's extraction as {code: entry}, in the extractor's shape without nulls"""
+        w = self._week_index(week)
+        present = self._present()[w]
+        entries: Dict[str, Dict[str, Any]] = {code: {} for i, code in enumerate(self.countries[:len(present)])
+                                              if present[i]}
+        for field, info in self.fields.items():
+            if w < info['first_week']:
+                continue
+            first_week, column = self._column(field)
+            for code, row in zip(self.countries, column[w - first_week]):
+                if row is not None and code in entries:
+                    entries[code][field] = row
+        return {code: dict(unflatten(fields), code=code) for code, fields in entries.items()}
+
+    def _truncate(self):
+        """Cut off whatever an interrupted append left past the recorded sizes"""
+        sizes = {'present.col': self.manifest['present_bytes']}
+        for field, info in self.fields.items():
+            if info['kind'] == 'number':
+                sizes[f'{field}.num'] = info['bytes']
+                text = {f'{field}.other': info['other']} if 'other' in info else {}
+            else:
+                text = {field: info}
+            for stem, text_info in text.items():
+                sizes[f'{stem}.txt'] = text_info['bytes']
+                sizes[f'{stem}.dict'] = text_info['dict_bytes']
+        for name, size in sizes.items():
+            path = self.directory / name
+            if path.exists() and path.stat().st_size != size:
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+
+    def _append_bytes(self, name: str, data: bytes):
+        with open(self.directory / name, 'ab') as f:
+            f.write(data)
+
+    def _append_text(self, stem: str, info: Dict[str, Any], values: List[Any], w: int):
+        """Append week w of a text column: the rows whose value changed, new values to the dictionary"""
+        previous = self._codes(stem, info)[-1] if info['first_week'] < w else array('I')
+        dictionary = self._dictionary(stem, info) if info['first_week'] < w else []
+        lookup = {line: code for code, line in enumerate(dictionary)}
+        new_lines = []
+        changed_rows = array('I')
+        changed_codes = array('I')
+        for row, value in enumerate(values):
+            if value is None:
+                code = NO_VALUE
+            else:
+                line = json.dumps(value, ensure_ascii=False)
+                code = lookup.get(line)
+                if code is None:
+                    code = lookup[line] = len(dictionary) + len(new_lines)
+                    new_lines.append(line)
+            if code != (previous[row] if row < len(previous) else NO_VALUE):
+                changed_rows.append(row)
+                changed_codes.append(code)
+
+        if new_lines:
+            dict_data = ''.join(line + '\n' for line in new_lines).encode('utf-8')
+            self._append_bytes(f'{stem}.dict', dict_data)
+            info['values'] += len(new_lines)
+            info['dict_bytes'] += len(dict_data)
+        data = _pack(array('I', [len(changed_rows)]) + changed_rows + changed_codes)
+        self._append_bytes(f'{stem}.txt', data)
+        info['bytes'] += len(data)
+
+    def append(self, extraction: Dict[str, Any]) -> Optional[str]:
+        """Add a cia_factbook_2025_iso.json document as the next week
+
+        Returns the week label, or None if that week is already recorded.
+        Weeks must be appended in order.
+        """
+        extracted_at = extraction.get('extracted_at')
+        if not extracted_at:
+            raise ValueError("Extraction has no 'extracted_at' date")
+        label = week_of(extracted_at)
+        weeks = self.weeks
+        if label in weeks:
+            return None
+        if weeks and label < weeks[-1]:
+            raise ValueError(f"Week {label} is older than the last recorded week {weeks[-1]}")
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._truncate()
+
+        entries = {code: flatten(entry) for code, entry in extraction.get('countries', {}).items()}
+        countries = self.manifest['countries']
+        known = set(countries)
+        countries.extend(sorted(code for code in entries if code not in known))
+        rows = len(countries)
+        w = len(weeks)
+
+        # Columns of this week, including fields seen for the first time
+        fields = self.fields
+        for entry in entries.values():
+            for field, value in entry.items():
+                if field not in fields:
+                    if _is_number(value):
+                        fields[field] = {'kind': 'number', 'first_week': w, 'bytes': 0, 'integer': True}
+                    else:
+                        fields[field] = {'kind': 'text', 'first_week': w, 'bytes': 0, 'values': 0, 'dict_bytes': 0}
+
+        present = array('B', (code in entries for code in countries))
+        self._append_bytes('present.col', _pack(present))
+        self.manifest['present_bytes'] += len(present)
+
+        for field, info in fields.items():
+            values = [entries[code].get(field) if code in entries else None for code in countries]
+            if info['kind'] != 'number':
+                self._append_text(field, info, values, w)
+                continue
+            column = array('d', (v if _is_number(v) else math.nan for v in values))
+            data = _pack(column)
+            self._append_bytes(f'{field}.num', data)
+            info['bytes'] += len(data)
+            if any(isinstance(v, float) for v in values):
+                info['integer'] = False
+            # Anything else ("N/A", a list) goes to a text column beside the numbers
+            others = [None if v is None or _is_number(v) else v for v in values]
+            if 'other' in info or any(v is not None for v in others):
+                other = info.setdefault('other', {'first_week': w, 'bytes': 0, 'values': 0, 'dict_bytes': 0})
+                self._append_text(f'{field}.other', other, others, w)
+
+        self.manifest['weeks'].append({'week': label, 'extracted_at': extracted_at,
+                                       'source_version': extraction.get('version'), 'countries': rows})
+        write_atomic(self.directory / 'manifest.json',
+                      json.dumps(self.manifest, ensure_ascii=False, indent=1).encode('utf-8'))
+        self._columns.clear()
+        return label
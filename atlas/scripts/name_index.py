@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+
+"""
+Country name resolution: Factbook slugs and free-text names -> ISO codes
+
+The live scraper (06_scrape_factbook_2025.py) keys countries by URL slug
+("united-kingdom", "korea-south"), while the extractor and the unified
+database key them by ISO 3166-1 alpha-2 code. NameIndex is built once from
+the FIPS mapping (fips_iso_mapping.json) and the Natural Earth names in
+countries_v2.json, and saved with its key and trigram tables
+(name_index.json), so loading it builds nothing and resolving a slug is a
+few dictionary lookups instead of a fuzzy comparison against every country.
+
+Every name is stored under several keys:
+
+- exact: lower-case, accent-free, NUL padding stripped, and repaired when
+  it was decoded twice ("Ã…land" -> "aland")
+- expanded: Natural Earth abbreviations spelled out ("St. Kitts and Nevis",
+  "Cook Is.", "Dem. Rep. Congo")
+- loose: the words sorted, without "the", "of", "and" or "islands", so
+  "Bahamas, The", "Korea, South" and "Micronesia, Federated States of"
+  match their usual word order
+- ALIASES: Factbook names that none of the sources spell the same way
+
+A name matched by none of these falls back to the trigram index: the
+candidate whose three-letter sequences are most similar (Dice coefficient)
+wins, and its confidence drops with the similarity. A key claimed by two
+different countries is dropped rather than guessed. NON_COUNTRIES (world,
+oceans, the EU) resolve to None.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+
+NAME_INDEX_VERSION = 2
+
+# Confidence of each kind of match; trigram matches scale TRIGRAM by the similarity
+CONFIDENCE = {'exact': 1.0, 'alias': 1.0, 'expanded': 0.95, 'loose': 0.9}
+TRIGRAM = 0.8
+MIN_TRIGRAM_SIMILARITY = 0.5
+
+# Matches below this are only a guess: 06_scrape_factbook_2025.py keeps them
+# as iso_guess rather than iso, and 17_build_name_index.py lists them for review
+MIN_ISO_CONFIDENCE = 0.85
+
+MATCH_KINDS = ('exact', 'expanded', 'loose')
+
+# Natural Earth abbreviations, as normalized words
+ABBREVIATIONS = {
+    'st': 'saint', 'is': 'islands', 'i': 'island', 'rep': 'republic', 'dem': 'democratic',
+    'eq': 'equatorial', 'fr': 'french', 'br': 'british', 'ter': 'territory', 'herz': 'herzegovina',
+    'barb': 'barbuda', 'geo': 'georgia', 'vin': 'vincent', 'gren': 'grenadines',
+}
+
+LOOSE_STOPWORDS = {'the', 'of', 'and', 'islands', 'island'}
+
+# Factbook slugs and names that the mapping and Natural Earth spell differently
+ALIASES = {
+    'burma': 'MM',
+    'korea south': 'KR',
+    'korea north': 'KP',
+    'congo democratic republic of the': 'CD',
+    'congo republic of the': 'CG',
+    'turkey turkiye': 'TR',
+    'holy see vatican city': 'VA',
+    'cote divoire': 'CI',
+    'falkland islands islas malvinas': 'FK',
+    'virgin islands': 'VI',
+    'macau': 'MO',
+    'west bank': 'PS',
+    'gaza strip': 'PS',
+    'kosovo': 'XK',
+    'faroe islands': 'FO',
+    'saint helena ascension and tristan da cunha': 'SH',
+    'south georgia and south sandwich islands': 'GS',
+    'heard island and mcdonald islands': 'HM',
+    'cocos keeling islands': 'CC',
+    'eswatini': 'SZ',
+    'timor leste': 'TL',
+    'curacao': 'CW',
+    'sint maarten': 'SX',
+    'jan mayen': 'SJ',
+    'svalbard': 'SJ',
+}
+
+NON_COUNTRIES = {
+    'world', 'european union', 'arctic ocean', 'atlantic ocean', 'indian ocean', 'pacific ocean',
+    'southern ocean', 'akrotiri', 'dhekelia', 'paracel islands', 'spratly islands',
+    'clipperton island', 'coral sea islands', 'ashmore and cartier islands', 'navassa island',
+    'wake island', 'united states pacific island wildlife refuges',
+}
+
+
+def repair(value: Optional[str]) -> str:
+    """Strip NUL padding and undo UTF-8 that was decoded as cp1252 ("Ã…land")"""
+    text = (value or '').replace('\x00', '').strip()
+    if 'Ã' in text or 'Â' in text:
+        try:
+            text = text.encode('cp1252').decode('utf-8')
+        except UnicodeError:
+            pass
+    return text
+
+
+def normalize(value: Optional[str]) -> str:
+    """Lower-case, accent-free words separated by single spaces ("Côte d'Ivoire" -> "cote d ivoire")"""
+    text = unicodedata.normalize('NFKD', repair(value))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    # Apostrophes join words ("d'Ivoire" -> "divoire", as in the Factbook slug)
+    text = re.sub(r"['’]", '', text.lower())
+    return re.sub(r'[^a-z0-9]+', ' ', text).strip()
+
+
+def expand(key: str) -> str:
+    """Normalized name with Natural Earth abbreviations spelled out"""
+    key = re.sub(r'\bu s\b', 'united states', key)
+    return ' '.join(ABBREVIATIONS.get(word, word) for word in key.split())
+
+
+def loose(key: str) -> str:
+    """Order-free key: sorted words without stopwords"""
+    return ' '.join(sorted(w for w in expand(key).split() if w not in LOOSE_STOPWORDS))
+
+
+def trigrams(key: str) -> set:
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """Resolve country names and Factbook slugs to ISO codes
+
+    names is a list of (name, iso, source) from any source; ALIASES are
+    always added.
+    """
+
+    def __init__(self, names: Iterable[Tuple[str, str, str]]):
+        self.names: List[Tuple[str, str, str]] = []
+        keys: Dict[str, Dict[str, set]] = {kind: defaultdict(set) for kind in MATCH_KINDS}
+
+        for name, iso, source in names:
+            key = normalize(name)
+            if not key or not iso or iso == '-99':
+                continue
+            self.names.append((name, iso, source))
+            keys['exact'][key].add(iso)
+            keys['expanded'][expand(key)].add(iso)
+            keys['loose'][loose(key)].add(iso)
+
+        # Unambiguous keys only; a key two countries share resolves neither
+        self.keys: Dict[str, Dict[str, str]] = {
+            kind: {key: next(iter(codes)) for key, codes in by_key.items() if len(codes) == 1}
+            for kind, by_key in keys.items()
+        }
+        self.keys['alias'] = dict(ALIASES)
+
+        self.trigram_keys = sorted(self.keys['expanded'])
+        self.trigram_counts = [len(trigrams(key)) for key in self.trigram_keys]
+        postings = defaultdict(list)
+        for i, key in enumerate(self.trigram_keys):
+            for gram in trigrams(key):
+                postings[gram].append(i)
+        self.postings: Dict[str, List[int]] = dict(postings)
+
+    @classmethod
+    def from_sources(cls, mapping: Optional[List[Dict[str, Any]]],
+                     entities: Optional[Dict[str, Dict[str, Any]]]) -> 'NameIndex':
+        """Index of fips_iso_mapping.json entries and countries_v2.json entities"""
+        names = []
+        for entry in mapping or []:
+            iso = entry.get('ISO_3166_2')
+            for field in ('NAME.EN', 'NAME.EN.OFFICIAL', 'name'):
+                if entry.get(field):
+                    names.append((entry[field], iso, 'fips_mapping'))
+        for code, entity in (entities or {}).items():
+            for field in ('name', 'name_long'):
+                if entity.get(field):
+                    names.append((entity[field], code, 'natural_earth'))
+        return cls(names)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The names and the built tables; ALIASES are not saved, so edits to them apply on load"""
+        return {'name_index_version': NAME_INDEX_VERSION,
+                'names': [list(entry) for entry in self.names],
+                'keys': {kind: self.keys[kind] for kind in MATCH_KINDS},
+                'trigram_keys': self.trigram_keys,
+                'trigram_counts': self.trigram_counts,
+                'postings': self.postings}
+
+    @classmethod
+    def from_dict(cls, document: Dict[str, Any]) -> 'NameIndex':
+        """Index saved by to_dict, used as stored without rebuilding the tables"""
+        if document.get('name_index_version') != NAME_INDEX_VERSION:
+            raise ValueError(f"Unsupported name index version {document.get('name_index_version')}")
+        index = cls.__new__(cls)
+        index.names = [tuple(entry) for entry in document['names']]
+        index.keys = dict(document['keys'], alias=dict(ALIASES))
+        index.trigram_keys = document['trigram_keys']
+        index.trigram_counts = document['trigram_counts']
+        index.postings = document['postings']
+        return index
+
+    def resolve(self, name: str) -> Optional[Dict[str, Any]]:
+        """{'iso', 'confidence', 'match'} for a name or slug, or None
+
+        match is the kind of key that matched: exact, alias, expanded,
+        loose or trigram.
+        """
+        key = normalize(name)
+        if not key or key in NON_COUNTRIES:
+            return None
+
+        for kind, candidate in (('exact', key), ('alias', key), ('expanded', expand(key)),
+                                ('loose', loose(key))):
+            iso = self.keys[kind].get(candidate)
+            if iso:
+                return {'iso': iso, 'confidence': CONFIDENCE[kind], 'match': kind}
+
+        grams = trigrams(expand(key))
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for i in self.postings.get(gram, ()):
+                shared[i] += 1
+
+        # Dice coefficient of the two trigram sets
+        similarity, best = max(((2 * count / (len(grams) + self.trigram_counts[i]), i)
+                                for i, count in shared.items()), default=(0.0, None))
+        if similarity < MIN_TRIGRAM_SIMILARITY:
+            return None
+        return {'iso': self.keys['expanded'][self.trigram_keys[best]],
+                'confidence': round(TRIGRAM * similarity, 3), 'match': 'trigram'}
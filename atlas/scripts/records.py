@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+
+"""
+Compact in-memory records for airports_iata.json and countries_v2.json
+
+json.load gives every airport a dict with its own copy of nine keys and
+values; across 7,800 airports that is several hundred bytes each. These
+loaders keep the same data in a fraction of the memory:
+
+- AirportTable: struct-of-arrays. Strings are packed into one UTF-8 buffer
+  per field (each distinct value once) or dictionary-encoded when there
+  are few of them (country, timezone), and lat, lon and elevation are typed
+  arrays. Rows are sorted by IATA code and found by binary search;
+  table[i] or table.get('LHR') returns a slotted Airport.
+- Country: a __slots__ record with the identifying and numeric fields
+  decoded up front. Each section of the long factbook text (geography,
+  people, government, economy...) stays a zlib-compressed JSON blob of its
+  own, so country.government decodes only the government section;
+  country.entity() decodes them all.
+
+NUL padding from Natural Earth is stripped from names on load.
+
+scripts/16_benchmark_records.py measures the savings with tracemalloc.
+"""
+
+import json
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterable, Iterator, List
+
+# Same sentinels as airport_binary.py
+NO_ELEVATION = -32768
+NO_STRING = 0xFFFF
+
+# Section names of Country records; entities with the same keys share one tuple
+_SECTION_NAMES: Dict[tuple, tuple] = {}
+
+
+def _clean(value: Optional[str]) -> Optional[str]:
+    """Interned string without NUL padding (None stays None)"""
+    if value is None:
+        return None
+    return sys.intern(value.replace('\x00', '').strip())
+
+
+class Airport:
+    """One airport; the fields of an airports_iata.json entry"""
+
+    __slots__ = ('iata', 'icao', 'name', 'city', 'country', 'lat', 'lon', 'elevation', 'timezone')
+
+    def __init__(self, iata: str, icao: str, name: Optional[str], city: Optional[str],
+                 country: Optional[str], lat: float, lon: float,
+                 elevation: Optional[int] = None, timezone: Optional[str] = None):
+        self.iata = iata
+        self.icao = icao
+        self.name = name
+        self.city = city
+        self.country = country
+        self.lat = lat
+        self.lon = lon
+        self.elevation = elevation
+        self.timezone = timezone
+
+    def __repr__(self) -> str:
+        return f"Airport({self.iata!r}, {self.name!r}, {self.country!r})"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Airport) and all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The airports_iata.json shape"""
+        return {'icao': self.icao, 'iata': self.iata, 'name': self.name, 'city': self.city,
+                'country': self.country, 'lat': self.lat, 'lon': self.lon,
+                'elevation': self.elevation, 'timezone': self.timezone}
+
+
+class StringColumn:
+    """Strings packed into one UTF-8 buffer; equal values are stored once"""
+
+    def __init__(self, values: Iterable[Optional[str]]):
+        heap = bytearray()
+        offsets: Dict[str, int] = {}
+        self.starts = array('I')
+        self.lengths = array('H')
+        for value in values:
+            if value is None:
+                self.starts.append(0)
+                self.lengths.append(NO_STRING)
+                continue
+            encoded = value.encode('utf-8')[:NO_STRING - 1]
+            offset = offsets.get(value)
+            if offset is None:
+                offset = offsets[value] = len(heap)
+                heap.extend(encoded)
+            self.starts.append(offset)
+            self.lengths.append(len(encoded))
+        self.heap = bytes(heap)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        length = self.lengths[i]
+        if length == NO_STRING:
+            return None
+        start = self.starts[i]
+        return self.heap[start:start + length].decode('utf-8')
+
+
+class DictionaryColumn:
+    """Few distinct strings: each stored once, rows hold a 16-bit code"""
+
+    def __init__(self, values: Iterable[Optional[str]]):
+        self.values: List[Optional[str]] = []
+        codes: Dict[Optional[str], int] = {}
+        self.codes = array('H')
+        for value in values:
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(self.values)
+                self.values.append(value)
+            self.codes.append(code)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        return self.values[self.codes[i]]
+
+
+class AirportTable:
+    """Airports as columns, sorted by IATA code
+
+    IATA codes are an interned list (for binary search), ICAO codes, names
+    and cities are packed StringColumns, country and timezone are
+    dictionary-encoded, and coordinates and elevation are typed arrays.
+    """
+
+    def __init__(self, airports: Dict[str, Dict[str, Any]]):
+        entries = sorted(airports.values(), key=lambda a: a['iata'].upper())
+        self.iata: List[str] = [sys.intern(a['iata'].upper()) for a in entries]
+        self.icao = StringColumn(a['icao'] for a in entries)
+        self.name = StringColumn(_clean(a.get('name')) for a in entries)
+        self.city = StringColumn(_clean(a.get('city')) for a in entries)
+        self.country = DictionaryColumn(_clean(a.get('country')) for a in entries)
+        self.timezone = DictionaryColumn(_clean(a.get('timezone')) for a in entries)
+        self.lat = array('d', (a['lat'] for a in entries))
+        self.lon = array('d', (a['lon'] for a in entries))
+        self.elevation = array('i', (NO_ELEVATION if a.get('elevation') is None else int(a['elevation'])
+                                     for a in entries))
+
+    def __len__(self) -> int:
+        return len(self.iata)
+
+    def __getitem__(self, i: int) -> Airport:
+        elevation = self.elevation[i]
+        return Airport(self.iata[i], self.icao[i], self.name[i], self.city[i], self.country[i],
+                       self.lat[i], self.lon[i], None if elevation == NO_ELEVATION else elevation,
+                       self.timezone[i])
+
+    def __iter__(self) -> Iterator[Airport]:
+        for i in range(len(self.iata)):
+            yield self[i]
+
+    def find(self, iata: str) -> Optional[int]:
+        """Row number of an IATA code, or None"""
+        key = iata.upper()
+        i = bisect_left(self.iata, key)
+        return i if i < len(self.iata) and self.iata[i] == key else None
+
+    def get(self, iata: str) -> Optional[Airport]:
+        """Look up an airport by IATA code"""
+        i = self.find(iata)
+        return None if i is None else self[i]
+
+
+class Country:
+    """One countries_v2.json entity; the factbook text is decoded only when read"""
+
+    __slots__ = ('code', 'iso_a3', 'name', 'name_long', 'flag', 'continent', 'population',
+                 'area_sq_km', 'capital', 'capital_lat', 'capital_lon', 'airports', '_names', '_sections')
+
+    def __init__(self, entity: Dict[str, Any]):
+        geography = entity.get('geography') or {}
+        people = entity.get('people') or {}
+        capital = (entity.get('government') or {}).get('capital') or {}
+        coordinates = capital.get('coordinates') or {}
+
+        self.code = sys.intern(entity['code'])
+        self.iso_a3 = _clean(entity.get('iso_a3'))
+        self.name = _clean(entity.get('name'))
+        self.name_long = _clean(entity.get('name_long'))
+        self.flag = _clean(entity.get('flag'))
+        self.continent = _clean(geography.get('continent'))
+        self.population = (people.get('population') or {}).get('total')
+        self.area_sq_km = (geography.get('area') or {}).get('total_sq_km')
+        self.capital = _clean(capital.get('name'))
+        self.capital_lat = coordinates.get('lat')
+        self.capital_lon = coordinates.get('lon')
+        self.airports = tuple(sys.intern(a['iata']) for a in entity.get('airports') or ())
+        # Each section as compressed JSON, in the entity's key order
+        names = tuple(entity)
+        self._names = _SECTION_NAMES.setdefault(names, names)
+        self._sections = tuple(zlib.compress(json.dumps(value, ensure_ascii=False,
+                                                        separators=(',', ':')).encode('utf-8'))
+                               for value in entity.values())
+
+    def __repr__(self) -> str:
+        return f"Country({self.code!r}, {self.name!r})"
+
+    def __getattr__(self, name: str):
+        # Only reached for names that are not slots: the sections of the entity
+        if name.startswith('_') or name not in self._names:
+            raise AttributeError(f"'Country' object has no attribute '{name}'")
+        return json.loads(zlib.decompress(self._sections[self._names.index(name)]))
+
+    def entity(self) -> Dict[str, Any]:
+        """The full countries_v2.json entity, decoded afresh on every call"""
+        return {name: json.loads(zlib.decompress(packed)) for name, packed in zip(self._names, self._sections)}
+
+
+def load_airports(path: Path) -> AirportTable:
+    """AirportTable for airports_iata.json"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return AirportTable(json.load(f).get('airports', {}))
+
+
+def load_countries(path: Path) -> Dict[str, Country]:
+    """Country records for countries_v2.json, keyed by ISO code"""
+    with open(path, 'r', encoding='utf-8') as f:
+        entities = json.load(f).get('entities', {})
+    return {code: Country(entity) for code, entity in entities.items()}
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+
+"""
+Shared-arc topology for polygon GeoJSON (TopoJSON format)
+
+Neighbouring countries in a GeoJSON file each store their common border in
+full. build_topology() converts a FeatureCollection into a TopoJSON-style
+Topology in which every border is stored once as an arc that both polygons
+reference, with coordinates quantized onto an integer grid and delta-encoded:
+
+1. Quantize every coordinate to a Q x Q grid over the bounding box and drop
+   points that collapse onto their predecessor.
+2. Find junctions: points where rings stop running alongside each other,
+   i.e. the same point is seen with different neighbours.
+3. Cut every ring at its junctions. Each piece is an arc; a piece that
+   already exists (in either direction) is reused, so shared borders are
+   stored once. Rings without junctions are rotated to a canonical start
+   point first, so identical rings (e.g. an enclave and the hole around it)
+   are also shared.
+4. Store each arc as its first point followed by the differences between
+   consecutive points, which are small integers.
+
+For levels of detail, effective_areas() ranks the points of each arc with
+Visvalingam-Whyatt (the area of the triangle a point forms with its
+neighbours, made monotone as points are removed). Simplifying keeps the
+points above an area threshold. This is shared-arc simplification, not a
+topology-preserving one: arc end points are junctions and are never
+removed, and both neighbours share the arc, so a border never opens a gap
+between them, but every arc is simplified on its own with no crossing
+check, so at coarse levels two nearby arcs can cross. keep_ring_points()
+stops rings from collapsing to a line between two junctions.
+
+Rings reference arcs by index, with ~i (= -i - 1) meaning arc i reversed,
+exactly as in the TopoJSON specification, so standard TopoJSON clients can
+decode the output; topology_to_geojson() does the same in Python.
+"""
+
+import heapq
+from typing import Dict, Any, List, Optional, Tuple
+
+Point = Tuple[int, int]
+
+DEFAULT_QUANTIZATION = 100000
+
+
+def _polygons(geometry: Optional[Dict[str, Any]]) -> List[List[List[List[float]]]]:
+    """Geometry as a list of polygons (each a list of rings)"""
+    if not geometry:
+        return []
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['coordinates']
+    return []
+
+
+def feature_bbox(features: List[Dict[str, Any]]) -> List[float]:
+    xs, ys = [], []
+    for feature in features:
+        for polygon in _polygons(feature.get('geometry')):
+            for ring in polygon:
+                xs.extend(p[0] for p in ring)
+                ys.extend(p[1] for p in ring)
+    if not xs:
+        return [0.0, 0.0, 0.0, 0.0]
+    return [min(xs), min(ys), max(xs), max(ys)]
+
+
+class Quantizer:
+    """Maps coordinates onto a Q x Q integer grid over a bounding box"""
+
+    def __init__(self, bbox: List[float], quantization: int = DEFAULT_QUANTIZATION):
+        x0, y0, x1, y1 = bbox
+        self.translate = [x0, y0]
+        self.scale = [(x1 - x0) / (quantization - 1) or 1.0,
+                      (y1 - y0) / (quantization - 1) or 1.0]
+
+    def point(self, coordinates) -> Point:
+        return (int(round((coordinates[0] - self.translate[0]) / self.scale[0])),
+                int(round((coordinates[1] - self.translate[1]) / self.scale[1])))
+
+    def ring(self, ring) -> List[Point]:
+        """Quantized open ring (no closing point, no repeated points)"""
+        points: List[Point] = []
+        for coordinates in ring:
+            p = self.point(coordinates)
+            if not points or points[-1] != p:
+                points.append(p)
+        while len(points) > 1 and points[-1] == points[0]:
+            points.pop()
+        return points
+
+
+def find_junctions(rings: List[List[Point]]) -> set:
+    """Points whose neighbours differ between occurrences"""
+    neighbours: Dict[Point, frozenset] = {}
+    junctions = set()
+    for ring in rings:
+        n = len(ring)
+        for i, p in enumerate(ring):
+            pair = frozenset((ring[i - 1], ring[(i + 1) % n]))
+            seen = neighbours.setdefault(p, pair)
+            if seen != pair:
+                junctions.add(p)
+    return junctions
+
+
+def canonical_ring(ring: List[Point]) -> List[Point]:
+    """Rotate a junction-free ring to start at its smallest point"""
+    start = ring.index(min(ring))
+    return ring[start:] + ring[:start]
+
+
+class ArcTable:
+    """Deduplicated arcs; index() returns i, or ~i for a reversed match"""
+
+    def __init__(self):
+        self.arcs: List[List[Point]] = []
+        self._index: Dict[Tuple[Point, ...], int] = {}
+
+    def index(self, arc: List[Point]) -> int:
+        key = tuple(arc)
+        found = self._index.get(key)
+        if found is not None:
+            return found
+        # Closed arcs start at their smallest point, so reversal catches those too
+        found = self._index.get(key[::-1])
+        if found is not None:
+            return ~found
+        self._index[key] = len(self.arcs)
+        self.arcs.append(arc)
+        return len(self.arcs) - 1
+
+
+def cut_ring(ring: List[Point], junctions: set, table: ArcTable) -> List[int]:
+    """Arc indexes making up a ring"""
+    cuts = [i for i, p in enumerate(ring) if p in junctions]
+    if not cuts:
+        closed = canonical_ring(ring)
+        return [table.index(closed + closed[:1])]
+
+    rotated = ring[cuts[0]:] + ring[:cuts[0]]
+    rotated.append(rotated[0])
+    indexes = []
+    start = 0
+    for i in range(1, len(rotated)):
+        if rotated[i] in junctions:
+            indexes.append(table.index(rotated[start:i + 1]))
+            start = i
+    return indexes
+
+
+def _triangle_area(a: Point, b: Point, c: Point) -> float:
+    return abs((b[0] - a[0]) * (c[1] - a[1]) - (c[0] - a[0]) * (b[1] - a[1])) / 2
+
+
+def effective_areas(arc: List[Point]) -> List[float]:
+    """Visvalingam-Whyatt effective area of each point (inf for kept end points)
+
+    A closed arc (a whole ring) also keeps its two most significant interior
+    points, so no ring ever collapses below a triangle.
+    """
+    n = len(arc)
+    areas = [float('inf')] * n
+    if n < 3:
+        return areas
+
+    previous = list(range(-1, n - 1))
+    following = list(range(1, n + 1))
+    current = [0.0] * n
+    heap = []
+    for i in range(1, n - 1):
+        current[i] = _triangle_area(arc[i - 1], arc[i], arc[i + 1])
+        heap.append((current[i], i))
+    heapq.heapify(heap)
+
+    removed = [False] * n
+    largest = 0.0
+    while heap:
+        area, i = heapq.heappop(heap)
+        if removed[i] or area != current[i]:
+            continue  # stale entry
+        # A point is never cheaper to drop than one removed before it
+        largest = max(largest, area)
+        areas[i] = largest
+        removed[i] = True
+
+        before, after = previous[i], following[i]
+        following[before] = after
+        previous[after] = before
+        for j in (before, after):
+            if 0 < j < n - 1:
+                current[j] = _triangle_area(arc[previous[j]], arc[j], arc[following[j]])
+                heapq.heappush(heap, (current[j], j))
+
+    if arc[0] == arc[-1]:
+        for i in sorted(range(1, n - 1), key=lambda i: areas[i])[-2:]:
+            areas[i] = float('inf')
+    return areas
+
+
+def keep_ring_points(objects: Dict[str, Any], areas: List[List[float]], min_points: int = 3):
+    """Give interior points an infinite area until every ring keeps min_points
+
+    A ring cut into one or two arcs keeps only its junctions once the arcs
+    are simplified, a line with no area. The most significant interior
+    points of its arcs are kept at every level instead. areas (one list per
+    arc, from effective_areas) is changed in place.
+    """
+    inf = float('inf')
+    for collection in objects.values():
+        for geometry in collection['geometries']:
+            if geometry['type'] == 'Polygon':
+                rings = geometry['arcs']
+            elif geometry['type'] == 'MultiPolygon':
+                rings = [ring for polygon in geometry['arcs'] for ring in polygon]
+            else:
+                continue
+            for ring in rings:
+                arcs = [i if i >= 0 else ~i for i in ring]
+                # The last point of each arc is the first of the next
+                kept = sum(sum(1 for area in areas[i][:-1] if area == inf) for i in arcs)
+                candidates = sorted(((areas[i][j], i, j) for i in arcs for j in range(1, len(areas[i]) - 1)
+                                     if areas[i][j] != inf), reverse=True)
+                for _, i, j in candidates[:max(0, min_points - kept)]:
+                    areas[i][j] = inf
+
+
+def simplify_arc(arc: List[Point], areas: List[float], min_area: float) -> List[Point]:
+    """Points of arc whose effective area is at least min_area"""
+    return [p for p, area in zip(arc, areas) if area >= min_area]
+
+
+def delta_encode(arc: List[Point]) -> List[List[int]]:
+    encoded = []
+    x = y = 0
+    for px, py in arc:
+        encoded.append([px - x, py - y])
+        x, y = px, py
+    return encoded
+
+
+def delta_decode(arc: List[List[int]]) -> List[Point]:
+    """Absolute quantized points of a delta-encoded arc"""
+    points: List[Point] = []
+    x = y = 0
+    for dx, dy in arc:
+        x += dx
+        y += dy
+        points.append((x, y))
+    return points
+
+
+def build_topology(collection: Dict[str, Any], object_name: str = 'countries',
+                   quantization: int = DEFAULT_QUANTIZATION) -> Dict[str, Any]:
+    """TopoJSON Topology with one GeometryCollection for the features"""
+    features = collection.get('features', [])
+    bbox = feature_bbox(features)
+    quantizer = Quantizer(bbox, quantization)
+
+    # Quantized polygons per feature; rings with fewer than 3 points vanish
+    quantized = []
+    for feature in features:
+        polygons = []
+        for polygon in _polygons(feature.get('geometry')):
+            rings = [quantizer.ring(ring) for ring in polygon]
+            if len(rings[0]) >= 3:
+                polygons.append(rings[:1] + [r for r in rings[1:] if len(r) >= 3])
+        quantized.append(polygons)
+
+    junctions = find_junctions([ring for polygons in quantized for polygon in polygons for ring in polygon])
+    table = ArcTable()
+
+    geometries = []
+    for feature, polygons in zip(features, quantized):
+        arcs = [[cut_ring(ring, junctions, table) for ring in polygon] for polygon in polygons]
+        if not arcs:
+            geometry: Dict[str, Any] = {'type': None}
+        elif len(arcs) == 1:
+            geometry = {'type': 'Polygon', 'arcs': arcs[0]}
+        else:
+            geometry = {'type': 'MultiPolygon', 'arcs': arcs}
+        if feature.get('properties') is not None:
+            geometry['properties'] = feature['properties']
+        geometries.append(geometry)
+
+    return {
+        'type': 'Topology',
+        'bbox': bbox,
+        'transform': {'scale': quantizer.scale, 'translate': quantizer.translate},
+        'objects': {object_name: {'type': 'GeometryCollection', 'geometries': geometries}},
+        'arcs': [delta_encode(arc) for arc in table.arcs]
+    }
+
+
+def decode_arcs(topology: Dict[str, Any]) -> List[List[List[float]]]:
+    """Absolute, de-quantized coordinates of every arc"""
+    (sx, sy), (tx, ty) = topology['transform']['scale'], topology['transform']['translate']
+    decoded = []
+    for arc in topology['arcs']:
+        x = y = 0
+        points = []
+        for dx, dy in arc:
+            x += dx
+            y += dy
+            points.append([x * sx + tx, y * sy + ty])
+        decoded.append(points)
+    return decoded
+
+
+def topology_to_geojson(topology: Dict[str, Any], object_name: str = 'countries') -> Dict[str, Any]:
+    """FeatureCollection for one object of a Topology"""
+    arcs = decode_arcs(topology)
+
+    def ring(indexes: List[int]) -> List[List[float]]:
+        points: List[List[float]] = []
+        for i in indexes:
+            arc = arcs[i] if i >= 0 else arcs[~i][::-1]
+            if points:
+                points.pop()  # arcs share their end points
+            points.extend(arc)
+        return points
+
+    features = []
+    for geometry in topology['objects'][object_name]['geometries']:
+        if geometry['type'] == 'Polygon':
+            decoded = {'type': 'Polygon', 'coordinates': [ring(r) for r in geometry['arcs']]}
+        elif geometry['type'] == 'MultiPolygon':
+            decoded = {'type': 'MultiPolygon', 'coordinates': [[ring(r) for r in p] for p in geometry['arcs']]}
+        else:
+            decoded = None
+        features.append({'type': 'Feature', 'properties': geometry.get('properties', {}), 'geometry': decoded})
+
+    return {'type': 'FeatureCollection', 'features': features}
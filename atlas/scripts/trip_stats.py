@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+
+"""
+Vectorized trip statistics over airports_iata.json
+
+A trip log is a list of legs, each with a trip id and its two endpoints as
+IATA codes or as coordinates. TripStats takes the legs in batches of NumPy
+columns and never loops over legs in Python:
+
+- IATA codes become integer keys into the direct lookup table of an
+  AirportIndex (built over a records.AirportTable); coordinates are snapped
+  to the nearest airport within SNAP_KM, so their country is known too
+- great-circle distances are computed for the whole batch at once, from
+  unit vectors precomputed per airport (no trigonometry per leg but one
+  arcsin)
+- per-trip totals come from reductions over runs of equal trip ids
+  (np.add.reduceat), per-country totals from np.bincount
+
+Per trip: legs, distance, longest leg, countries visited. Per country:
+departures, arrivals, domestic legs, distance flown from it, distinct trips
+and, when legs have departure and arrival times, the hours spent there
+between arriving and the next departure of the same trip.
+
+Legs of a trip are expected together and in order (as a log is written);
+a batch that is not grouped by trip is sorted first. result() returns
+every table as columns (lists of equal length), ready for JSON or CSV.
+"""
+
+import csv
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterator
+
+import numpy as np
+
+from records import AirportTable, load_airports
+
+# Same mean Earth radius as viewer/indexes.py
+EARTH_RADIUS_KM = 6371.0088
+
+# Coordinates farther than this from every airport get no country
+SNAP_KM = 25.0
+GRID_DEGREES = 1.0
+SNAP_CHUNK = 65536
+
+BATCH_LEGS = 1 << 20
+
+NO_ROW = -1
+
+
+def great_circle_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Haversine distances in km between arrays of points in degrees"""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    a = (np.sin((phi2 - phi1) / 2) ** 2
+         + np.cos(phi1) * np.cos(phi2) * np.sin(np.radians(np.subtract(lon2, lon1)) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def unit_vectors(lat, lon):
+    """(x, y, z) on the unit sphere of points in degrees"""
+    phi, lam = np.radians(lat), np.radians(lon)
+    cos_phi = np.cos(phi)
+    return cos_phi * np.cos(lam), cos_phi * np.sin(lam), np.sin(phi)
+
+
+def chord_distance_km(x1, y1, z1, x2, y2, z2) -> np.ndarray:
+    """Great-circle distances in km from unit vectors: the arc of the chord between them"""
+    chord = np.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2 + (z2 - z1) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1.0))
+
+
+# Code symbol of every byte: NUL (end of a short code) 0, A-Z 1-26, 0-9 27-36; anything else is invalid
+NO_CODE = 37 ** 3
+_SYMBOLS = np.full(256, NO_CODE, dtype=np.int64)
+_SYMBOLS[0] = 0
+_SYMBOLS[np.frombuffer(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', dtype=np.uint8)] = np.arange(1, 27)
+_SYMBOLS[np.frombuffer(b'abcdefghijklmnopqrstuvwxyz', dtype=np.uint8)] = np.arange(1, 27)
+_SYMBOLS[np.frombuffer(b'0123456789', dtype=np.uint8)] = np.arange(27, 37)
+
+
+def _pair_table(value) -> np.ndarray:
+    """Key contribution of every two-byte pair, indexed by the pair as a little-endian uint16"""
+    first, second = np.meshgrid(np.arange(256), np.arange(256))
+    return np.minimum(value(_SYMBOLS[first], _SYMBOLS[second], second), NO_CODE).astype(np.int32).reshape(-1)
+
+
+# Bytes 1-2 and 3-4 of a code: the first symbol must be a letter or digit, the fourth byte NUL
+_LEADING_PAIRS = _pair_table(lambda a, b, _: np.where((a == 0) | (a == NO_CODE) | (b == NO_CODE),
+                                                      NO_CODE, a * 37 * 37 + b * 37))
+_TRAILING_PAIRS = _pair_table(lambda a, _, byte: np.where((a == NO_CODE) | (byte != 0), NO_CODE, a))
+
+
+def _code_keys(codes) -> np.ndarray:
+    """Case-insensitive key of each IATA code in range(NO_CODE), or NO_CODE if it is not 1-3 letters or digits
+
+    Two gathers per code: its bytes are read as two uint16 pairs.
+    """
+    packed = np.asarray(codes)
+    if packed.dtype.kind != 'S':
+        # Non-ASCII symbols become '?', which no key accepts
+        packed = np.char.encode(packed.astype(str), 'ascii', 'replace')
+    if packed.dtype != np.dtype('S4'):
+        # Longer codes keep a non-NUL fourth byte, so they are rejected rather than cut to three
+        packed = packed.astype('S4')
+    pairs = packed.view('<u2').reshape(-1, 2)
+    return np.minimum(_LEADING_PAIRS[pairs[:, 0]] + _TRAILING_PAIRS[pairs[:, 1]], NO_CODE)
+
+
+def _distinct(values: np.ndarray) -> np.ndarray:
+    """Sorted distinct values (a sort beats np.unique's hashing on large int arrays)"""
+    values = np.sort(values)
+    return values[np.concatenate(([True], values[1:] != values[:-1]))] if len(values) else values
+
+
+def _cell_keys(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    rows = np.clip(((lat + 90) // GRID_DEGREES).astype(np.int64), 0, int(180 / GRID_DEGREES) - 1)
+    cols = ((lon + 180) // GRID_DEGREES).astype(np.int64) % int(360 / GRID_DEGREES)
+    return rows * int(360 / GRID_DEGREES) + cols
+
+
+class AirportIndex:
+    """Search structures over a records.AirportTable: code lookup, unit vectors, snapping grid
+
+    Rows are the table's (sorted by IATA code), and its coordinate columns
+    are used in place. Every possible code has a slot in a direct lookup
+    table (37^3 entries), so resolving a batch of codes is one array gather.
+    """
+
+    def __init__(self, table: AirportTable):
+        self.lookup = np.full(NO_CODE + 1, NO_ROW, dtype=np.int32)
+        self.lookup[_code_keys(table.iata)] = np.arange(len(table), dtype=np.int32)
+        self.lookup[NO_CODE] = NO_ROW
+        self.codes = np.array(table.iata, dtype='S3')
+        self.lat = np.frombuffer(table.lat, dtype=np.float64)
+        self.lon = np.frombuffer(table.lon, dtype=np.float64)
+        self.countries: List[str] = sorted(set(table.country.values) - {None, ''})
+        numbers = {code: i for i, code in enumerate(self.countries)}
+        # Unit vectors and country numbers end with a NaN / NO_ROW entry, so row NO_ROW gathers "unknown"
+        x, y, z = unit_vectors(self.lat, self.lon)
+        self.x, self.y, self.z = np.append(x, np.nan), np.append(y, np.nan), np.append(z, np.nan)
+        by_code = np.array([numbers.get(value, NO_ROW) for value in table.country.values], dtype=np.int32)
+        self.country = np.append(by_code[np.frombuffer(table.country.codes, dtype=np.uint16)], NO_ROW)
+
+        # Every grid cell next to an airport lists the airports of its 3x3 neighbourhood
+        columns = int(360 / GRID_DEGREES)
+        keys = _cell_keys(self.lat, self.lon)
+        neighbours = np.concatenate([
+            (keys // columns + dr) * columns + (keys % columns + dc) % columns
+            for dr in (-1, 0, 1) for dc in (-1, 0, 1)])
+        rows = np.tile(np.arange(len(table), dtype=np.int32), 9)
+        order = np.argsort(neighbours, kind='stable')
+        neighbours, rows = neighbours[order], rows[order]
+        self.cells, starts, counts = np.unique(neighbours, return_index=True, return_counts=True)
+        self.candidates = np.full((len(self.cells), max(1, counts.max(initial=1))), NO_ROW, dtype=np.int32)
+        slot = np.arange(len(rows)) - np.repeat(starts, counts)
+        self.candidates[np.repeat(np.arange(len(self.cells)), counts), slot] = rows
+
+    @classmethod
+    def load(cls, path: Path) -> 'AirportIndex':
+        return cls(load_airports(path))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def resolve(self, codes) -> np.ndarray:
+        """Airport row of each IATA code (NO_ROW if unknown)"""
+        return self.lookup[_code_keys(codes)]
+
+    def snap(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Row of the nearest airport within SNAP_KM of each point (NO_ROW if none)"""
+        result = np.full(len(lat), NO_ROW, dtype=np.int32)
+        for start in range(0, len(lat), SNAP_CHUNK):
+            chunk_lat, chunk_lon = lat[start:start + SNAP_CHUNK], lon[start:start + SNAP_CHUNK]
+            known = ~(np.isnan(chunk_lat) | np.isnan(chunk_lon))
+            keys = _cell_keys(np.where(known, chunk_lat, 0.0), np.where(known, chunk_lon, 0.0))
+            cells = np.minimum(np.searchsorted(self.cells, keys), len(self.cells) - 1)
+            found = np.flatnonzero(known & (self.cells[cells] == keys))
+            if not len(found):
+                continue
+            candidates = self.candidates[cells[found]]
+            distances = great_circle_km(chunk_lat[found, None], chunk_lon[found, None],
+                                        self.lat[candidates], self.lon[candidates])
+            distances[candidates == NO_ROW] = np.inf
+            best = np.argmin(distances, axis=1)
+            nearest = distances[np.arange(len(found)), best]
+            rows = candidates[np.arange(len(found)), best]
+            result[start + found] = np.where(nearest <= SNAP_KM, rows, NO_ROW)
+        return result
+
+
+class TripStats:
+    """Accumulates per-trip and per-country statistics over batches of legs"""
+
+    def __init__(self, airports: AirportIndex):
+        self.airports = airports
+        countries = len(airports.countries)
+        self.trip_legs = np.zeros(0, dtype=np.int64)
+        self.trip_unresolved = np.zeros(0, dtype=np.int64)
+        self.trip_km = np.zeros(0, dtype=np.float64)
+        self.trip_longest_km = np.zeros(0, dtype=np.float64)
+        self.trip_longest_from = np.zeros(0, dtype=np.int32)
+        self.trip_longest_to = np.zeros(0, dtype=np.int32)
+        self.visits: List[np.ndarray] = []
+        self.departures = np.zeros(countries, dtype=np.int64)
+        self.arrivals = np.zeros(countries, dtype=np.int64)
+        self.domestic = np.zeros(countries, dtype=np.int64)
+        self.country_km = np.zeros(countries, dtype=np.float64)
+        self.country_hours = np.zeros(countries, dtype=np.float64)
+        self.legs = 0
+        # (trip, arrival time, arrival country) of the last leg of the previous batch
+        self._last_arrival = None
+
+    def _grow(self, trips: int):
+        if trips <= len(self.trip_legs):
+            return
+        # Double the capacity, so a long log grows the arrays only a few times
+        extra = max(trips, 2 * len(self.trip_legs)) - len(self.trip_legs)
+        self.trip_legs = np.concatenate([self.trip_legs, np.zeros(extra, dtype=np.int64)])
+        self.trip_unresolved = np.concatenate([self.trip_unresolved, np.zeros(extra, dtype=np.int64)])
+        self.trip_km = np.concatenate([self.trip_km, np.zeros(extra)])
+        self.trip_longest_km = np.concatenate([self.trip_longest_km, np.full(extra, -1.0)])
+        self.trip_longest_from = np.concatenate([self.trip_longest_from, np.full(extra, NO_ROW, dtype=np.int32)])
+        self.trip_longest_to = np.concatenate([self.trip_longest_to, np.full(extra, NO_ROW, dtype=np.int32)])
+
+    def _endpoint(self, codes, lat, lon, n: int):
+        """(x, y, z, airport row) of one end of every leg: a known IATA code wins over coordinates"""
+        airports = self.airports
+        rows = airports.resolve(codes) if codes is not None else np.full(n, NO_ROW, dtype=np.int32)
+        x, y, z = airports.x[rows], airports.y[rows], airports.z[rows]
+        if lat is not None and lon is not None:
+            lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+            by_position = np.flatnonzero((rows == NO_ROW) & ~np.isnan(lat) & ~np.isnan(lon))
+            if len(by_position):
+                x[by_position], y[by_position], z[by_position] = unit_vectors(lat[by_position], lon[by_position])
+                rows[by_position] = airports.snap(lat[by_position], lon[by_position])
+        return x, y, z, rows
+
+    def add(self, trip, from_code=None, to_code=None, from_lat=None, from_lon=None,
+            to_lat=None, to_lon=None, depart=None, arrive=None):
+        """One batch of legs as equal-length columns
+
+        trip: non-negative integer trip ids. Each end is an IATA code column
+        (b'' or '' for none) and/or lat/lon columns (NaN for none). depart
+        and arrive are optional times in seconds (NaN when unknown).
+        """
+        trip = np.asarray(trip, dtype=np.int64)
+        n = len(trip)
+        if not n:
+            return
+        columns = {'from_code': from_code, 'to_code': to_code, 'from_lat': from_lat, 'from_lon': from_lon,
+                   'to_lat': to_lat, 'to_lon': to_lon, 'depart': depart, 'arrive': arrive}
+        columns = {name: None if column is None else np.asarray(column) for name, column in columns.items()}
+        if np.any(trip[1:] < trip[:-1]):
+            order = np.argsort(trip, kind='stable')
+            trip = trip[order]
+            columns = {name: None if column is None else column[order] for name, column in columns.items()}
+
+        x1, y1, z1, row1 = self._endpoint(columns['from_code'], columns['from_lat'], columns['from_lon'], n)
+        x2, y2, z2, row2 = self._endpoint(columns['to_code'], columns['to_lat'], columns['to_lon'], n)
+        country1 = self.airports.country[row1]
+        country2 = self.airports.country[row2]
+
+        distance = chord_distance_km(x1, y1, z1, x2, y2, z2)
+        resolved = ~np.isnan(distance)
+        distance = np.where(resolved, distance, 0.0)
+
+        # Runs of equal trip ids
+        starts = np.flatnonzero(np.concatenate(([True], trip[1:] != trip[:-1])))
+        counts = np.diff(np.append(starts, n))
+        trips = trip[starts]
+        self._grow(int(trips[-1]) + 1)
+
+        self.trip_legs[trips] += counts
+        self.trip_unresolved[trips] += counts - np.add.reduceat(resolved.astype(np.int64), starts)
+        self.trip_km[trips] += np.add.reduceat(distance, starts)
+
+        # First leg reaching each run's maximum
+        longest = np.maximum.reduceat(distance, starts)
+        at_max = np.flatnonzero(distance == np.repeat(longest, counts))
+        run = np.repeat(np.arange(len(starts)), counts)[at_max]
+        first = at_max[np.concatenate(([True], run[1:] != run[:-1]))]
+        better = longest > self.trip_longest_km[trips]
+        self.trip_longest_km[trips[better]] = longest[better]
+        self.trip_longest_from[trips[better]] = row1[first[better]]
+        self.trip_longest_to[trips[better]] = row2[first[better]]
+
+        countries = len(self.airports.countries)
+        visited = np.concatenate([trip[country1 != NO_ROW] * countries + country1[country1 != NO_ROW],
+                                  trip[country2 != NO_ROW] * countries + country2[country2 != NO_ROW]])
+        self.visits.append(_distinct(visited))
+
+        departed = country1 != NO_ROW
+        arrived = country2 != NO_ROW
+        self.departures += np.bincount(country1[departed], minlength=countries)
+        self.arrivals += np.bincount(country2[arrived], minlength=countries)
+        self.domestic += np.bincount(country1[departed & (country1 == country2)], minlength=countries)
+        self.country_km += np.bincount(country1[departed], weights=distance[departed], minlength=countries)
+
+        if columns['depart'] is not None and columns['arrive'] is not None:
+            depart = columns['depart'].astype(np.float64)
+            arrive = columns['arrive'].astype(np.float64)
+            # Time between a leg's arrival and the next departure of the same trip
+            stay_trip = trip[:-1]
+            stay = depart[1:] - arrive[:-1]
+            stay_country = country2[:-1]
+            same = trip[1:] == stay_trip
+            if self._last_arrival is not None:
+                last_trip, last_arrive, last_country = self._last_arrival
+                stay = np.concatenate(([depart[0] - last_arrive], stay))
+                stay_country = np.concatenate(([last_country], stay_country))
+                same = np.concatenate(([trip[0] == last_trip], same))
+            counted = same & (stay_country != NO_ROW) & (stay >= 0)
+            self.country_hours += np.bincount(stay_country[counted], weights=stay[counted] / 3600,
+                                              minlength=countries)
+            self._last_arrival = (trip[-1], arrive[-1], country2[-1])
+
+        self.legs += n
+
+    def _label(self, rows: np.ndarray) -> List[str]:
+        codes = self.airports.codes[np.maximum(rows, 0)].astype(str)
+        return np.where(rows != NO_ROW, codes, '').tolist()
+
+    def result(self, labels: Optional[List[str]] = None) -> Dict[str, Any]:
+        """{'summary', 'trips', 'countries'}; trips and countries are columns
+
+        labels maps trip ids back to the names used in the log.
+        """
+        countries = len(self.airports.countries)
+        visits = _distinct(np.concatenate(self.visits)) if self.visits else np.zeros(0, dtype=np.int64)
+        trip_countries = np.bincount(visits // countries, minlength=len(self.trip_legs)) if countries else None
+        country_trips = np.bincount(visits % countries, minlength=countries) if countries else None
+
+        ids = np.flatnonzero(self.trip_legs)
+        longest = np.where(self.trip_longest_km[ids] >= 0, self.trip_longest_km[ids], 0.0)
+        trips = {
+            'trip': [labels[i] for i in ids] if labels is not None else ids.tolist(),
+            'legs': self.trip_legs[ids].tolist(),
+            'unresolved_legs': self.trip_unresolved[ids].tolist(),
+            'distance_km': np.round(self.trip_km[ids], 1).tolist(),
+            'longest_leg_km': np.round(longest, 1).tolist(),
+            'longest_leg_from': self._label(self.trip_longest_from[ids]),
+            'longest_leg_to': self._label(self.trip_longest_to[ids]),
+            'countries': trip_countries[ids].tolist() if countries else [0] * len(ids),
+        }
+
+        active = np.flatnonzero(self.departures + self.arrivals)
+        by_country = {
+            'country': [self.airports.countries[i] for i in active],
+            'departures': self.departures[active].tolist(),
+            'arrivals': self.arrivals[active].tolist(),
+            'domestic_legs': self.domestic[active].tolist(),
+            'distance_km': np.round(self.country_km[active], 1).tolist(),
+            'trips': country_trips[active].tolist() if countries else [],
+            'hours': np.round(self.country_hours[active], 1).tolist(),
+        }
+
+        summary = {
+            'legs': self.legs,
+            'unresolved_legs': int(self.trip_unresolved.sum()),
+            'trips': len(ids),
+            'distance_km': round(float(self.trip_km.sum()), 1),
+            'countries': int(np.count_nonzero(country_trips)) if countries else 0,
+            'longest_leg': None,
+        }
+        if len(ids) and self.trip_longest_km.max() > 0:
+            best = int(np.argmax(self.trip_longest_km))
+            summary['longest_leg'] = {
+                'trip': labels[best] if labels is not None else best,
+                'from': self._label(self.trip_longest_from[best:best + 1])[0],
+                'to': self._label(self.trip_longest_to[best:best + 1])[0],
+                'distance_km': round(float(self.trip_longest_km[best]), 1),
+            }
+        return {'summary': summary, 'trips': trips, 'countries': by_country}
+
+
+def _time(value: str) -> float:
+    """Seconds since the epoch of an ISO 8601 time (UTC unless it has an offset) or a number"""
+    if not value:
+        return float('nan')
+    try:
+        return float(value)
+    except ValueError:
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment.timestamp()
+
+
+def _number(value: str) -> float:
+    return float(value) if value else float('nan')
+
+
+def read_trip_log(path: Path, labels: Dict[str, int], batch_legs: int = BATCH_LEGS) -> Iterator[Dict[str, Any]]:
+    """Batches of TripStats.add columns from a CSV trip log
+
+    Columns: trip (optional), from and to (IATA) and/or from_lat, from_lon,
+    to_lat, to_lon, and optionally depart and arrive (ISO 8601 or epoch
+    seconds). labels collects trip name -> id as trips are first seen.
+    """
+    fields = ('from_code', 'to_code', 'from_lat', 'from_lon', 'to_lat', 'to_lon', 'depart', 'arrive')
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        header = set(reader.fieldnames or ())
+        timed = {'depart', 'arrive'} <= header
+        batch: Dict[str, list] = {'trip': [], **{name: [] for name in fields}}
+        for row in reader:
+            name = row.get('trip') or ''
+            trip = labels.get(name)
+            if trip is None:
+                trip = labels[name] = len(labels)
+            batch['trip'].append(trip)
+            batch['from_code'].append((row.get('from') or '').strip())
+            batch['to_code'].append((row.get('to') or '').strip())
+            for name in ('from_lat', 'from_lon', 'to_lat', 'to_lon'):
+                batch[name].append(_number(row.get(name)))
+            if timed:
+                batch['depart'].append(_time(row['depart']))
+                batch['arrive'].append(_time(row['arrive']))
+            if len(batch['trip']) == batch_legs:
+                yield _columns(batch, timed)
+                batch = {'trip': [], **{name: [] for name in fields}}
+        if batch['trip']:
+            yield _columns(batch, timed)
+
+
+def _code_bytes(codes: List[str]) -> np.ndarray:
+    """Codes as S4 for _code_keys: a fourth byte or a '?' for a non-ASCII symbol marks a bad code"""
+    return np.array([code.encode('ascii', 'replace') for code in codes], dtype='S4')
+
+
+def _columns(batch: Dict[str, list], timed: bool) -> Dict[str, Any]:
+    columns = {name: np.array(values, dtype=np.float64) for name, values in batch.items()
+               if name not in ('trip', 'from_code', 'to_code')}
+    columns['trip'] = np.array(batch['trip'], dtype=np.int64)
+    columns['from_code'] = _code_bytes(batch['from_code'])
+    columns['to_code'] = _code_bytes(batch['to_code'])
+    if not timed:
+        columns['depart'] = columns['arrive'] = None
+    return columns
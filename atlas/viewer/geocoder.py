@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+
+"""
+Reverse geocoder: (lat, lon) -> country, admin-1 region and flag
+
+Two levels. The point is first resolved to a country against the
+countries_50m.geojson polygons, then against only that country's admin-1
+polygons from regions_10m.geojson (pre-indexed per country), so a lookup never
+scans the regions of the rest of the world. The region's flag from
+regional_flags.json (England, Scotland, California, Catalonia...) is
+resolved when the index is built and returned with the region in one call;
+points outside a flagged region get the country flag.
+
+Each level is a PolygonIndex: a uniform grid of cells, each listing the
+polygons that reach into it. A cell that lies wholly inside one polygon
+answers immediately. Otherwise each candidate polygon stores whether the
+cell centre is inside it and its edges that touch the cell; the point is
+inside if the segment from the centre to the point crosses those edges an
+even number of times (odd when the centre is outside). A lookup costs a
+bisect and a handful of edge tests, however large the polygon.
+
+All arrays are indexes.Column, so a Geocoder is stored in the index snapshot
+and memory-mapped like the other indexes.
+"""
+
+import math
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+
+from indexes import Column, clean_name, normalize
+
+COUNTRY_CELL_DEGREES = 1.0
+REGION_CELL_DEGREES = 0.25
+
+# Natural Earth admin-1 names that differ from the regional_flags.json name
+REGION_ALIASES = {
+    'cataluna': 'ES-CT',
+    'catalunya': 'ES-CT',
+    'pais vasco': 'ES-PV',
+    'euskadi': 'ES-PV',
+    'andalucia': 'ES-AN',
+    'bretagne': 'FR-BRE',
+    'corse': 'FR-COR',
+    'quebec': 'CA-QC',
+}
+
+Ring = List[List[float]]
+
+
+def polygons_of(geometry: Optional[Dict[str, Any]]) -> List[List[Ring]]:
+    """Polygons (lists of rings) of a Polygon or MultiPolygon geometry"""
+    geometry = geometry or {}
+    if geometry.get('type') == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry.get('type') == 'MultiPolygon':
+        return geometry['coordinates']
+    return []
+
+
+def _crosses(px: float, py: float, qx: float, qy: float,
+             ax: float, ay: float, bx: float, by: float) -> bool:
+    """Whether segment p-q crosses segment a-b (end points counted half-open)"""
+    ex, ey = bx - ax, by - ay
+    if (ex * (py - ay) - ey * (px - ax) > 0) == (ex * (qy - ay) - ey * (qx - ax) > 0):
+        return False
+    fx, fy = qx - px, qy - py
+    return (fx * (ay - py) - fy * (ax - px) > 0) != (fx * (by - py) - fy * (bx - px) > 0)
+
+
+class PolygonIndex:
+    """Point-in-polygon lookups over a set of polygons through a grid of cells
+
+    polygons is a list of (owner, rings); lookup() returns the owner of the
+    polygon containing the point, or -1.
+    """
+
+    def __init__(self, polygons: List[Tuple[int, List[Ring]]], cell_degrees: float):
+        self.cell_degrees = cell_degrees
+        self.cols = int(round(360 / cell_degrees))
+        self.rows = int(round(180 / cell_degrees))
+
+        xs, ys, owners = [], [], []
+        # cell key -> [(polygon, centre inside, [edge start vertex...])]
+        cells: Dict[int, List[Tuple[int, bool, List[int]]]] = defaultdict(list)
+
+        for p, (owner, rings) in enumerate(polygons):
+            owners.append(owner)
+            edges: Dict[int, List[int]] = defaultdict(list)
+            crossings: Dict[int, List[float]] = defaultdict(list)
+            for ring in rings:
+                start = len(xs)
+                xs.extend(point[0] for point in ring)
+                ys.extend(point[1] for point in ring)
+                if ring[0] != ring[-1]:
+                    xs.append(ring[0][0])
+                    ys.append(ring[0][1])
+                # Edge v runs from vertex v to v + 1; the closing vertex starts none
+                for v in range(start, len(xs) - 1):
+                    self._add_edge(v, xs[v], ys[v], xs[v + 1], ys[v + 1], edges, crossings)
+
+            for row in crossings.values():
+                row.sort()
+
+            for key, edge_list in edges.items():
+                row, col = divmod(key, self.cols)
+                centre_x = -180.0 + (col + 0.5) * cell_degrees
+                inside = bisect_right(crossings.get(row, ()), centre_x) % 2 == 1
+                cells[key].append((p, inside, edge_list))
+
+            # Cells whose centre is inside and which no edge touches are wholly inside
+            for row, row_crossings in crossings.items():
+                for i in range(0, len(row_crossings) - 1, 2):
+                    first = math.ceil((row_crossings[i] + 180.0) / cell_degrees - 0.5)
+                    last = math.ceil((row_crossings[i + 1] + 180.0) / cell_degrees - 0.5)
+                    for col in range(max(0, first), min(self.cols, last)):
+                        key = row * self.cols + col
+                        if key not in edges:
+                            cells[key].append((p, True, []))
+
+        keys = sorted(cells)
+        cell_starts, entry_polygon, entry_inside, entry_edge_starts, entry_edges = [], [], [], [], []
+        for key in keys:
+            cell_starts.append(len(entry_polygon))
+            for p, inside, edge_list in cells[key]:
+                entry_polygon.append(p)
+                entry_inside.append(inside)
+                entry_edge_starts.append(len(entry_edges))
+                entry_edges.extend(edge_list)
+        cell_starts.append(len(entry_polygon))
+        entry_edge_starts.append(len(entry_edges))
+
+        self.xs = Column('d', xs)
+        self.ys = Column('d', ys)
+        self.owners = Column('i', owners)
+        self.cell_keys = Column('I', keys)
+        self.cell_starts = Column('I', cell_starts)
+        self.entry_polygon = Column('I', entry_polygon)
+        self.entry_inside = Column('B', entry_inside)
+        self.entry_edge_starts = Column('I', entry_edge_starts)
+        self.entry_edges = Column('I', entry_edges)
+
+    def _cell(self, lon: float, lat: float) -> Tuple[int, int]:
+        row = min(self.rows - 1, max(0, int((lat + 90.0) // self.cell_degrees)))
+        col = int((lon + 180.0) // self.cell_degrees) % self.cols
+        return row, col
+
+    def _add_edge(self, v: int, ax: float, ay: float, bx: float, by: float,
+                  edges: Dict[int, List[int]], crossings: Dict[int, List[float]]):
+        """Register edge v with every cell of its bounding box and its row-centre crossings"""
+        size = self.cell_degrees
+        first_row, first_col = self._cell(min(ax, bx), min(ay, by))
+        last_row, last_col = self._cell(max(ax, bx), max(ay, by))
+        if last_col < first_col:  # the edge ends on 180°, which wraps to column 0
+            last_col += self.cols
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                edges[row * self.cols + col % self.cols].append(v)
+
+        # Same half-open rule as the ray test: the row centre is crossed when
+        # exactly one end point lies above it
+        for row in range(max(0, first_row - 1), min(self.rows, last_row + 2)):
+            centre_y = -90.0 + (row + 0.5) * size
+            if (ay > centre_y) != (by > centre_y):
+                crossings[row].append(ax + (centre_y - ay) * (bx - ax) / (by - ay))
+
+    def lookup(self, lon: float, lat: float) -> int:
+        """Owner of the polygon containing (lon, lat), or -1"""
+        row, col = self._cell(lon, lat)
+        key = row * self.cols + col
+        keys = self.cell_keys.values
+        i = bisect_left(keys, key)
+        if i == len(keys) or keys[i] != key:
+            return -1
+
+        centre_x = -180.0 + (col + 0.5) * self.cell_degrees
+        centre_y = -90.0 + (row + 0.5) * self.cell_degrees
+        xs, ys, edges = self.xs.values, self.ys.values, self.entry_edges.values
+        for entry in range(self.cell_starts[i], self.cell_starts[i + 1]):
+            inside = self.entry_inside[entry]
+            for e in range(self.entry_edge_starts[entry], self.entry_edge_starts[entry + 1]):
+                v = edges[e]
+                if _crosses(centre_x, centre_y, lon, lat, xs[v], ys[v], xs[v + 1], ys[v + 1]):
+                    inside = not inside
+            if inside:
+                return self.owners[self.entry_polygon[entry]]
+        return -1
+
+
+def regional_flag(flags: Dict[str, Any], properties: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The regional_flags.json region an admin-1 feature belongs to, if any
+
+    Matched by ISO 3166-2 code ('US-CA'), by Natural Earth's region code
+    ('ES.CT' is a province of Catalonia), then by name - of the feature, its
+    region or its constituent country ('England' for an English county).
+    """
+    regions = {region['code']: region for region in (flags.get('regions') or {}).values()}
+    by_name = {normalize(region['name']): region for region in regions.values()}
+
+    codes = [clean_name(properties.get('iso_3166_2')), clean_name(properties.get('region_cod')).replace('.', '-')]
+    for code in codes:
+        if code in regions:
+            return regions[code]
+    for field in ('name', 'region', 'geonunit'):
+        name = normalize(properties.get(field))
+        if name in by_name:
+            return by_name[name]
+        if REGION_ALIASES.get(name) in regions:
+            return regions[REGION_ALIASES[name]]
+    return None
+
+
+class Geocoder:
+    """Country, admin-1 region and flag of a point"""
+
+    def __init__(self, boundaries: Optional[Dict[str, Any]], regions: Optional[Dict[str, Any]] = None,
+                 regional_flags: Optional[Dict[str, Any]] = None,
+                 countries: Optional[Dict[str, Dict[str, Any]]] = None):
+        countries = countries or {}
+        flag_countries = (regional_flags or {}).get('countries') or {}
+
+        self.countries: List[Dict[str, Any]] = []
+        by_code: Dict[str, int] = {}
+        polygons = []
+        for feature in (boundaries or {}).get('features', []):
+            properties = feature.get('properties') or {}
+            code = clean_name(properties.get('iso_a2'))
+            if not code or code == '-99':
+                continue
+            if code not in by_code:
+                entity = countries.get(code) or {}
+                by_code[code] = len(self.countries)
+                self.countries.append({
+                    'country': code,
+                    'country_name': clean_name(entity.get('name') or properties.get('name')),
+                    'flag': entity.get('flag') or (flag_countries.get(code) or {}).get('flag')
+                })
+            polygons.extend((by_code[code], polygon) for polygon in polygons_of(feature.get('geometry')))
+        self.country_index = PolygonIndex(polygons, COUNTRY_CELL_DEGREES)
+
+        # Second level: each country's own admin-1 polygons
+        self.regions: List[Dict[str, Any]] = []
+        region_polygons: Dict[str, list] = defaultdict(list)
+        for feature in (regions or {}).get('features', []):
+            properties = feature.get('properties') or {}
+            code = clean_name(properties.get('iso_a2'))
+            if code not in by_code:
+                continue
+            country = self.countries[by_code[code]]
+            flag = regional_flag(flag_countries.get(code) or {}, properties)
+            region_polygons[code].extend((len(self.regions), polygon)
+                                         for polygon in polygons_of(feature.get('geometry')))
+            self.regions.append({
+                'region': clean_name(properties.get('iso_3166_2')) or None,
+                'region_name': clean_name(properties.get('name')) or None,
+                'region_type': clean_name(properties.get('type')) or None,
+                'flag': flag['flag'] if flag else country['flag'],
+                'flag_type': (flag.get('type') or 'regional') if flag else 'country',
+                'flag_region': flag['code'] if flag else None,
+                'fallback_flag': (flag or {}).get('fallback_flag') or country['flag']
+            })
+        self.region_indexes = {code: PolygonIndex(polygons, REGION_CELL_DEGREES)
+                               for code, polygons in region_polygons.items()}
+
+    def country_of(self, lat: float, lon: float) -> Optional[str]:
+        """ISO code of the country containing the point"""
+        i = self.country_index.lookup(self._wrap(lon), lat)
+        return self.countries[i]['country'] if i >= 0 else None
+
+    def lookup(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+        """Country, region and most specific flag of a point (None at sea)
+
+        {"country": "GB", "country_name": "United Kingdom",
+         "region": "GB-KEN", "region_name": "Kent", "region_type": "County",
+         "flag": "🏴...", "flag_type": "regional", "flag_region": "GB-ENG",
+         "fallback_flag": "🇬🇧"}
+
+        region is None outside the countries with regional boundaries.
+        flag_type is 'country' when the region has no entry in
+        regional_flags.json, and 'fallback' when its entry only has the
+        national flag. fallback_flag is for clients that cannot render
+        the regional tag sequences.
+        """
+        lon = self._wrap(lon)
+        i = self.country_index.lookup(lon, lat)
+        if i < 0:
+            return None
+        country = self.countries[i]
+        result = dict(country, region=None, region_name=None, region_type=None,
+                      flag_type='country', flag_region=None, fallback_flag=country['flag'])
+
+        regions = self.region_indexes.get(country['country'])
+        if regions is not None:
+            r = regions.lookup(lon, lat)
+            if r >= 0:
+                result.update(self.regions[r])
+        return result
+
+    @staticmethod
+    def _wrap(lon: float) -> float:
+        return (lon + 180.0) % 360.0 - 180.0 if not -180.0 <= lon <= 180.0 else lon
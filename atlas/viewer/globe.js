@@ -10,6 +10,9 @@ class GlobeViewer {
         this.airports = {};
         this.boundaries = null;
         this.regions = null;
+        this.boundaryZoom = null;  // zoom the /api/boundaries levels were loaded for
+        this.boundaryLevels = {};
+        this.boundarySets = null;  // set -> whether /api/boundaries serves it
 
         this.meshes = {
             countryBoundaries: [],
@@ -120,34 +123,42 @@ class GlobeViewer {
 
     async loadData() {
         try {
-            // Load unified countries database
-            const countriesResponse = await fetch('../resources/countries_v2.json');
-            const countriesData = await countriesResponse.json();
-            this.countries = countriesData.entities;
-
-            // Load country boundaries GeoJSON
-            const boundariesResponse = await fetch('../resources/countries_50m.geojson');
-            this.boundaries = await boundariesResponse.json();
-
-            // Load regional boundaries GeoJSON
-            const regionsResponse = await fetch('../resources/regions_10m.geojson');
-            this.regions = await regionsResponse.json();
-
-            // Load airports
-            const airportsResponse = await fetch('../resources/airports_iata.json');
-            const airportsData = await airportsResponse.json();
-            this.airports = airportsData.airports;
-
-            console.log(`Loaded ${Object.keys(this.countries).length} countries`);
-            console.log(`Loaded ${this.boundaries.features.length} country boundaries`);
-            console.log(`Loaded ${this.regions.features.length} regional boundaries`);
-            console.log(`Loaded ${Object.keys(this.airports).length} airports`);
-
-            // Render data on globe
-            this.renderCountryBoundaries();
-            this.renderRegionBoundaries();
-            this.renderAirports();
-            this.renderCapitals();
+            // Boundaries simplified for the current zoom if they were exported
+            // (scripts/11_export_lod.py); then one framed request when served
+            // by serve.py (with the compact TopoJSON boundaries if they were
+            // exported); the separate files otherwise
+            const simplified = await this.loadBoundaryLevels();
+            // Only ask for the boundary sets the simplified levels did not cover
+            const parts = (countryBoundaries) => [
+                'countries',
+                ...(simplified.countries ? [] : [countryBoundaries]),
+                ...(simplified.regions ? [] : ['regions']),
+                'airports'
+            ];
+            const bundled = await this.loadBundle(parts('topology'))
+                || (!simplified.countries && await this.loadBundle(parts('boundaries')));
+            if (!bundled) {
+                // Load unified countries database
+                const countriesResponse = await fetch('../resources/countries_v2.json');
+                this.addPart('countries', await countriesResponse.json());
+
+                if (!simplified.countries) {
+                    // Load country boundaries GeoJSON
+                    const boundariesResponse = await fetch('../resources/countries_50m.geojson');
+                    this.addPart('boundaries', await boundariesResponse.json());
+                }
+
+                if (!simplified.regions) {
+                    // Load regional boundaries GeoJSON
+                    const regionsResponse = await fetch('../resources/regions_10m.geojson');
+                    this.addPart('regions', await regionsResponse.json());
+                }
+
+                // Load airports
+                const airportsResponse = await fetch('../resources/airports_iata.json');
+                this.addPart('airports', await airportsResponse.json());
+            }
+
             this.updateStats();
 
         } catch (error) {
@@ -155,8 +166,210 @@ class GlobeViewer {
         }
     }
 
+    // Store one loaded resource and render it straight away
+    addPart(name, data) {
+        switch (name) {
+            case 'countries':
+                this.countries = data.entities;
+                console.log(`Loaded ${Object.keys(this.countries).length} countries`);
+                break;
+            case 'boundaries':
+                this.boundaries = data;
+                console.log(`Loaded ${this.boundaries.features.length} country boundaries`);
+                this.renderCountryBoundaries();
+                break;
+            case 'topology':
+                this.boundaries = this.topologyToGeoJSON(data, 'countries');
+                console.log(`Loaded ${this.boundaries.features.length} country boundaries (${data.arcs.length} arcs)`);
+                this.renderCountryBoundaries();
+                break;
+            case 'regions':
+                this.regions = data;
+                console.log(`Loaded ${this.regions.features.length} regional boundaries`);
+                this.renderRegionBoundaries();
+                break;
+            case 'airports':
+                this.airports = data.airports;
+                console.log(`Loaded ${Object.keys(this.airports).length} airports`);
+                this.renderAirports();
+                this.renderCapitals();
+                break;
+        }
+    }
+
+    // Decode a quantized, delta-encoded TopoJSON object (scripts/10_export_topology.py)
+    topologyToGeoJSON(topology, name) {
+        const [sx, sy] = topology.transform.scale;
+        const [tx, ty] = topology.transform.translate;
+
+        const arcs = topology.arcs.map(arc => {
+            let x = 0, y = 0;
+            return arc.map(([dx, dy]) => [(x += dx) * sx + tx, (y += dy) * sy + ty]);
+        });
+
+        // Arcs share their end points; ~i means arc i reversed
+        const ring = (indexes) => {
+            const points = [];
+            for (const i of indexes) {
+                const arc = i >= 0 ? arcs[i] : arcs[~i].slice().reverse();
+                if (points.length) points.pop();
+                for (const point of arc) points.push(point);
+            }
+            return points;
+        };
+
+        const features = [];
+        for (const geometry of topology.objects[name].geometries) {
+            let decoded = null;
+            if (geometry.type === 'Polygon') {
+                decoded = { type: 'Polygon', coordinates: geometry.arcs.map(ring) };
+            } else if (geometry.type === 'MultiPolygon') {
+                decoded = { type: 'MultiPolygon', coordinates: geometry.arcs.map(polygon => polygon.map(ring)) };
+            }
+            if (decoded) {
+                features.push({ type: 'Feature', properties: geometry.properties || {}, geometry: decoded });
+            }
+        }
+        return { type: 'FeatureCollection', features };
+    }
+
+    // Web-map style zoom level for the camera distance: 0 fully zoomed out,
+    // one level per halving of the distance to the surface
+    currentZoom() {
+        const altitude = this.camera.position.length() - 100;
+        return Math.max(0, Math.round(Math.log2(400 / altitude)));
+    }
+
+    // Load /api/boundaries at the current zoom and re-render any set whose
+    // level changed. Resolves to { countries, regions }: whether each set is
+    // shown at a simplified level. Sets the server lacks are not asked again.
+    async loadBoundaryLevels() {
+        const zoom = this.currentZoom();
+        if (zoom === this.boundaryZoom) return this.boundarySets;
+
+        const sets = {
+            countries: { meshes: 'countryBoundaries', visible: 'showCountryBoundaries' },
+            regions: { meshes: 'regionBoundaries', visible: 'showRegionBoundaries' }
+        };
+        const available = {};
+        for (const [set, target] of Object.entries(sets)) {
+            available[set] = set in this.boundaryLevels;
+            if (this.boundarySets && !this.boundarySets[set]) continue;
+
+            let response;
+            try {
+                response = await fetch(`/api/boundaries?set=${set}&zoom=${zoom}`);
+            } catch (error) {
+                continue;  // opened from file:// or another static server
+            }
+            if (!response.ok) continue;
+
+            const topology = await response.json();
+            available[set] = true;
+            if (this.boundaryLevels[set] === topology.lod.level) continue;
+            this.boundaryLevels[set] = topology.lod.level;
+
+            const collection = this.topologyToGeoJSON(topology, set);
+            console.log(`Loaded ${collection.features.length} ${set} boundaries at zoom ${zoom} ` +
+                `(level ${topology.lod.level}, ${topology.arcs.length} arcs)`);
+            if (set === 'countries') {
+                this.boundaries = collection;
+                this.renderCountryBoundaries();
+            } else {
+                this.regions = collection;
+                this.renderRegionBoundaries();
+            }
+            this.meshes[target.meshes].forEach(line => {
+                line.visible = this.settings[target.visible];
+            });
+        }
+        this.boundarySets = available;
+        if (available.countries || available.regions) this.boundaryZoom = zoom;
+        return available;
+    }
+
+    // Remove and free the lines of one boundary set before it is redrawn
+    clearMeshes(name) {
+        for (const line of this.meshes[name]) {
+            this.globe.remove(line);
+            line.geometry.dispose();
+            line.material.dispose();
+        }
+        this.meshes[name] = [];
+    }
+
+    // Read /api/bundle: each part is a "<name> <length>" line followed by
+    // <length> bytes of JSON, handed to addPart() as soon as it has arrived.
+    // Resolves false if the server has no bundle endpoint.
+    async loadBundle(parts) {
+        let response;
+        try {
+            response = await fetch(`/api/bundle?parts=${parts.join(',')}`);
+        } catch (error) {
+            return false;  // opened from file:// or another static server
+        }
+        if (!response.ok) return false;
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const chunks = [];
+        let buffered = 0;
+
+        const take = (length) => {
+            const out = new Uint8Array(length);
+            let offset = 0;
+            while (offset < length) {
+                const chunk = chunks[0];
+                const used = Math.min(chunk.length, length - offset);
+                out.set(chunk.subarray(0, used), offset);
+                offset += used;
+                if (used === chunk.length) chunks.shift();
+                else chunks[0] = chunk.subarray(used);
+            }
+            buffered -= length;
+            return out;
+        };
+
+        const lineLength = () => {
+            let seen = 0;
+            for (const chunk of chunks) {
+                const newline = chunk.indexOf(10);
+                if (newline >= 0) return seen + newline;
+                seen += chunk.length;
+            }
+            return -1;
+        };
+
+        let frame = null;
+        for (;;) {
+            if (frame === null) {
+                const length = lineLength();
+                if (length >= 0) {
+                    const [name, size] = decoder.decode(take(length + 1)).trim().split(' ');
+                    frame = { name, size: Number(size) };
+                    continue;
+                }
+            } else if (buffered >= frame.size) {
+                this.addPart(frame.name, JSON.parse(decoder.decode(take(frame.size))));
+                frame = null;
+                continue;
+            }
+
+            const { done, value } = await reader.read();
+            if (done) break;
+            chunks.push(value);
+            buffered += value.length;
+        }
+
+        if (frame !== null || buffered > 0) {
+            throw new Error('Bundle response ended mid-part');
+        }
+        return true;
+    }
+
     renderCountryBoundaries() {
         console.log('Rendering country boundaries...');
+        this.clearMeshes('countryBoundaries');
 
         for (const feature of this.boundaries.features) {
             if (feature.geometry.type !== 'Polygon' && feature.geometry.type !== 'MultiPolygon') {
@@ -194,6 +407,7 @@ class GlobeViewer {
 
     renderRegionBoundaries() {
         console.log('Rendering regional boundaries...');
+        this.clearMeshes('regionBoundaries');
 
         for (const feature of this.regions.features) {
             if (feature.geometry.type !== 'Polygon' && feature.geometry.type !== 'MultiPolygon') {
@@ -327,6 +541,16 @@ class GlobeViewer {
                 this.handleClick(object);
             }
         });
+
+        // Swap in the boundary level for the new zoom once zooming stops,
+        // one load at a time
+        let boundaryLoad = Promise.resolve();
+        this.controls.addEventListener('end', () => {
+            if (this.boundaryZoom === null) return;
+            boundaryLoad = boundaryLoad.then(() => this.loadBoundaryLevels()).catch(error => {
+                console.error('Error loading boundary level:', error);
+            });
+        });
     }
 
     handleClick(object) {
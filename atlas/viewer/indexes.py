@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+
+"""
+In-memory indexes over the atlas resources
+
+Each index is built from one or more files in resources/ and registered in
+INDEX_BUILDERS together with the files it reads. serve.py builds them once at
+startup (or loads them from a snapshot, see snapshot.py) and answers API
+queries from them instead of re-reading the raw JSON.
+"""
+
+import math
+import pickle
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterable, Callable, Tuple
+
+import jsoncodec
+
+# Bump when the structure of any index changes so old snapshots are rebuilt
+INDEX_VERSION = 8
+
+COUNTRIES_FILE = 'resources/countries_v2.json'
+AIRPORTS_FILE = 'resources/airports_iata.json'
+BOUNDARIES_FILE = 'resources/countries_50m.geojson'
+TOPOLOGY_FILE = 'resources/countries_50m.topo.json'
+REGIONS_FILE = 'resources/regions_10m.geojson'
+DELTAS_FILE = 'resources/countries_v2.deltas.json'
+CLUSTERS_FILE = 'resources/airport_clusters.json'
+REGIONAL_FLAGS_FILE = 'resources/regional_flags.json'
+SPATIAL_FILE = 'resources/countries_spatial.json'
+
+# /api/boundaries set -> level-of-detail file from scripts/11_export_lod.py
+LOD_FILES = {
+    'countries': 'resources/countries_50m.lod.json',
+    'regions': 'resources/regions_10m.lod.json',
+}
+
+# /api/bundle part -> resource file, in the order the globe renders them
+BUNDLE_PARTS = {
+    'countries': COUNTRIES_FILE,
+    'boundaries': BOUNDARIES_FILE,
+    'topology': TOPOLOGY_FILE,
+    'regions': REGIONS_FILE,
+    'airports': AIRPORTS_FILE,
+    'spatial': SPATIAL_FILE,
+}
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def clean_name(value: Optional[str]) -> str:
+    """Strip the NUL padding Natural Earth leaves in fixed-width strings"""
+    return (value or '').replace('\x00', '').strip()
+
+
+def normalize(value: Optional[str]) -> str:
+    """Lower-case, accent-free form used for matching names"""
+    text = unicodedata.normalize('NFKD', clean_name(value))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r'[^a-z0-9]+', ' ', text.lower()).strip()
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def encode_compact(value: Any) -> bytes:
+    """UTF-8 JSON without insignificant whitespace"""
+    return jsoncodec.dumps(value)
+
+
+def project(record: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """Copy of record keeping only the given dotted field paths"""
+    result: Dict[str, Any] = {}
+    taken = set()
+    for path in sorted(set(fields)):
+        keys = path.split('.')
+        # 'geography' already includes 'geography.area'
+        if any('.'.join(keys[:i]) in taken for i in range(1, len(keys))):
+            continue
+        value = record
+        for key in keys:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            target = result
+            for key in keys[:-1]:
+                target = target.setdefault(key, {})
+            target[keys[-1]] = value
+            taken.add(path)
+    return result
+
+
+def project_part(part: str, document: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """A bundle part's document with every record reduced to fields
+
+    Countries, spatial and airports are projected per entity; for the GeoJSON
+    and TopoJSON parts the fields select feature properties and the geometry
+    is always kept.
+    """
+    if part == 'topology':
+        objects = {name: dict(obj, geometries=[dict(g, properties=project(g.get('properties') or {}, fields))
+                                               for g in obj.get('geometries', [])])
+                   for name, obj in document.get('objects', {}).items()}
+        return dict(document, objects=objects)
+
+    if part in ('boundaries', 'regions'):
+        features = [dict(feature, properties=project(feature.get('properties') or {}, fields))
+                    for feature in document.get('features', [])]
+        return dict(document, features=features)
+
+    collection = 'entities' if part in ('countries', 'spatial') else 'airports'
+    records = {key: project(record, fields) for key, record in document.get(collection, {}).items()}
+    return dict(document, **{collection: records})
+
+
+def _rebuild_column(typecode: str, buffer) -> 'Column':
+    return Column(typecode, memoryview(buffer).cast('B').cast(typecode))
+
+
+class Column:
+    """Typed numeric column backed by a flat buffer
+
+    Pickles its buffer out-of-band (protocol 5), so a column loaded from a
+    memory-mapped snapshot is a view over the mapping rather than a copy.
+    """
+
+    def __init__(self, typecode: str, values: Iterable = ()):
+        self.typecode = typecode
+        if isinstance(values, memoryview):
+            self.values = values
+        else:
+            self.values = memoryview(array(typecode, values))
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, i):
+        return self.values[i]
+
+    def __reduce_ex__(self, protocol):
+        if protocol >= 5:
+            return _rebuild_column, (self.typecode, pickle.PickleBuffer(self.values.cast('B')))
+        return _rebuild_column, (self.typecode, self.values.tobytes())
+
+
+class SearchIndex:
+    """Prefix search over country and airport names and codes"""
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        postings: Dict[str, set] = {}
+        for i, entry in enumerate(entries):
+            for token in entry.pop('_tokens'):
+                postings.setdefault(token, set()).add(i)
+
+        self.entries = entries
+        self.tokens = sorted(postings)
+        self.postings = [sorted(postings[t]) for t in self.tokens]
+
+    def _prefix_matches(self, prefix: str) -> set:
+        start = bisect_left(self.tokens, prefix)
+        end = bisect_right(self.tokens, prefix + '\uffff')
+        matches = set()
+        for i in range(start, end):
+            matches.update(self.postings[i])
+        return matches
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Entries whose tokens start with every word of the query"""
+        words = normalize(query).split()
+        if not words:
+            return []
+
+        hits = None
+        for word in words:
+            matches = self._prefix_matches(word)
+            hits = matches if hits is None else hits & matches
+            if not hits:
+                return []
+
+        code = query.strip().upper()
+
+        def rank(i: int) -> Tuple:
+            entry = self.entries[i]
+            exact = code in (entry.get('code'), entry.get('iata'), entry.get('icao'))
+            return (not exact, entry['type'] != 'country', entry['name'])
+
+        return [self.entries[i] for i in sorted(hits, key=rank)[:limit]]
+
+
+class AirportGrid:
+    """Airports bucketed into 1° cells for radius queries"""
+
+    CELL_DEGREES = 1.0
+
+    def __init__(self, airports: List[Dict[str, Any]]):
+        def cell_of(a):
+            return self.cell_key(a['lat'], a['lon'])
+
+        ordered = sorted(airports, key=cell_of)
+        self.iata = [a['iata'].upper() for a in ordered]
+        self.lat = Column('d', (a['lat'] for a in ordered))
+        self.lon = Column('d', (a['lon'] for a in ordered))
+
+        keys, starts = [], []
+        for i, airport in enumerate(ordered):
+            key = cell_of(airport)
+            if not keys or keys[-1] != key:
+                keys.append(key)
+                starts.append(i)
+        starts.append(len(ordered))
+        self.cell_keys = Column('I', keys)
+        self.cell_starts = Column('I', starts)
+
+    @classmethod
+    def cell_key(cls, lat: float, lon: float) -> int:
+        row = min(179, int((lat + 90) // cls.CELL_DEGREES))
+        col = int((lon + 180) // cls.CELL_DEGREES) % 360
+        return row * 360 + col
+
+    def _cell_range(self, key: int) -> range:
+        i = bisect_left(self.cell_keys.values, key)
+        if i < len(self.cell_keys) and self.cell_keys[i] == key:
+            return range(self.cell_starts[i], self.cell_starts[i + 1])
+        return range(0)
+
+    def nearby(self, lat: float, lon: float, radius_km: float, limit: int = 20) -> List[Tuple[str, float]]:
+        """(IATA, distance km) pairs within radius_km, nearest first"""
+        lat_span = radius_km / 111.0
+        lon_span = radius_km / max(1.0, 111.0 * math.cos(math.radians(min(89.0, abs(lat)))))
+        lon_span = min(lon_span, 180.0)
+
+        rows = range(max(0, int((lat - lat_span + 90) // self.CELL_DEGREES)),
+                     min(179, int((lat + lat_span + 90) // self.CELL_DEGREES)) + 1)
+        first_col = int((lon - lon_span + 180) // self.CELL_DEGREES)
+        last_col = int((lon + lon_span + 180) // self.CELL_DEGREES)
+        cols = {c % 360 for c in range(first_col, last_col + 1)}
+
+        results = []
+        for row in rows:
+            for col in cols:
+                for i in self._cell_range(row * 360 + col):
+                    distance = haversine_km(lat, lon, self.lat[i], self.lon[i])
+                    if distance <= radius_km:
+                        results.append((self.iata[i], distance))
+
+        results.sort(key=lambda r: r[1])
+        return results[:limit]
+
+
+class ClusterIndex:
+    """Airport cluster levels from scripts/13_cluster_airports.py, sorted by longitude
+
+    A bbox query bisects the longitude column of one level and filters
+    latitude, so it touches only the clusters in (or level with) the view.
+    """
+
+    def __init__(self, document: Dict[str, Any]):
+        self.max_zoom = document['max_zoom']
+        self.levels = []
+        for level in document['levels']:
+            order = sorted(range(len(level['lon'])), key=lambda i: level['lon'][i])
+            self.levels.append({
+                'lon': Column('d', (level['lon'][i] for i in order)),
+                'lat': Column('d', (level['lat'][i] for i in order)),
+                'count': Column('I', (level['count'][i] for i in order)),
+                'airport': [level['airport'][i] for i in order],
+                'id': Column('I', order),
+            })
+
+    def query(self, zoom: int, west: float, south: float, east: float, north: float,
+              limit: int = 500) -> List[Dict[str, Any]]:
+        """Clusters of the zoom level inside the bbox, largest first
+
+        Zooms past the last cluster level return single airports. A bbox
+        with west > east crosses the antimeridian.
+        """
+        zoom = max(0, min(zoom, len(self.levels) - 1))
+        level = self.levels[zoom]
+        lons = level['lon'].values
+        spans = [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+
+        found = []
+        for low, high in spans:
+            for i in range(bisect_left(lons, low), bisect_right(lons, high)):
+                if south <= level['lat'][i] <= north:
+                    found.append(i)
+        found.sort(key=lambda i: -level['count'][i])
+
+        return [{'id': f"{zoom}/{level['id'][i]}", 'lat': level['lat'][i], 'lon': level['lon'][i],
+                 'count': level['count'][i], 'airport': level['airport'][i]}
+                for i in found[:limit]]
+
+
+def build_countries(resources: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Unified country entities keyed by ISO code"""
+    return (resources.get(COUNTRIES_FILE) or {}).get('entities', {})
+
+
+def build_airports(resources: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Airports keyed by upper-case IATA code"""
+    airports = (resources.get(AIRPORTS_FILE) or {}).get('airports', {})
+    return {a['iata'].upper(): a for a in airports.values()}
+
+
+def build_search(resources: Dict[str, Any]) -> SearchIndex:
+    """Name/code search over countries and airports"""
+    entries = []
+
+    for code, country in build_countries(resources).items():
+        name = clean_name(country.get('name'))
+        tokens = set(normalize(name).split()) | set(normalize(country.get('name_long')).split())
+        tokens.update(c.lower() for c in (code, clean_name(country.get('iso_a3'))) if c)
+        entries.append({'type': 'country', 'code': code, 'name': name,
+                        'flag': country.get('flag'), '_tokens': tokens})
+
+    for iata, airport in build_airports(resources).items():
+        tokens = set(normalize(airport.get('name')).split()) | set(normalize(airport.get('city')).split())
+        tokens.update((iata.lower(), airport['icao'].lower()))
+        entries.append({'type': 'airport', 'iata': iata, 'icao': airport['icao'],
+                        'name': airport.get('name') or iata, 'city': airport.get('city'),
+                        'country': airport.get('country'), '_tokens': tokens})
+
+    return SearchIndex(entries)
+
+
+def build_airport_grid(resources: Dict[str, Any]) -> AirportGrid:
+    """Spatial grid over airport coordinates"""
+    return AirportGrid(list(build_airports(resources).values()))
+
+
+def build_airport_clusters(resources: Dict[str, Any]) -> Optional[ClusterIndex]:
+    """Cluster levels for bbox queries (None until 13_cluster_airports.py has run)"""
+    document = resources.get(CLUSTERS_FILE)
+    return ClusterIndex(document) if document is not None else None
+
+
+def build_bundle_parts(resources: Dict[str, Any]) -> Dict[str, Column]:
+    """Each /api/bundle part pre-encoded as compact JSON; missing files are left out"""
+    return {part: Column('B', memoryview(encode_compact(resources[relative])))
+            for part, relative in BUNDLE_PARTS.items() if resources.get(relative) is not None}
+
+
+def build_deltas(resources: Dict[str, Any]) -> Dict[str, Any]:
+    """Patch chain from scripts/09_export_deltas.py, pre-encoded and keyed by 'from' build"""
+    history = resources.get(DELTAS_FILE) or {}
+    builds = history.get('builds') or []
+    return {
+        'current': history.get('current'),
+        'sha256': builds[-1]['sha256'] if builds else None,
+        'patches': {patch['from']: (patch['to'], Column('B', memoryview(encode_compact(patch))))
+                    for patch in history.get('patches', [])}
+    }
+
+
+def build_boundary_lod(resources: Dict[str, Any]) -> Dict[str, List[Tuple[Optional[int], Column]]]:
+    """Per boundary set, (max zoom, pre-encoded Topology) for each level, coarsest first"""
+    sets = {}
+    for name, relative in LOD_FILES.items():
+        document = resources.get(relative)
+        if document is None:
+            continue
+        levels = []
+        for i, level in enumerate(document['levels']):
+            topology = {
+                'type': 'Topology',
+                'bbox': document['bbox'],
+                'transform': document['transform'],
+                'objects': document['objects'],
+                'arcs': level['arcs'],
+                'lod': {'level': i, 'max_zoom': level['max_zoom'], 'tolerance': level['tolerance']}
+            }
+            levels.append((level['max_zoom'], Column('B', memoryview(encode_compact(topology)))))
+        sets[name] = levels
+    return sets
+
+
+def build_geocoder(resources: Dict[str, Any]) -> Any:
+    """Two-level country/region point lookup (see geocoder.py)"""
+    from geocoder import Geocoder
+
+    return Geocoder(resources.get(BOUNDARIES_FILE), resources.get(REGIONS_FILE),
+                    resources.get(REGIONAL_FLAGS_FILE), build_countries(resources))
+
+
+def build_rank(resources: Dict[str, Any]) -> Any:
+    """Numeric country fields with precomputed sort orders (see ranking.py)"""
+    from ranking import RankIndex
+
+    return RankIndex(build_countries(resources))
+
+
+# name -> (builder, resource files it reads, relative to the atlas directory)
+INDEX_BUILDERS: Dict[str, Tuple[Callable[[Dict[str, Any]], Any], Tuple[str, ...]]] = {
+    'countries': (build_countries, (COUNTRIES_FILE,)),
+    'airports': (build_airports, (AIRPORTS_FILE,)),
+    'search': (build_search, (COUNTRIES_FILE, AIRPORTS_FILE)),
+    'airport_grid': (build_airport_grid, (AIRPORTS_FILE,)),
+    'airport_clusters': (build_airport_clusters, (CLUSTERS_FILE,)),
+    'bundle_parts': (build_bundle_parts, tuple(BUNDLE_PARTS.values())),
+    'deltas': (build_deltas, (DELTAS_FILE,)),
+    'boundary_lod': (build_boundary_lod, tuple(LOD_FILES.values())),
+    'geocoder': (build_geocoder, (BOUNDARIES_FILE, REGIONS_FILE, REGIONAL_FLAGS_FILE, COUNTRIES_FILE)),
+    'rank': (build_rank, (COUNTRIES_FILE,)),
+}
+
+
+def source_files() -> List[str]:
+    """All resource files read by any index"""
+    return sorted({f for _, files in INDEX_BUILDERS.values() for f in files})
+
+
+def load_resources(base_dir: Path, files: Iterable[str]) -> Dict[str, Any]:
+    """Parse each resource file once; missing files map to None"""
+    resources = {}
+    for relative in files:
+        path = Path(base_dir) / relative
+        if path.exists():
+            with open(path, 'rb') as f:
+                resources[relative] = jsoncodec.load(f)
+        else:
+            resources[relative] = None
+    return resources
+
+
+def build_indexes(base_dir: Path) -> Dict[str, Any]:
+    """Build every registered index from the raw resources"""
+    resources = load_resources(base_dir, source_files())
+    return {name: builder(resources) for name, (builder, _) in INDEX_BUILDERS.items()}
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+"""
+JSON encoding and decoding through the fastest installed backend
+
+BACKENDS lists the implementations in order of preference: orjson when it is
+installed, the stdlib json module always. The first one is used unless
+ATLAS_JSON names another (ATLAS_JSON=json forces the stdlib), and use()
+switches at runtime. An ATLAS_JSON backend that is unknown or not installed
+is ignored with a warning, so a typo does not stop the server from
+starting. Every backend produces UTF-8 bytes with non-ASCII characters
+unescaped, either compact (',' and ':' separators) or pretty (indent=2, as
+json.dumps(indent=2) writes it).
+
+orjson output is byte-identical to the stdlib's except for two spellings of
+the same data: floats the stdlib writes in exponent form (1e-05, 1e+16) come
+out as 0.00001 and 1e16, and NaN/Infinity become null rather than the
+non-standard NaN. Values orjson rejects (integers beyond 64 bits, non-string
+keys) fall back to the stdlib, so anything json.dumps accepts still encodes;
+likewise documents orjson refuses to parse are handed to json.loads, which
+also reports the real syntax errors.
+"""
+
+import json
+import os
+import warnings
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+Codec = Tuple[Callable[..., bytes], Callable[[Any], Any]]
+
+
+def _stdlib_dumps(value: Any, pretty: bool = False, sort_keys: bool = False) -> bytes:
+    if pretty:
+        return json.dumps(value, ensure_ascii=False, indent=2, sort_keys=sort_keys).encode('utf-8')
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), sort_keys=sort_keys).encode('utf-8')
+
+
+def _stdlib_loads(data: Any) -> Any:
+    return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+def _orjson_dumps(value: Any, pretty: bool = False, sort_keys: bool = False) -> bytes:
+    option = (orjson.OPT_INDENT_2 if pretty else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+    try:
+        return orjson.dumps(value, option=option)
+    except orjson.JSONEncodeError:
+        return _stdlib_dumps(value, pretty, sort_keys)
+
+
+def _orjson_loads(data: Any) -> Any:
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return _stdlib_loads(data)
+
+
+# Name -> (dumps, loads), fastest first
+BACKENDS: Dict[str, Codec] = {}
+if orjson is not None:
+    BACKENDS['orjson'] = (_orjson_dumps, _orjson_loads)
+BACKENDS['json'] = (_stdlib_dumps, _stdlib_loads)
+
+BACKEND = ''
+_dumps, _loads = BACKENDS['json']
+
+
+def use(name: Optional[str] = None) -> str:
+    """Switch to the named backend (default: ATLAS_JSON, else the fastest); returns its name
+
+    ValueError for a name that is not in BACKENDS; a bad ATLAS_JSON only warns.
+    """
+    global BACKEND, _dumps, _loads
+    if name is None:
+        name = os.environ.get('ATLAS_JSON') or next(iter(BACKENDS))
+        if name not in BACKENDS:
+            warnings.warn(f"ATLAS_JSON={name} is not an available JSON backend "
+                          f"(one of {', '.join(BACKENDS)}); using {next(iter(BACKENDS))}")
+            name = next(iter(BACKENDS))
+    if name not in BACKENDS:
+        raise ValueError(f"JSON backend '{name}' not available (one of {', '.join(BACKENDS)})")
+    BACKEND = name
+    _dumps, _loads = BACKENDS[name]
+    return name
+
+
+def dumps(value: Any, pretty: bool = False, sort_keys: bool = False) -> bytes:
+    """UTF-8 JSON, compact or indented by 2"""
+    return _dumps(value, pretty, sort_keys)
+
+
+def loads(data: Any) -> Any:
+    """Parse str, bytes, bytearray or memoryview"""
+    return _loads(data)
+
+
+def dump(value: Any, stream, pretty: bool = False, sort_keys: bool = False) -> int:
+    """Write value to a binary file or socket file (wfile); returns bytes written"""
+    data = _dumps(value, pretty, sort_keys)
+    stream.write(data)
+    return len(data)
+
+
+def send(value: Any, sock, pretty: bool = False, sort_keys: bool = False) -> int:
+    """Send value on a connected socket; returns bytes sent"""
+    data = _dumps(value, pretty, sort_keys)
+    sock.sendall(data)
+    return len(data)
+
+
+def load(stream) -> Any:
+    """Parse a whole binary file"""
+    return _loads(stream.read())
+
+
+use()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+"""
+Request metrics for serve.py
+
+Counts requests, status codes and bytes per route, keeps an HDR-style latency
+histogram per route, and tracks hit/miss counts for the server's caches. The
+whole thing is exposed at /metrics in Prometheus text format.
+
+Recording a request is a handful of integer updates under one lock, so the
+instrumentation stays on in production. Histograms use log-linear buckets
+(16 sub-buckets per power of two, i.e. at most ~6% error) over microseconds,
+so memory per route is fixed regardless of traffic.
+
+In --workers mode every process keeps its own counters; each scrape reports
+the worker that accepted the connection (see the pid label).
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+# Enough buckets for latencies up to 2^40 µs (~12 days)
+MAX_BUCKETS = (40 - SUB_BUCKET_BITS) * SUB_BUCKETS + 2 * SUB_BUCKETS
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def bucket_index(value: int) -> int:
+    """Log-linear bucket for a non-negative integer value"""
+    bits = value.bit_length()
+    if bits <= SUB_BUCKET_BITS + 1:
+        return value
+    shift = bits - SUB_BUCKET_BITS - 1
+    return shift * SUB_BUCKETS + (value >> shift)
+
+
+def bucket_upper(index: int) -> int:
+    """Largest value that falls into bucket index"""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    mantissa = index - shift * SUB_BUCKETS
+    return ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Fixed-size log-linear histogram of microsecond latencies"""
+
+    def __init__(self):
+        self.counts = [0] * MAX_BUCKETS
+        self.total = 0
+        self.sum_us = 0
+        self.max_us = 0
+
+    def record(self, micros: int):
+        self.counts[min(bucket_index(micros), MAX_BUCKETS - 1)] += 1
+        self.total += 1
+        self.sum_us += micros
+        if micros > self.max_us:
+            self.max_us = micros
+
+    def quantile(self, q: float) -> int:
+        """Upper bound (µs) of the bucket holding the q-th quantile"""
+        if not self.total:
+            return 0
+        rank = max(1, int(q * self.total + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bucket_upper(index), self.max_us)
+        return self.max_us
+
+
+class RouteStats:
+    __slots__ = ('statuses', 'bytes_sent', 'latency')
+
+    def __init__(self):
+        self.statuses: Dict[int, int] = {}
+        self.bytes_sent = 0
+        self.latency = LatencyHistogram()
+
+
+class Metrics:
+    """Process-wide registry of request and cache metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routes: Dict[str, RouteStats] = {}
+        self.caches: Dict[str, List[int]] = {}
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], int] = {}
+        self.gauges: Dict[str, Tuple[str, Callable[[], Dict[Tuple[Tuple[str, str], ...], float]]]] = {}
+        self.started = time.time()
+
+    def observe(self, route: str, status: int, bytes_sent: int, seconds: float):
+        """Record one completed request"""
+        micros = int(seconds * 1e6)
+        with self._lock:
+            stats = self.routes.get(route)
+            if stats is None:
+                stats = self.routes[route] = RouteStats()
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.bytes_sent += bytes_sent
+            stats.latency.record(micros)
+
+    def cache_lookup(self, cache: str, hit: bool):
+        """Record a hit or miss for a named cache"""
+        with self._lock:
+            counts = self.caches.get(cache)
+            if counts is None:
+                counts = self.caches[cache] = [0, 0]
+            counts[0 if hit else 1] += 1
+
+    def increment(self, name: str, amount: int = 1, **labels: str):
+        """Bump a free-form counter (exported as atlas_<name>_total)"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def register_gauge(self, name: str, help_text: str,
+                       read: Callable[[], Dict[Tuple[Tuple[str, str], ...], float]]):
+        """Export atlas_<name>, read at scrape time as {label pairs: value}"""
+        self.gauges[name] = (help_text, read)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format"""
+        pid = os.getpid()
+        lines = [
+            '# HELP atlas_process_start_time_seconds Start time of this server process',
+            '# TYPE atlas_process_start_time_seconds gauge',
+            f'atlas_process_start_time_seconds{{pid="{pid}"}} {self.started:.3f}',
+        ]
+
+        with self._lock:
+            routes = sorted(self.routes.items())
+            caches = sorted((name, list(counts)) for name, counts in self.caches.items())
+            counters = sorted(self.counters.items())
+
+            lines += ['# HELP atlas_http_requests_total Requests by route and status',
+                      '# TYPE atlas_http_requests_total counter']
+            for route, stats in routes:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'atlas_http_requests_total{{pid="{pid}",route="{route}",status="{status}"}} {count}')
+
+            lines += ['# HELP atlas_http_response_bytes_total Bytes sent by route',
+                      '# TYPE atlas_http_response_bytes_total counter']
+            for route, stats in routes:
+                lines.append(f'atlas_http_response_bytes_total{{pid="{pid}",route="{route}"}} {stats.bytes_sent}')
+
+            lines += ['# HELP atlas_http_request_duration_seconds Request latency by route',
+                      '# TYPE atlas_http_request_duration_seconds summary']
+            for route, stats in routes:
+                latency = stats.latency
+                for q in QUANTILES:
+                    lines.append(f'atlas_http_request_duration_seconds{{pid="{pid}",route="{route}",quantile="{q}"}} '
+                                 f'{latency.quantile(q) / 1e6:.6f}')
+                lines.append(f'atlas_http_request_duration_seconds_sum{{pid="{pid}",route="{route}"}} '
+                             f'{latency.sum_us / 1e6:.6f}')
+                lines.append(f'atlas_http_request_duration_seconds_count{{pid="{pid}",route="{route}"}} {latency.total}')
+
+        lines += ['# HELP atlas_cache_requests_total Cache lookups by cache and result',
+                  '# TYPE atlas_cache_requests_total counter']
+        for name, (hits, misses) in caches:
+            lines.append(f'atlas_cache_requests_total{{pid="{pid}",cache="{name}",result="hit"}} {hits}')
+            lines.append(f'atlas_cache_requests_total{{pid="{pid}",cache="{name}",result="miss"}} {misses}')
+
+        lines += ['# HELP atlas_cache_hit_ratio Fraction of cache lookups that were hits',
+                  '# TYPE atlas_cache_hit_ratio gauge']
+        for name, (hits, misses) in caches:
+            ratio = hits / (hits + misses) if hits + misses else 0.0
+            lines.append(f'atlas_cache_hit_ratio{{pid="{pid}",cache="{name}"}} {ratio:.4f}')
+
+        seen_types = set()
+        for (name, labels), value in counters:
+            metric = f'atlas_{name}_total'
+            if metric not in seen_types:
+                seen_types.add(metric)
+                lines.append(f'# TYPE {metric} counter')
+            label_text = ','.join([f'pid="{pid}"'] + [f'{k}="{v}"' for k, v in labels])
+            lines.append(f'{metric}{{{label_text}}} {value}')
+
+        for name, (help_text, read) in sorted(self.gauges.items()):
+            metric = f'atlas_{name}'
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} gauge']
+            for labels, value in sorted(read().items()):
+                label_text = ','.join([f'pid="{pid}"'] + [f'{k}="{v}"' for k, v in labels])
+                lines.append(f'{metric}{{{label_text}}} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+# Shared by the request handler, the reloader and the caches
+METRICS = Metrics()
+
+
+class CountingWriter:
+    """Wraps a handler's wfile to count the bytes written to the client"""
+
+    def __init__(self, wrapped):
+        self.wrapped = wrapped
+        self.bytes_written = 0
+
+    def write(self, data) -> int:
+        written = self.wrapped.write(data)
+        self.bytes_written += len(data)
+        return written
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+"""
+Prefork multi-process mode for serve.py
+
+The master process loads the resources once and then forks N workers, so the
+indexes are shared copy-on-write instead of being rebuilt per process. Each
+worker binds its own listening socket with SO_REUSEPORT and the kernel
+spreads incoming connections across them; where SO_REUSEPORT is not
+available the workers share one socket bound by the master.
+
+The master only supervises: it respawns workers that die, and on SIGTERM or
+Ctrl+C it asks every worker to stop accepting connections, finish in-flight
+requests and exit, killing any that are still running after a grace period.
+"""
+
+import http.server
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Seconds workers get to finish in-flight requests before being killed
+SHUTDOWN_GRACE = 10.0
+
+# A worker exiting sooner than this after starting counts as a crash
+MIN_WORKER_LIFETIME = 1.0
+MAX_RAPID_CRASHES = 5
+
+HAS_REUSEPORT = hasattr(socket, 'SO_REUSEPORT') and sys.platform.startswith('linux')
+
+
+class WorkerHTTPServer(http.server.ThreadingHTTPServer):
+    """Threaded server that can share its port with sibling processes"""
+
+    # Non-daemon request threads, so server_close() waits for in-flight requests
+    daemon_threads = False
+
+    # Accept bursts into the process so admission control can queue or shed
+    # them, rather than leaving them to time out in the kernel backlog
+    request_queue_size = 128
+
+    def __init__(self, address, handler, reuse_port: bool = False,
+                 listen_socket: Optional[socket.socket] = None):
+        self.reuse_port = reuse_port
+        if listen_socket is None:
+            super().__init__(address, handler)
+        else:
+            super().__init__(address, handler, bind_and_activate=False)
+            self.socket.close()
+            self.socket = listen_socket
+            self.server_address = listen_socket.getsockname()
+
+    def server_bind(self):
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+
+def _run_worker(number: int, port: int, handler, listen_socket: Optional[socket.socket],
+                on_start: Optional[Callable[[], None]]):
+    """Body of a forked worker; never returns"""
+    # Ctrl+C reaches the whole process group - let the master coordinate
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    status = 0
+    try:
+        httpd = WorkerHTTPServer(("", port), handler, reuse_port=listen_socket is None,
+                                 listen_socket=listen_socket)
+
+        def stop(signum, frame):
+            # shutdown() blocks until serve_forever() returns, so call it elsewhere
+            threading.Thread(target=httpd.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+
+        if on_start:
+            on_start()
+
+        httpd.serve_forever()
+        httpd.server_close()  # joins in-flight request threads
+    except Exception as e:
+        print(f"⚠️  Worker {number} (pid {os.getpid()}) failed: {e}", file=sys.stderr)
+        status = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(status)
+
+
+def serve_prefork(port: int, handler, workers: int,
+                  on_worker_start: Optional[Callable[[], None]] = None,
+                  on_started: Optional[Callable[[], None]] = None):
+    """Fork workers serving handler on port and supervise them until stopped
+
+    on_worker_start runs in each worker before it serves; on_started runs in
+    the master once the first workers are forked.
+    """
+    if not hasattr(os, 'fork'):
+        raise RuntimeError("--workers needs os.fork(), which this platform does not provide")
+
+    listen_socket = None
+    if not HAS_REUSEPORT:
+        listen_socket = socket.create_server(("", port), reuse_port=False)
+
+    children: Dict[int, tuple] = {}
+    stopping = threading.Event()
+    rapid_crashes = 0
+
+    def spawn(number: int):
+        # Don't let children inherit (and re-print) buffered output
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(number, port, handler, listen_socket, on_worker_start)
+        children[pid] = (number, time.monotonic())
+
+    def request_stop(signum, frame):
+        stopping.set()
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    for number in range(1, workers + 1):
+        spawn(number)
+
+    mode = 'SO_REUSEPORT' if HAS_REUSEPORT else 'shared socket'
+    print(f"👷 Started {workers} workers ({mode}): {', '.join(str(p) for p in children)}")
+    if on_started:
+        on_started()
+
+    deadline = None
+    while children:
+        if stopping.is_set() and deadline is None:
+            deadline = time.monotonic() + SHUTDOWN_GRACE
+
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+
+        if pid == 0:
+            if deadline is not None and time.monotonic() > deadline:
+                for remaining in list(children):
+                    print(f"⚠️  Worker pid {remaining} did not stop in time - killing")
+                    try:
+                        os.kill(remaining, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                deadline = float('inf')
+            time.sleep(0.1)
+            continue
+
+        number, started = children.pop(pid)
+        if stopping.is_set():
+            continue
+
+        code = os.waitstatus_to_exitcode(status)
+        print(f"⚠️  Worker {number} (pid {pid}) exited with {code} - respawning")
+        if time.monotonic() - started < MIN_WORKER_LIFETIME:
+            rapid_crashes += 1
+            if rapid_crashes >= MAX_RAPID_CRASHES:
+                print("❌ Workers keep crashing on startup - giving up")
+                request_stop(None, None)
+                continue
+            time.sleep(MIN_WORKER_LIFETIME)
+        else:
+            rapid_crashes = 0
+        spawn(number)
+
+    if listen_socket is not None:
+        listen_socket.close()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+"""
+Country rankings: numeric fields as typed columns with precomputed sort orders
+
+RankIndex keeps one float64 column per RANK_FIELDS entry (NaN where a
+country has no value) and, for each, the row order in both directions with
+the countries lacking a value left out. A ranking query never sorts: it walks
+the stored order and keeps the rows that pass the filters, and a country's
+world rank is a lookup in the inverse of that order.
+
+Filters are comma-separated conditions on a ranked field or on a
+CATEGORY_FIELDS value:
+
+    continent:europe,population.total>=1000000,area.total_sq_km<50000
+
+With NumPy installed, filters are evaluated as boolean masks over views of
+the columns (no copies, also when the index comes from the memory-mapped
+snapshot); without it, the same query runs row by row in Python.
+"""
+
+import math
+import operator
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+from indexes import Column, clean_name, normalize
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Field name -> path in a countries_v2.json entity
+RANK_FIELDS = {
+    'population.total': ('people', 'population', 'total'),
+    'area.total_sq_km': ('geography', 'area', 'total_sq_km'),
+    'gdp.value': ('economy', 'gdp', 'value'),
+    'gdp_per_capita': ('economy', 'gdp_per_capita'),
+    'elevation': ('geography', 'elevation', 'mean_elevation'),
+}
+
+CATEGORY_FIELDS = {
+    'continent': ('geography', 'continent'),
+    'region': ('geography', 'region'),
+    'subregion': ('geography', 'subregion'),
+}
+
+ORDERS = ('desc', 'asc')
+
+# Comparisons work alike on numbers and on NumPy arrays
+OPERATORS = {'=': operator.eq, '>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+
+CONDITION = re.compile(r'^\s*([a-z_.]+)\s*(>=|<=|>|<|=|:)\s*(.+?)\s*$')
+
+NUMBER = re.compile(r'-?\d[\d,]*(?:\.\d+)?')
+
+
+def to_number(value: Any) -> float:
+    """Float of a number or of the first number in factbook text ("1,138 m"); NaN if none"""
+    if isinstance(value, bool) or value is None:
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = NUMBER.search(str(value))
+    return float(match.group().replace(',', '')) if match else math.nan
+
+
+def _lookup(entity: Dict[str, Any], path: Tuple[str, ...]) -> Any:
+    value: Any = entity
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _sort_order(values: Column, descending: bool) -> Column:
+    """Rows with a value, sorted by it; ties stay in code order"""
+    if np is not None:
+        column = np.frombuffer(values.values, dtype=np.float64)
+        order = np.argsort(-column if descending else column, kind='stable')
+        order = order[~np.isnan(column[order])]
+        return Column('I', order.astype(np.uint32).tolist())
+    rows = [i for i in range(len(values)) if not math.isnan(values[i])]
+    return Column('I', sorted(rows, key=lambda i: -values[i] if descending else values[i]))
+
+
+class RankIndex:
+    """Numeric country fields with precomputed sort orders, for /api/rank"""
+
+    def __init__(self, countries: Dict[str, Dict[str, Any]]):
+        self.codes = sorted(countries)
+        entities = [countries[code] for code in self.codes]
+        self.names = [clean_name(entity.get('name')) or code for code, entity in zip(self.codes, entities)]
+        self.flags = [entity.get('flag') for entity in entities]
+
+        self.values: Dict[str, Column] = {}
+        self.orders: Dict[str, Dict[str, Column]] = {}
+        self.ranks: Dict[str, Column] = {}
+        for field, path in RANK_FIELDS.items():
+            values = Column('d', (to_number(_lookup(entity, path)) for entity in entities))
+            self.values[field] = values
+            self.orders[field] = {order: _sort_order(values, order == 'desc') for order in ORDERS}
+            # 1-based world rank by descending value; 0 without a value
+            ranks = [0] * len(self.codes)
+            for rank, row in enumerate(self.orders[field]['desc'].values, 1):
+                ranks[row] = rank
+            self.ranks[field] = Column('I', ranks)
+
+        # Category values dictionary-encoded by their normalized form
+        self.categories: Dict[str, Tuple[List[str], Column]] = {}
+        for field, path in CATEGORY_FIELDS.items():
+            keys: List[str] = []
+            codes = []
+            for entity in entities:
+                key = normalize(_lookup(entity, path))
+                if key not in keys:
+                    keys.append(key)
+                codes.append(keys.index(key))
+            self.categories[field] = (keys, Column('H', codes))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def parse_filter(self, text: Optional[str]) -> List[Tuple[str, str, Any]]:
+        """(field, operator, operand) for each condition; ValueError on a bad one"""
+        conditions = []
+        for part in (text or '').split(','):
+            if not part.strip():
+                continue
+            match = CONDITION.match(part.lower())
+            if not match:
+                raise ValueError(f"bad filter condition '{part}'")
+            field, compare, operand = match.groups()
+            if field in CATEGORY_FIELDS:
+                if compare not in (':', '='):
+                    raise ValueError(f"{field} only supports ':'")
+                keys, _ = self.categories[field]
+                key = normalize(operand)
+                # An unknown value gets a code no row has
+                conditions.append((field, '=', keys.index(key) if key in keys else len(keys)))
+            elif field in RANK_FIELDS:
+                conditions.append((field, '=' if compare == ':' else compare, float(operand)))
+            else:
+                raise ValueError(f"unknown filter field '{field}'")
+        return conditions
+
+    def _column(self, field: str) -> Column:
+        return self.values[field] if field in RANK_FIELDS else self.categories[field][1]
+
+    def _matching(self, order: Column, conditions: List[Tuple[str, str, Any]]) -> List[int]:
+        """Rows of order that pass every condition, in order"""
+        if np is not None:
+            rows = np.frombuffer(order.values, dtype=np.uint32)
+            mask = np.ones(len(self.codes), dtype=bool)
+            for field, compare, operand in conditions:
+                column = self._column(field)
+                values = np.frombuffer(column.values, dtype=np.float64 if column.typecode == 'd' else np.uint16)
+                mask &= OPERATORS[compare](values, operand)
+            return rows[mask[rows]].tolist()
+
+        checks = [(self._column(field), OPERATORS[compare], operand) for field, compare, operand in conditions]
+        return [row for row in order.values
+                if all(test(column[row], operand) for column, test, operand in checks)]
+
+    def rank(self, field: str, order: str = 'desc', filter_text: Optional[str] = None,
+             limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """Countries ordered by field, after the filters
+
+        Each result has its rank among the filtered countries and its world
+        rank (by descending value among all countries with one). with_value
+        counts the countries that have a value at all; when none does (the
+        dataset lacks the field), the response says so in 'note' rather than
+        looking like a filter that matched nothing.
+        """
+        if field not in RANK_FIELDS:
+            raise ValueError(f"unknown field '{field}' (one of {', '.join(RANK_FIELDS)})")
+        if order not in ORDERS:
+            raise ValueError(f"order must be asc or desc, not '{order}'")
+
+        rows = self._matching(self.orders[field][order], self.parse_filter(filter_text))
+        values = self.values[field]
+        ranks = self.ranks[field]
+        results = [{'rank': offset + i + 1, 'code': self.codes[row], 'name': self.names[row],
+                    'flag': self.flags[row], 'value': values[row], 'world_rank': ranks[row]}
+                   for i, row in enumerate(rows[offset:offset + limit])]
+        response = {'field': field, 'order': order, 'filter': filter_text or None,
+                    'total': len(rows), 'with_value': len(self.orders[field][order]), 'results': results}
+        if not response['with_value']:
+            response['note'] = f"No data: no country has a value for {field} in this dataset"
+        return response
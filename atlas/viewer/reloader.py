@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+"""
+Hot reload of resources for serve.py
+
+The server's indexes and caches live in a Generation. A background thread
+polls the mtimes of the resources directory; when the pipeline rewrites a
+file it waits for the writes to settle, builds a complete new Generation off
+to the side, and swaps it in with a single reference assignment.
+
+At most two generations are alive at once: the active one, and the one being
+built. A request takes a reference to the active generation when it starts
+and uses only that, so it sees one consistent set of data even if a swap
+happens half way through; the old generation is freed once its last request
+finishes.
+
+With prefork workers only the master watches resources/: it rebuilds the
+indexes and writes the snapshot, and the workers follow() that file, mapping
+each new snapshot instead of rebuilding it themselves. One pipeline run thus
+costs one build, and every process keeps sharing the same mapped pages.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from metrics import METRICS
+from snapshot import SNAPSHOT_FILE, load_or_build, load_snapshot, read_fingerprint, source_fingerprint
+
+
+class Generation:
+    """One immutable, consistent set of indexes plus its derived caches"""
+
+    def __init__(self, number: int, indexes: Dict[str, Any], fingerprint: Dict[str, Any], how: str):
+        self.number = number
+        self.indexes = indexes
+        self.fingerprint = fingerprint
+        self.how = how
+        self.loaded_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self._cache: Dict[Any, Any] = {}
+        self._cache_sizes: Dict[str, int] = {}
+        self._cache_lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> Any:
+        return self.indexes[name]
+
+    def cached(self, key: Any, build: Callable[[], Any], max_entries: Optional[int] = None) -> Any:
+        """Memoise a value derived from this generation (e.g. an encoded response)
+
+        Hits and misses are counted per cache, named by key[0] for tuple keys.
+        With max_entries, at most that many values are kept for the cache and
+        further keys are built on every call (for keys chosen by clients).
+        """
+        name = key[0] if isinstance(key, tuple) else str(key)
+        try:
+            value = self._cache[key]
+            METRICS.cache_lookup(name, hit=True)
+            return value
+        except KeyError:
+            METRICS.cache_lookup(name, hit=False)
+        value = build()
+        with self._cache_lock:
+            if key not in self._cache:
+                size = self._cache_sizes.get(name, 0)
+                if max_entries is not None and size >= max_entries:
+                    return value
+                self._cache_sizes[name] = size + 1
+            return self._cache.setdefault(key, value)
+
+    def can_cache(self, key: Any, max_entries: int) -> bool:
+        """True if key is cached, or its cache still has room for it"""
+        name = key[0] if isinstance(key, tuple) else str(key)
+        return key in self._cache or self._cache_sizes.get(name, 0) < max_entries
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'generation': self.number,
+            'loaded_at': self.loaded_at,
+            'loaded_from': self.how,
+            'index_version': self.fingerprint['index_version'],
+            'sources': self.fingerprint['sources']
+        }
+
+
+class ResourceReloader:
+    """Polls resources/ and swaps in a rebuilt Generation when files change"""
+
+    def __init__(self, base_dir: Path, interval: float = 2.0):
+        self.base_dir = Path(base_dir)
+        self.resources_dir = self.base_dir / 'resources'
+        self.snapshot_file = self.base_dir / SNAPSHOT_FILE
+        self.interval = interval
+        self._build_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._seen = self._scan()
+        self.current = self._build(1)
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """(mtime_ns, size) of every file in the resources directory"""
+        state = {}
+        if self.resources_dir.exists():
+            for path in self.resources_dir.iterdir():
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue  # removed between listing and stat
+                if path.is_file():
+                    state[path.name] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def _build(self, number: int, fingerprint: Optional[Dict[str, Any]] = None) -> Generation:
+        fingerprint = fingerprint or source_fingerprint(self.base_dir)
+        indexes, how = load_or_build(self.base_dir, fingerprint=fingerprint)
+        METRICS.cache_lookup('index_snapshot', hit=how == 'snapshot')
+        return Generation(number, indexes, fingerprint, how)
+
+    def reload(self) -> bool:
+        """Build a new generation and swap it in; False if nothing changed"""
+        with self._build_lock:
+            active = self.current
+            fingerprint = source_fingerprint(self.base_dir)
+            if fingerprint == active.fingerprint:
+                return False
+            candidate = self._build(active.number + 1, fingerprint)
+            # Single reference assignment: readers see either old or new
+            self.current = candidate
+            return True
+
+    def reload_snapshot(self) -> bool:
+        """Swap in the snapshot another process wrote; False if it is the active one"""
+        with self._build_lock:
+            active = self.current
+            fingerprint = read_fingerprint(self.snapshot_file)
+            if fingerprint is None or fingerprint == active.fingerprint:
+                return False
+            indexes = load_snapshot(self.snapshot_file, fingerprint)
+            if indexes is None:
+                return False  # replaced again since the fingerprint was read
+            METRICS.cache_lookup('index_snapshot', hit=True)
+            self.current = Generation(active.number + 1, indexes, fingerprint, 'snapshot')
+            return True
+
+    def _snapshot_state(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = self.snapshot_file.stat()
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _follow(self):
+        seen = None
+        while not self._stop.wait(self.interval):
+            state = self._snapshot_state()
+            if state is None or state == seen:
+                continue
+            seen = state
+            try:
+                if self.reload_snapshot():
+                    METRICS.increment('reloads')
+                    print(f"🔄 Snapshot changed - generation {self.current.number} active (pid {os.getpid()})")
+            except Exception as e:
+                print(f"⚠️  Snapshot reload failed, still serving generation {self.current.number}: {e}")
+
+    def _watch(self):
+        pending = None
+        while not self._stop.wait(self.interval):
+            state = self._scan()
+            if state == self._seen:
+                pending = None
+                continue
+            if state != pending:
+                # Files are still being written; wait one more interval
+                pending = state
+                continue
+
+            self._seen = state
+            pending = None
+            start = time.perf_counter()
+            try:
+                if self.reload():
+                    METRICS.increment('reloads')
+                    print(f"🔄 Resources changed - generation {self.current.number} active "
+                          f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+            except Exception as e:
+                # Keep serving the previous generation until the next change
+                print(f"⚠️  Reload failed, still serving generation {self.current.number}: {e}")
+
+    def start(self) -> 'ResourceReloader':
+        """Start the background polling thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name='resource-reloader', daemon=True)
+            self._thread.start()
+        return self
+
+    def follow(self) -> 'ResourceReloader':
+        """Start following the snapshot instead of watching resources/ (prefork workers)"""
+        # A forked worker may have inherited these mid-use from the master's thread
+        self._build_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._follow, name='snapshot-follower', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -2,20 +2,213 @@
 
 """
 Simple HTTP server for Location Intelligence Data Viewer
-Usage: python3 serve.py
+Usage: python3 serve.py [--port 8888] [--workers N] [--headless]
 """
 
 import http.server
-import socketserver
+import os
+import re
+import time
 import webbrowser
 from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+
+from admission import AdmissionController, LARGE_FILE_BYTES, LARGE_FILE_EXTENSIONS, parse_limits
+from indexes import (AIRPORTS_FILE, BOUNDARIES_FILE, BUNDLE_PARTS, CLUSTERS_FILE, COUNTRIES_FILE, LOD_FILES,
+                     encode_compact, project_part)
+import jsoncodec
+from metrics import METRICS, CountingWriter
+from prefork import serve_prefork
+from reloader import ResourceReloader
+from streams import ordered_lines, write_chunked
+from tiles import (TILE_CACHE_DIR, TILE_CONTENT_TYPE, TILES_DIR, TileSource, TileStore,
+                   airport_min_zooms, pregenerated_matches, source_key, valid_tile)
 
 PORT = 8888
 
+# Seconds between checks of resources/ for rewritten files
+RELOAD_INTERVAL = 2.0
+
+# Created in main(); holds the active generation of indexes and caches
+RELOADER = None
+
+# Per-lane concurrency limits and queues; reconfigured from the command line
+ADMISSION = AdmissionController()
+
+METRICS.register_gauge(
+    'admission_requests', 'Requests currently active or queued per admission lane',
+    lambda: {(('lane', lane), ('state', state)): value
+             for lane, counts in ADMISSION.gauges().items() for state, value in counts.items()})
+
+# /api/bundle frames: '<part> <length>\n' followed by length bytes of JSON
+BUNDLE_CONTENT_TYPE = 'application/x-atlas-bundle'
+
+# Parts sent when ?parts= is omitted (topology is the compact alternative to boundaries)
+DEFAULT_BUNDLE_PARTS = 'countries,boundaries,regions,airports'
+
+# Distinct ?fields= projections cached per generation; once they are all in
+# use, requests for a new one are refused rather than projected per request
+MAX_BUNDLE_VARIANTS = 32
+
+# /api/delta sends the full file instead once a client is more than this
+# many builds behind, or the patches add up to this fraction of the file
+MAX_DELTA_CHAIN = 5
+MAX_DELTA_FRACTION = 0.5
+
+# Distinct ?from= builds whose responses are cached per generation
+MAX_DELTA_VARIANTS = 32
+
+# Content-hashed names (tools/fingerprint-assets.py, resources/shards/) never
+# change content, so browsers may cache them without revalidating
+FINGERPRINTED = re.compile(r'\.[0-9a-f]{12}\.[A-Za-z0-9]+$')
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+
+# Never shed these, so the server stays observable under overload
+UNLIMITED_ROUTES = ('/metrics', '/api/version')
+
+# /tiles/{z}/{x}/{y}, optionally with the .mvt or .pbf extension
+TILE_PATH = re.compile(r'^/tiles/(\d+)/(\d+)/(\d+)(?:\.mvt|\.pbf)?$')
+
+
+def parse_bundle_fields(text: str, parts) -> dict:
+    """'countries:code,name;airports:iata,lat,lon' -> {part: fields}
+
+    A list without a 'part:' prefix applies to every requested part.
+    """
+    fields = {}
+    for group in filter(None, (g.strip() for g in text.split(';'))):
+        part, sep, names = group.partition(':')
+        if not sep:
+            part, names = None, group
+        elif part not in BUNDLE_PARTS:
+            raise ValueError(f"unknown part '{part}' in fields")
+        names = tuple(sorted({n.strip() for n in names.split(',') if n.strip()}))
+        for target in ([part] if part else parts):
+            fields[target] = tuple(sorted(set(fields.get(target, ())) | set(names)))
+    return fields
+
+
+def current_build(generation):
+    """Build id of the served countries_v2.json, if the delta history has recorded it"""
+    deltas = generation['deltas']
+    if deltas['sha256'] and deltas['sha256'] == generation.fingerprint['sources'].get(COUNTRIES_FILE):
+        return deltas['current']
+    return None
+
+
+def tile_store(generation) -> TileStore:
+    """Tiles for the generation's boundaries and airports (one store per generation)"""
+    def build():
+        sources = generation.fingerprint['sources']
+        key = source_key({name: sources.get(name) for name in (BOUNDARIES_FILE, AIRPORTS_FILE, CLUSTERS_FILE)})
+        base_dir = RELOADER.base_dir
+
+        def build_source():
+            part = generation['bundle_parts'].get('boundaries')
+            boundaries = jsoncodec.loads(part.values) if part is not None else None
+            clusters = generation['airport_clusters']
+            return TileSource(boundaries, generation['airports'],
+                              airport_min_zooms(clusters.levels) if clusters is not None else None)
+
+        pregenerated = base_dir / TILES_DIR
+        return TileStore(key, build_source, pregenerated if pregenerated_matches(pregenerated, key) else None,
+                         base_dir / TILE_CACHE_DIR)
+    return generation.cached(('tile_store',), build)
+
+
+def delta_response(generation, from_id: str):
+    """/api/delta body as a list of byte chunks (None if countries_v2.json is missing)
+
+    The chunks reference the pre-encoded patches and countries part, so
+    nothing large is copied per request.
+    """
+    countries = generation['bundle_parts'].get('countries')
+    if countries is None:
+        return None
+
+    current = current_build(generation)
+    header = {'from': from_id, 'to': current}
+    if current is not None and from_id == current:
+        return [encode_compact(dict(header, type='none'))]
+
+    patches, at = [], from_id
+    if current is not None:
+        chain = generation['deltas']['patches']
+        while at != current and at in chain and len(patches) < MAX_DELTA_CHAIN:
+            at, patch = chain[at]
+            patches.append(patch.values)
+
+    if at == current and patches and sum(len(p) for p in patches) <= MAX_DELTA_FRACTION * len(countries):
+        # '{..."patches":[]}' with the patches spliced in
+        prefix = encode_compact(dict(header, type='delta', patches=[]))[:-2]
+        chunks = [prefix]
+        for i, patch in enumerate(patches):
+            chunks += [b',', patch] if i else [patch]
+        return chunks + [b']}']
+
+    prefix = encode_compact(dict(header, type='full'))[:-1] + b',"data":'
+    return [prefix, countries.values, b'}']
+
+
+class ViewerHTTPServer(http.server.ThreadingHTTPServer):
+    """Threaded server with a listen backlog sized for bursts"""
+
+    request_queue_size = 128
+
+
 class CORSHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     """HTTP handler with CORS enabled"""
 
+    # path -> handler method; each receives the parsed query string
+    API_ROUTES = {
+        '/api/search': 'api_search',
+        '/api/airports/nearby': 'api_airports_nearby',
+        '/api/airports/clusters': 'api_airports_clusters',
+        '/api/geocode': 'api_geocode',
+        '/api/rank': 'api_rank',
+        '/api/version': 'api_version',
+        '/api/bundle': 'api_bundle',
+        '/api/delta': 'api_delta',
+        '/api/boundaries': 'api_boundaries',
+        '/api/stream/airports': 'api_stream_airports',
+        '/api/stream/countries': 'api_stream_countries',
+        '/api/stream/boundaries': 'api_stream_boundaries',
+        '/metrics': 'api_metrics',
+    }
+
+    # Whole-world documents (the delta may fall back to the full one): they
+    # queue with the other big transfers so they never hold up cheap API calls
+    LARGE_ROUTES = {'/api/bundle', '/api/delta', '/api/boundaries'}
+
+    def setup(self):
+        super().setup()
+        self.wfile = CountingWriter(self.wfile)
+
+    def handle_one_request(self):
+        start = time.perf_counter()
+        self.status = None
+        self.wfile.bytes_written = 0
+        super().handle_one_request()
+        if self.status is not None:
+            METRICS.observe(self.route_label(), self.status, self.wfile.bytes_written,
+                            time.perf_counter() - start)
+
+    def route_label(self) -> str:
+        """Metrics label: the API route, or 'static' for file requests"""
+        path = urlsplit(getattr(self, 'path', '')).path
+        if TILE_PATH.match(path):
+            return '/tiles'
+        return path if path in self.API_ROUTES else 'static'
+
+    def send_response(self, code, message=None):
+        self.status = code
+        super().send_response(code, message)
+
     def end_headers(self):
+        if (self.status in (200, 304) and self.route_label() == 'static'
+                and FINGERPRINTED.search(urlsplit(self.path).path)):
+            self.send_header('Cache-Control', IMMUTABLE_CACHE)
+
         # Enable CORS
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
@@ -26,31 +219,378 @@ class CORSHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         self.send_response(200)
         self.end_headers()
 
+    def admission_lane(self, path: str) -> str:
+        """'api', 'static' or 'large' (big files are served at lowest priority)"""
+        if path in self.LARGE_ROUTES or path.startswith('/api/stream/'):
+            return 'large'
+        if path in self.API_ROUTES:
+            return 'api'
+        if TILE_PATH.match(path):
+            return 'static'
+        if path.lower().endswith(LARGE_FILE_EXTENSIONS):
+            return 'large'
+        try:
+            size = os.stat(self.translate_path(path)).st_size
+        except OSError:
+            return 'static'
+        return 'large' if size >= LARGE_FILE_BYTES else 'static'
+
+    def copyfile(self, source, outputfile):
+        # Let the kernel move file bytes (sendfile) so big transfers don't hold the GIL
+        try:
+            sent = self.connection.sendfile(source)
+        except (AttributeError, ValueError, OSError):
+            return super().copyfile(source, outputfile)
+        self.wfile.bytes_written += sent
+
+    def send_overloaded(self, lane):
+        body = jsoncodec.dumps({'error': 'Server busy, retry later', 'lane': lane.name})
+        self.send_response(503)
+        self.send_header('Retry-After', str(lane.retry_after))
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path in UNLIMITED_ROUTES:
+            return self.dispatch_get(url)
+
+        lane_name = self.admission_lane(url.path)
+        lane = ADMISSION.admit(lane_name)
+        if lane is None:
+            lane = ADMISSION.lanes[lane_name]
+            self.log_message("Shed %s request for %s", lane_name, url.path)
+            return self.send_overloaded(lane)
+        try:
+            self.dispatch_get(url)
+        finally:
+            ADMISSION.release(lane)
+
+    def dispatch_get(self, url):
+        route = self.API_ROUTES.get(url.path)
+        if route is None:
+            tile = TILE_PATH.match(url.path)
+            if tile:
+                self.generation = RELOADER.current
+                return self.send_tile(*(int(n) for n in tile.groups()))
+            return super().do_GET()
+
+        # Pin one generation for the whole request, even if a reload swaps it
+        self.generation = RELOADER.current
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            getattr(self, route)(query)
+        except (KeyError, ValueError) as e:
+            self.send_json({'error': f"Invalid parameter: {e}"}, status=400)
+
+    def send_json(self, payload, status=200):
+        self.send_chunks([jsoncodec.dumps(payload)], status=status)
+
+    def send_chunks(self, chunks, status=200, content_type='application/json; charset=utf-8'):
+        """Send a body made of several byte buffers without joining them"""
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(sum(len(c) for c in chunks)))
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(chunk)
+
+    def api_search(self, query):
+        """/api/search?q=lon&limit=20 - countries and airports by name or code"""
+        limit = min(100, int(query.get('limit', 20)))
+        results = self.generation['search'].search(query.get('q', ''), limit=limit)
+        self.send_json({'query': query.get('q', ''), 'results': results})
+
+    def api_airports_nearby(self, query):
+        """/api/airports/nearby?lat=51.5&lon=-0.1&radius=100 - airports within radius km"""
+        lat, lon = float(query['lat']), float(query['lon'])
+        radius = min(2000.0, float(query.get('radius', 100)))
+        limit = min(100, int(query.get('limit', 20)))
+        airports = self.generation['airports']
+        results = [dict(airports[iata], distance_km=round(distance, 1))
+                   for iata, distance in self.generation['airport_grid'].nearby(lat, lon, radius, limit)]
+        self.send_json({'lat': lat, 'lon': lon, 'radius_km': radius, 'airports': results})
+
+    def api_airports_clusters(self, query):
+        """/api/airports/clusters?bbox=-10,35,30,60&zoom=4 - airport clusters in view, largest first
+
+        bbox is west,south,east,north in degrees (west > east crosses the
+        antimeridian). Each cluster has its airport count, centroid and a
+        representative airport; count 1 is a single airport.
+        """
+        west, south, east, north = (float(v) for v in query.get('bbox', '-180,-90,180,90').split(','))
+        zoom = max(0, int(query.get('zoom', 0)))
+        limit = min(2000, int(query.get('limit', 500)))
+
+        clusters = self.generation['airport_clusters']
+        if clusters is None:
+            return self.send_json({'error': 'Not available: airport clusters'}, status=404)
+        airports = self.generation['airports']
+        results = clusters.query(zoom, west, south, east, north, limit)
+        for cluster in results:
+            airport = airports.get(cluster['airport'], {})
+            cluster['name'] = airport.get('name')
+            cluster['country'] = airport.get('country')
+        self.send_json({'zoom': zoom, 'bbox': [west, south, east, north], 'clusters': results})
+
+    def api_geocode(self, query):
+        """/api/geocode?lat=51.28&lon=1.08 - country, admin-1 region and flag of a point
+
+        The region's own flag (England, California...) when it has one,
+        otherwise the country's; country is null at sea.
+        """
+        lat, lon = float(query['lat']), float(query['lon'])
+        if not -90.0 <= lat <= 90.0:
+            raise ValueError(f"lat {lat} out of range")
+
+        geocoder = self.generation['geocoder']
+        if not geocoder.countries:
+            return self.send_json({'error': 'Not available: boundaries'}, status=404)
+        result = geocoder.lookup(lat, lon) or {'country': None}
+        self.send_json(dict({'lat': lat, 'lon': lon}, **result))
+
+    def api_rank(self, query):
+        """/api/rank?field=population.total&order=desc&filter=continent:europe - countries ranked by a field
+
+        field is population.total, area.total_sq_km, gdp.value, gdp_per_capita
+        or elevation (mean, metres); filter is comma-separated conditions such
+        as continent:asia or area.total_sq_km>=100000. Countries without a
+        value are left out; a field no country has comes back with a 'note'.
+        """
+        index = self.generation['rank']
+        if not len(index):
+            return self.send_json({'error': 'Not available: countries'}, status=404)
+        limit = min(250, int(query.get('limit', 20)))
+        offset = max(0, int(query.get('offset', 0)))
+        self.send_json(index.rank(query.get('field', 'population.total'), query.get('order', 'desc'),
+                                  query.get('filter'), limit=limit, offset=offset))
+
+    def api_version(self, query):
+        """/api/version - the active resource generation and its source hashes"""
+        self.send_json(dict(self.generation.describe(), dataset_build=current_build(self.generation)))
+
+    def api_delta(self, query):
+        """/api/delta?from=2.0.0 - what changed in countries_v2.json since a client's build
+
+        Returns type 'none' (up to date), 'delta' with the patches to apply in
+        order, or 'full' with the whole document when the client's build is
+        unknown or too far behind.
+        """
+        from_id = query['from']
+        chunks = self.generation.cached(('delta', from_id),
+                                        lambda: delta_response(self.generation, from_id),
+                                        max_entries=MAX_DELTA_VARIANTS)
+        if chunks is None:
+            return self.send_json({'error': 'Not available: countries'}, status=404)
+        self.send_chunks(chunks)
+
+    def api_bundle(self, query):
+        """/api/bundle?parts=countries,boundaries&fields=... - several resources in one response
+
+        Parts are written in the order requested, each as a '<part> <length>'
+        line followed by exactly length bytes of compact JSON, so a client can
+        parse and render one part while the next is still arriving.
+        """
+        parts = [p for p in query.get('parts', DEFAULT_BUNDLE_PARTS).split(',') if p]
+        for part in parts:
+            if part not in BUNDLE_PARTS:
+                raise ValueError(f"unknown part '{part}'")
+
+        encoded = self.generation['bundle_parts']
+        missing = [p for p in parts if p not in encoded]
+        if missing:
+            return self.send_json({'error': f"Not available: {', '.join(missing)}"}, status=404)
+
+        fields = parse_bundle_fields(query.get('fields', ''), parts)
+        keys = {part: ('bundle_fields', part, fields[part]) for part in parts if fields.get(part)}
+        if not all(self.generation.can_cache(key, MAX_BUNDLE_VARIANTS) for key in keys.values()):
+            # Every projection costs a decode and re-encode of the whole part
+            return self.send_json({'error': f"Too many distinct fields projections "
+                                            f"(limit {MAX_BUNDLE_VARIANTS}); request fewer variants"},
+                                  status=429)
+        frames = []
+        for part in parts:
+            body = encoded[part].values
+            if part in keys:
+                body = self.generation.cached(
+                    keys[part],
+                    lambda part=part, body=body: encode_compact(
+                        project_part(part, jsoncodec.loads(body), fields[part])),
+                    max_entries=MAX_BUNDLE_VARIANTS)
+            frames.append((f"{part} {len(body)}\n".encode('ascii'), body))
+
+        self.send_response(200)
+        self.send_header('Content-Type', BUNDLE_CONTENT_TYPE)
+        self.send_header('Content-Length', str(sum(len(h) + len(b) for h, b in frames)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        for header, body in frames:
+            self.wfile.write(header)
+            self.wfile.write(body)
+
+    def api_boundaries(self, query):
+        """/api/boundaries?set=countries|regions&zoom=3 - TopoJSON simplified for a zoom level
+
+        Levels come from scripts/11_export_lod.py and are held pre-encoded in
+        memory; the coarsest level whose max_zoom covers the request is sent.
+        """
+        name = query.get('set', 'countries')
+        if name not in LOD_FILES:
+            raise ValueError(f"unknown set '{name}'")
+        zoom = max(0, int(query.get('zoom', 0)))
+
+        levels = self.generation['boundary_lod'].get(name)
+        if not levels:
+            return self.send_json({'error': f"Not available: {name}"}, status=404)
+        # Finest level if none covers the zoom
+        body = next((body for max_zoom, body in levels if max_zoom is None or zoom <= max_zoom), levels[-1][1])
+        self.send_chunks([body.values])
+
+    def send_tile(self, z: int, x: int, y: int):
+        """/tiles/{z}/{x}/{y} - Mapbox Vector Tile with boundaries and airports, zoom 0-8
+
+        Low zooms come from scripts/12_export_tiles.py; deeper tiles are cut
+        on first request and kept in an LRU disk cache. The ETag names the
+        data version, so clients revalidate cheaply after a reload.
+        """
+        if not valid_tile(z, x, y):
+            return self.send_json({'error': f"No tile {z}/{x}/{y}"}, status=404)
+
+        store = tile_store(self.generation)
+        etag = f'"{store.key}-{z}-{x}-{y}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        data, how = store.get(z, x, y)
+        METRICS.cache_lookup('tiles', hit=how != 'generated')
+        self.send_response(200)
+        self.send_header('Content-Type', TILE_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Tile-Source', how)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_ndjson(self, collection: str, query):
+        """Stream a collection one JSON record per line, in ?order="""
+        stream = ordered_lines(self.generation, collection, query.get('order'))
+        if stream is None:
+            return self.send_json({'error': f"Not available: {collection}"}, status=404)
+        count, lines = stream
+
+        # Chunked encoding needs an HTTP/1.1 status line; the connection is
+        # still closed afterwards, as for every response of this handler
+        chunked = self.request_version == 'HTTP/1.1'
+        if chunked:
+            self.protocol_version = 'HTTP/1.1'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+        self.send_header('X-Record-Count', str(count))
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        write_chunked(self.wfile, lines, chunked)
+
+    def api_stream_airports(self, query):
+        """/api/stream/airports?order=iata|country|name - airports as NDJSON"""
+        self.send_ndjson('airports', query)
+
+    def api_stream_countries(self, query):
+        """/api/stream/countries?order=code|name|population|area - countries as NDJSON"""
+        self.send_ndjson('countries', query)
+
+    def api_stream_boundaries(self, query):
+        """/api/stream/boundaries?order=code|name|population|area - boundary features as NDJSON"""
+        self.send_ndjson('boundaries', query)
+
+    def api_metrics(self, query):
+        """/metrics - request, latency and cache metrics in Prometheus text format"""
+        body = METRICS.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def print_banner(parent_dir: Path, port: int, headless: bool):
+    print("\n" + "="*60)
+    print("🌍 Location Intelligence Data Viewer")
+    print("="*60)
+    print(f"\n✅ Server running at: http://localhost:{port}")
+    print(f"📁 Serving from: {parent_dir}")
+    print(f"\n🌐 Available viewers:")
+    print(f"   - 3D Globe: http://localhost:{port}/globe.html")
+    print(f"   - 2D Map:   http://localhost:{port}/index.html")
+    print(f"\n🔄 Watching resources/ for changes (every {RELOAD_INTERVAL:g}s)")
+    if not headless:
+        print("\n💡 Opening 3D globe viewer...")
+    print("\nPress Ctrl+C to stop\n")
+
 
 def main():
+    global ADMISSION, RELOADER
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve the Location Intelligence Data Viewer')
+    parser.add_argument('--port', type=int, default=PORT, help=f'Port to listen on (default {PORT})')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of worker processes (forked, sharing the port)')
+    parser.add_argument('--headless', action='store_true',
+                        help='Do not open a browser (for unattended servers)')
+    parser.add_argument('--max-in-flight', type=int, default=ADMISSION.max_in_flight,
+                        help='Requests processed at once per process before queueing')
+    parser.add_argument('--limits', type=parse_limits, default={},
+                        help='Per-lane concurrency limits, e.g. api=32,static=16,large=4')
+    args = parser.parse_args()
+
+    ADMISSION = AdmissionController(args.max_in_flight, args.limits)
+
     # Change to parent directory so resources/ is accessible
-    parent_dir = Path(__file__).parent.parent
-    import os
+    parent_dir = Path(__file__).resolve().parent.parent
     os.chdir(parent_dir)
 
     print(f"Serving from: {parent_dir}")
 
-    # Create server
+    # Load indexes from the snapshot (rebuilt only when resources changed).
+    # In prefork mode this happens once, before forking, so workers share it.
+    start = time.perf_counter()
+    RELOADER = ResourceReloader(parent_dir, interval=RELOAD_INTERVAL)
+    how = RELOADER.current.how
+    print(f"📇 Indexes {'loaded from snapshot' if how == 'snapshot' else 'rebuilt'} "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+
     Handler = CORSHTTPRequestHandler
-    with socketserver.TCPServer(("", PORT), Handler) as httpd:
-        print("\n" + "="*60)
-        print("🌍 Location Intelligence Data Viewer")
-        print("="*60)
-        print(f"\n✅ Server running at: http://localhost:{PORT}")
-        print(f"📁 Serving from: {parent_dir}")
-        print(f"\n🌐 Available viewers:")
-        print(f"   - 3D Globe: http://localhost:{PORT}/globe.html")
-        print(f"   - 2D Map:   http://localhost:{PORT}/index.html")
-        print("\n💡 Opening 3D globe viewer...")
-        print("\nPress Ctrl+C to stop\n")
+
+    if args.workers > 1:
+        print_banner(parent_dir, args.port, args.headless)
+        if not args.headless:
+            webbrowser.open(f"http://localhost:{args.port}/globe.html")
+
+        # The master alone rebuilds and writes the snapshot; workers map each new one
+        serve_prefork(args.port, Handler, args.workers, on_worker_start=RELOADER.follow,
+                      on_started=RELOADER.start)
+        print("\n\n👋 Server stopped")
+        return
+
+    # Rebuild in the background when the pipeline rewrites resources/
+    RELOADER.start()
+
+    # Create server
+    with ViewerHTTPServer(("", args.port), Handler) as httpd:
+        print_banner(parent_dir, args.port, args.headless)
 
         # Open browser to globe viewer
-        webbrowser.open(f"http://localhost:{PORT}/globe.html")
+        if not args.headless:
+            webbrowser.open(f"http://localhost:{args.port}/globe.html")
 
         # Start serving
         try:
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+"""
+Index snapshot cache for serve.py
+
+Persists the indexes built by indexes.py so a restarted server (or every
+worker of a multi-process one) can skip rebuilding them from the raw JSON.
+
+A snapshot is keyed by the SHA-256 of every source file plus the snapshot and
+index format versions; if any of them differ the snapshot is ignored and the
+indexes are rebuilt. The file is read through mmap, and buffers pickled
+out-of-band (see indexes.Column) become views over the mapping instead of
+copies.
+
+Snapshots are pickles written by this server for itself; never point
+SNAPSHOT_FILE at a file from an untrusted source.
+
+File layout:
+- Header: magic, snapshot format version, manifest length
+- Manifest: JSON with versions, source hashes and section offsets
+- Payload: pickled indexes (protocol 5)
+- Buffers: out-of-band pickle buffers, 8-byte aligned
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+from indexes import INDEX_VERSION, build_indexes, source_files
+
+MAGIC = b'ATSNAP'
+SNAPSHOT_VERSION = 1
+
+# magic, snapshot version, manifest length
+HEADER = struct.Struct('<6sHI')
+
+ALIGNMENT = 8
+
+SNAPSHOT_FILE = Path('data') / 'cache' / 'index_snapshot.bin'
+
+
+def file_sha256(path: Path) -> Optional[str]:
+    """Hex digest of a file's contents, or None if it does not exist"""
+    if not path.exists():
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(base_dir: Path) -> Dict[str, Any]:
+    """Versions and source hashes a snapshot must match to be reused"""
+    return {
+        'snapshot_version': SNAPSHOT_VERSION,
+        'index_version': INDEX_VERSION,
+        'sources': {name: file_sha256(Path(base_dir) / name) for name in source_files()}
+    }
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save_snapshot(path: Path, indexes: Dict[str, Any], fingerprint: Dict[str, Any]) -> int:
+    """Write indexes to path atomically; returns the snapshot size in bytes"""
+    buffers = []
+    payload = pickle.dumps(indexes, protocol=5, buffer_callback=buffers.append)
+    raw_buffers = [b.raw() for b in buffers]
+
+    # Offsets are relative to the end of the manifest, which is only known
+    # once the manifest itself has been serialised
+    sections = []
+    offset = len(payload)
+    for raw in raw_buffers:
+        offset = _aligned(offset)
+        sections.append([offset, raw.nbytes])
+        offset += raw.nbytes
+
+    manifest = dict(fingerprint, created_at=time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    payload=[0, len(payload)], buffers=sections)
+    manifest_bytes = json.dumps(manifest, sort_keys=True).encode('utf-8')
+    body_start = _aligned(HEADER.size + len(manifest_bytes))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, SNAPSHOT_VERSION, len(manifest_bytes)))
+            f.write(manifest_bytes)
+            f.write(b'\0' * (body_start - f.tell()))
+            f.write(payload)
+            for (start, _), raw in zip(sections, raw_buffers):
+                f.write(b'\0' * (body_start + start - f.tell()))
+                f.write(raw)
+        # Replacing (not rewriting) keeps existing mappings of the old file valid
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
+    return path.stat().st_size
+
+
+def read_fingerprint(path: Path) -> Optional[Dict[str, Any]]:
+    """Fingerprint a snapshot was written for, without loading it
+
+    None if the file is missing or unreadable, or was written by another
+    snapshot or index format version.
+    """
+    try:
+        with open(path, 'rb') as f:
+            magic, version, manifest_length = HEADER.unpack(f.read(HEADER.size))
+            manifest = json.loads(f.read(manifest_length))
+    except (OSError, struct.error, ValueError):
+        return None
+    if magic != MAGIC or version != SNAPSHOT_VERSION or manifest.get('index_version') != INDEX_VERSION:
+        return None
+    return {key: manifest.get(key) for key in ('snapshot_version', 'index_version', 'sources')}
+
+
+def load_snapshot(path: Path, fingerprint: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Indexes from a snapshot matching fingerprint, or None if stale/missing"""
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None  # empty file
+
+    try:
+        magic, version, manifest_length = HEADER.unpack_from(mapped)
+        if magic != MAGIC or version != SNAPSHOT_VERSION:
+            return None
+        manifest = json.loads(mapped[HEADER.size:HEADER.size + manifest_length])
+    except (struct.error, ValueError):
+        return None
+
+    for key, expected in fingerprint.items():
+        if manifest.get(key) != expected:
+            return None
+
+    body = memoryview(mapped)[_aligned(HEADER.size + manifest_length):]
+    start, length = manifest['payload']
+    buffers = [body[o:o + n] for o, n in manifest['buffers']]
+    # The mapping stays open for as long as any loaded column references it
+    return pickle.loads(body[start:start + length], buffers=buffers)
+
+
+def load_or_build(base_dir: Path, snapshot_file: Optional[Path] = None,
+                  fingerprint: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], str]:
+    """Load indexes from the snapshot, rebuilding it if the sources changed
+
+    Returns (indexes, how) where how is 'snapshot' or 'rebuilt'.
+    """
+    base_dir = Path(base_dir)
+    snapshot_file = Path(snapshot_file or base_dir / SNAPSHOT_FILE)
+    fingerprint = fingerprint or source_fingerprint(base_dir)
+
+    try:
+        indexes = load_snapshot(snapshot_file, fingerprint)
+    except Exception as e:
+        print(f"⚠️  Ignoring unreadable index snapshot: {e}")
+        indexes = None
+
+    if indexes is not None:
+        return indexes, 'snapshot'
+
+    indexes = build_indexes(base_dir)
+    try:
+        save_snapshot(snapshot_file, indexes, fingerprint)
+    except OSError as e:
+        print(f"⚠️  Could not write index snapshot: {e}")
+        return indexes, 'rebuilt'
+    # Serve from the mapping, like every other process reading this snapshot
+    mapped = load_snapshot(snapshot_file, fingerprint)
+    return (mapped if mapped is not None else indexes), 'rebuilt'
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+"""
+NDJSON streams of the large collections for serve.py
+
+Airports, countries and boundary features can be streamed one JSON record per
+line, so a client can parse and render each record as it arrives instead of
+waiting for the whole document and a single JSON.parse.
+
+Every record is encoded once per generation; each sort order is an array of
+record positions, also computed once per generation. A request only writes
+the pre-encoded lines in that order, batched into chunks of CHUNK_BYTES, so
+server memory does not grow with the number of concurrent streams.
+"""
+
+from array import array
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from indexes import clean_name, encode_compact, normalize
+import jsoncodec
+
+# Lines are written in batches of about this many bytes
+CHUNK_BYTES = 64 * 1024
+
+
+def _nested(record: Dict[str, Any], *keys: str) -> Any:
+    for key in keys:
+        if not isinstance(record, dict):
+            return None
+        record = record.get(key)
+    return record
+
+
+def _largest_first(value: Optional[float]) -> Tuple:
+    # Records without the value go last
+    return (value is None, -(value or 0))
+
+
+def country_records(generation) -> List[Tuple[str, Dict[str, Any]]]:
+    return sorted(generation['countries'].items())
+
+
+def airport_records(generation) -> List[Tuple[str, Dict[str, Any]]]:
+    return sorted(generation['airports'].items())
+
+
+def boundary_records(generation) -> Optional[List[Tuple[str, Dict[str, Any]]]]:
+    """Boundary features keyed by ISO code, decoded from the bundle part"""
+    part = generation['bundle_parts'].get('boundaries')
+    if part is None:
+        return None  # countries_50m.geojson not generated
+    features = jsoncodec.loads(part.values).get('features', [])
+    return [(clean_name((feature.get('properties') or {}).get('iso_a2')), feature)
+            for feature in features]
+
+
+def _population(generation, code: str) -> Optional[float]:
+    return _nested(generation['countries'].get(code), 'people', 'population', 'total')
+
+
+def _area(generation, code: str) -> Optional[float]:
+    return _nested(generation['countries'].get(code), 'geography', 'area', 'total_sq_km')
+
+
+# collection -> (records loader, {order: sort key(generation, key, record)}); the first order is the default
+COLLECTIONS: Dict[str, Tuple[Callable, Dict[str, Callable]]] = {
+    'airports': (airport_records, {
+        'iata': lambda g, iata, a: iata,
+        'country': lambda g, iata, a: (a.get('country') or '', iata),
+        'name': lambda g, iata, a: (normalize(a.get('name')), iata),
+    }),
+    'countries': (country_records, {
+        'code': lambda g, code, c: code,
+        'name': lambda g, code, c: (normalize(c.get('name')), code),
+        'population': lambda g, code, c: (_largest_first(_population(g, code)), code),
+        'area': lambda g, code, c: (_largest_first(_area(g, code)), code),
+    }),
+    'boundaries': (boundary_records, {
+        'code': lambda g, code, f: code,
+        'name': lambda g, code, f: (normalize((f.get('properties') or {}).get('name')), code),
+        'population': lambda g, code, f: (_largest_first(_population(g, code)), code),
+        'area': lambda g, code, f: (_largest_first(_area(g, code)), code),
+    }),
+}
+
+
+def encoded_lines(generation, collection: str) -> Optional[Tuple[List[Tuple[str, Dict[str, Any]]], List[bytes]]]:
+    """(records, NDJSON lines) for a collection, encoded once per generation
+
+    The records are kept for sorting; boundary geometry is dropped from them,
+    as it only needs to exist in encoded form.
+    """
+    def build():
+        records = COLLECTIONS[collection][0](generation)
+        if records is None:
+            return None
+        lines = [encode_compact(record) + b'\n' for _, record in records]
+        sortable = [(key, {k: v for k, v in record.items() if k != 'geometry'} if 'geometry' in record else record)
+                    for key, record in records]
+        return sortable, lines
+
+    return generation.cached(('ndjson_lines', collection), build)
+
+
+def ordered_lines(generation, collection: str, order: Optional[str] = None) -> Optional[Tuple[int, Iterator[bytes]]]:
+    """(count, lines in the requested order), or None if the source is missing
+
+    Raises ValueError for an unknown order.
+    """
+    orders = COLLECTIONS[collection][1]
+    order = order or next(iter(orders))
+    if order not in orders:
+        raise ValueError(f"unknown order '{order}' (expected {', '.join(orders)})")
+
+    encoded = encoded_lines(generation, collection)
+    if encoded is None:
+        return None
+    records, lines = encoded
+
+    def build():
+        sort_key = orders[order]
+        return array('I', sorted(range(len(records)), key=lambda i: sort_key(generation, *records[i])))
+
+    positions = generation.cached(('ndjson_order', collection, order), build)
+    return len(positions), (lines[i] for i in positions)
+
+
+def write_chunked(wfile, lines: Iterable[bytes], chunked: bool = True):
+    """Write lines in CHUNK_BYTES batches, as HTTP/1.1 chunks when chunked"""
+    batch, size = [], 0
+
+    def flush():
+        body = b''.join(batch)
+        if chunked:
+            wfile.write(b'%x\r\n%s\r\n' % (len(body), body))
+        else:
+            wfile.write(body)
+
+    for line in lines:
+        batch.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            flush()
+            batch, size = [], 0
+    if batch:
+        flush()
+    if chunked:
+        wfile.write(b'0\r\n\r\n')
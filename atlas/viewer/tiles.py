@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+
+"""
+Vector tiles for the country boundaries and airports
+
+The world is cut into the usual Web Mercator z/x/y tile pyramid (zoom 0 is
+one tile, each zoom splits every tile in four) for zoom 0-MAX_ZOOM. A tile
+holds two layers, clipped to the tile plus a small buffer so lines do not
+show seams at tile edges:
+
+- boundaries: country polygons with iso_a2, iso_a3 and name
+- airports: one point per airport inside the tile with iata, name and country;
+  with the cluster levels of scripts/13_cluster_airports.py, only airports
+  that represent a cluster at the tile's zoom (the full set at MAX_ZOOM)
+
+Tiles are encoded as Mapbox Vector Tiles (protobuf, version 2) with
+coordinates on a TILE_EXTENT integer grid, so any vector-tile client can
+render them and a zoomed-in view fetches a few small tiles instead of the
+whole world. Snapping to the grid also drops points that land on the same
+position, which simplifies low zooms for free.
+
+Zooms up to PREGENERATED_MAX_ZOOM are written ahead of time by
+scripts/12_export_tiles.py; serve.py cuts deeper tiles on demand and keeps
+them in a TileCache, a least-recently-used directory of tile files.
+"""
+
+import hashlib
+import json
+import math
+import os
+import shutil
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+# The atomic writer is shared with the export scripts
+sys.path.append(str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from export_utils import write_atomic  # noqa: E402
+
+MAX_ZOOM = 8
+PREGENERATED_MAX_ZOOM = 4
+TILE_EXTENT = 4096
+TILE_BUFFER = 64  # in tile units; boundaries are clipped this far outside the tile
+
+MAX_LATITUDE = 85.0511287798  # Web Mercator is square between these
+
+TILE_CONTENT_TYPE = 'application/vnd.mapbox-vector-tile'
+
+# Pregenerated tiles (scripts/12_export_tiles.py) and the on-demand cache
+TILES_DIR = Path('resources') / 'tiles'
+TILE_CACHE_DIR = Path('data') / 'cache' / 'tiles'
+TILE_METADATA = 'metadata.json'
+MAX_CACHED_TILES = 4096
+
+# Cache directories of other data versions are deleted once nothing has read
+# or written them for this long (prefork workers swap versions independently)
+STALE_CACHE_SECONDS = 600
+
+BoundsT = Tuple[float, float, float, float]
+
+
+def airport_min_zooms(levels: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Lowest zoom at which each airport represents a cluster, from cluster levels by zoom
+
+    Levels go deeper than the tiles do, so airports first shown past MAX_ZOOM
+    get MAX_ZOOM: the deepest tiles hold every airport.
+    """
+    min_zooms: Dict[str, int] = {}
+    for zoom, level in enumerate(levels):
+        for iata in level['airport']:
+            min_zooms.setdefault(iata, min(zoom, MAX_ZOOM))
+    return min_zooms
+
+
+def project(lon: float, lat: float) -> Tuple[float, float]:
+    """Web Mercator position in world units (0..1, y down)"""
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    phi = math.radians(lat)
+    x = (lon + 180.0) / 360.0
+    y = (1.0 - math.log(math.tan(phi) + 1.0 / math.cos(phi)) / math.pi) / 2.0
+    return x, y
+
+
+def valid_tile(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def tile_bounds(z: int, x: int, y: int, buffer: float = 0.0) -> BoundsT:
+    """(min x, min y, max x, max y) of a tile in world units, grown by buffer tile units"""
+    size = 1.0 / 2 ** z
+    pad = size * buffer / TILE_EXTENT
+    return (x * size - pad, y * size - pad, (x + 1) * size + pad, (y + 1) * size + pad)
+
+
+def _overlaps(a: BoundsT, b: BoundsT) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _ring_bounds(ring: List[Tuple[float, float]]) -> BoundsT:
+    xs = [p[0] for p in ring]
+    ys = [p[1] for p in ring]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def clip_ring(ring: List[Tuple[float, float]], low: float, high: float) -> List[Tuple[float, float]]:
+    """Sutherland-Hodgman clip of a closed ring to the square [low, high]²
+
+    A concave ring cut in several places stays one ring, joined by
+    zero-width edges along the clip square. Those lie in the buffer, outside
+    the visible tile, so they never render (geojson-vt clips the same way).
+    """
+    def clip(points, axis, limit, keep_above):
+        if not points:
+            return points
+        inside = (lambda p: p[axis] >= limit) if keep_above else (lambda p: p[axis] <= limit)
+        result = []
+        previous = points[-1]
+        for current in points:
+            if inside(current) != inside(previous):
+                t = (limit - previous[axis]) / (current[axis] - previous[axis])
+                crossing = [previous[0] + t * (current[0] - previous[0]),
+                            previous[1] + t * (current[1] - previous[1])]
+                crossing[axis] = limit
+                result.append(tuple(crossing))
+            if inside(current):
+                result.append(current)
+            previous = current
+        return result
+
+    for axis, limit, keep_above in ((0, low, True), (0, high, False), (1, low, True), (1, high, False)):
+        ring = clip(ring, axis, limit, keep_above)
+    return ring
+
+
+def _signed_area(ring: List[Tuple[int, int]]) -> int:
+    """Twice the surveyor's-formula area; positive is clockwise with y down"""
+    total = 0
+    for i, (x0, y0) in enumerate(ring):
+        x1, y1 = ring[(i + 1) % len(ring)]
+        total += x0 * y1 - x1 * y0
+    return total
+
+
+# --- Protobuf encoding (only what the vector tile schema needs) ---
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _field(number: int, payload: bytes) -> bytes:
+    """Length-delimited field"""
+    return _varint(number << 3 | 2) + _varint(len(payload)) + payload
+
+
+def _uint_field(number: int, value: int) -> bytes:
+    return _varint(number << 3) + _varint(value)
+
+
+def _packed(number: int, values: List[int]) -> bytes:
+    return _field(number, b''.join(_varint(v) for v in values))
+
+
+def _command(command: int, count: int) -> int:
+    return (command & 0x7) | (count << 3)
+
+
+MOVE_TO, LINE_TO, CLOSE_PATH = 1, 2, 7
+POINT, POLYGON = 1, 3
+
+
+class LayerEncoder:
+    """One vector tile layer: features plus the shared key and value tables"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.features: List[bytes] = []
+        self.keys: Dict[str, int] = {}
+        self.values: Dict[str, int] = {}
+
+    def _tags(self, properties: Dict[str, Any]) -> List[int]:
+        tags = []
+        for key, value in properties.items():
+            if value is None or value == '':
+                continue
+            tags.append(self.keys.setdefault(key, len(self.keys)))
+            tags.append(self.values.setdefault(str(value), len(self.values)))
+        return tags
+
+    def add(self, geometry_type: int, commands: List[int], properties: Dict[str, Any]):
+        feature = _packed(2, self._tags(properties)) + _uint_field(3, geometry_type) + _packed(4, commands)
+        self.features.append(feature)
+
+    def encode(self) -> bytes:
+        body = [_uint_field(15, 2), _field(1, self.name.encode('utf-8'))]
+        body.extend(_field(2, f) for f in self.features)
+        body.extend(_field(3, k.encode('utf-8')) for k in self.keys)
+        body.extend(_field(4, _field(1, v.encode('utf-8'))) for v in self.values)
+        body.append(_uint_field(5, TILE_EXTENT))
+        return _field(3, b''.join(body))
+
+
+def polygon_commands(rings: List[List[Tuple[int, int]]]) -> List[int]:
+    """Geometry commands for rings already oriented (exterior clockwise first)"""
+    commands: List[int] = []
+    cx = cy = 0
+    for ring in rings:
+        x, y = ring[0]
+        commands += [_command(MOVE_TO, 1), _zigzag(x - cx), _zigzag(y - cy)]
+        cx, cy = x, y
+        commands.append(_command(LINE_TO, len(ring) - 1))
+        for x, y in ring[1:]:
+            commands += [_zigzag(x - cx), _zigzag(y - cy)]
+            cx, cy = x, y
+        commands.append(_command(CLOSE_PATH, 1))
+    return commands
+
+
+class TileSource:
+    """Projected boundaries and airports, cut into tiles on request"""
+
+    def __init__(self, boundaries: Optional[Dict[str, Any]], airports: Dict[str, Dict[str, Any]],
+                 min_zooms: Optional[Dict[str, int]] = None):
+        # (properties, bounds, [(polygon bounds, [ring, ...]), ...]) per feature, in world units
+        self.features = []
+        for feature in (boundaries or {}).get('features', []):
+            geometry = feature.get('geometry') or {}
+            if geometry.get('type') == 'Polygon':
+                polygons = [geometry['coordinates']]
+            elif geometry.get('type') == 'MultiPolygon':
+                polygons = geometry['coordinates']
+            else:
+                continue
+            projected = []
+            for polygon in polygons:
+                rings = [[project(lon, lat) for lon, lat, *_ in ring] for ring in polygon if len(ring) >= 4]
+                if rings:
+                    projected.append((_ring_bounds(rings[0]), rings))
+            if not projected:
+                continue
+            bounds = (min(b[0] for b, _ in projected), min(b[1] for b, _ in projected),
+                      max(b[2] for b, _ in projected), max(b[3] for b, _ in projected))
+            properties = feature.get('properties') or {}
+            self.features.append(({key: str(properties.get(key) or '').replace('\x00', '').strip()
+                                   for key in ('iso_a2', 'iso_a3', 'name')}, bounds, projected))
+
+        # Airports sorted by x so a tile's column is one bisect away
+        points = sorted((project(a['lon'], a['lat']), iata, a) for iata, a in airports.items()
+                        if a.get('lat') is not None and a.get('lon') is not None)
+        self.airport_x = [p[0][0] for p in points]
+        self.airport_y = [p[0][1] for p in points]
+        self.airport_properties = [{'iata': iata, 'name': a.get('name'), 'country': a.get('country')}
+                                   for _, iata, a in points]
+        # Zoom from which each airport is drawn (airport_min_zooms); all of them without cluster levels
+        self.airport_min_zoom = [(min_zooms or {}).get(iata, 0) for _, iata, _ in points]
+
+    def _to_tile(self, z: int, x: int, y: int):
+        scale = 2 ** z * TILE_EXTENT
+        ox, oy = x * TILE_EXTENT, y * TILE_EXTENT
+        return lambda p: (p[0] * scale - ox, p[1] * scale - oy)
+
+    def boundary_layer(self, z: int, x: int, y: int) -> LayerEncoder:
+        layer = LayerEncoder('boundaries')
+        bounds = tile_bounds(z, x, y, TILE_BUFFER)
+        to_tile = self._to_tile(z, x, y)
+
+        for properties, feature_bounds, polygons in self.features:
+            if not _overlaps(feature_bounds, bounds):
+                continue
+            rings_out = []
+            for polygon_bounds, rings in polygons:
+                if not _overlaps(polygon_bounds, bounds):
+                    continue
+                for i, ring in enumerate(rings):
+                    clipped = clip_ring([to_tile(p) for p in ring], -TILE_BUFFER, TILE_EXTENT + TILE_BUFFER)
+                    snapped: List[Tuple[int, int]] = []
+                    for px, py in clipped:
+                        point = (int(round(px)), int(round(py)))
+                        if not snapped or snapped[-1] != point:
+                            snapped.append(point)
+                    while len(snapped) > 1 and snapped[-1] == snapped[0]:
+                        snapped.pop()
+                    area = _signed_area(snapped) if len(snapped) >= 3 else 0
+                    if area == 0:
+                        if i == 0:
+                            break  # exterior vanished; so do its holes
+                        continue
+                    # Exterior rings clockwise (positive area), holes counter-clockwise
+                    if (area > 0) != (i == 0):
+                        snapped.reverse()
+                    rings_out.append(snapped)
+            if rings_out:
+                layer.add(POLYGON, polygon_commands(rings_out), properties)
+        return layer
+
+    def airport_layer(self, z: int, x: int, y: int) -> LayerEncoder:
+        layer = LayerEncoder('airports')
+        x0, y0, x1, y1 = tile_bounds(z, x, y)
+        to_tile = self._to_tile(z, x, y)
+        for i in range(bisect_left(self.airport_x, x0), bisect_right(self.airport_x, x1)):
+            px, py = self.airport_x[i], self.airport_y[i]
+            if not (y0 <= py < y1) or px >= x1 or self.airport_min_zoom[i] > z:
+                continue
+            tx, ty = to_tile((px, py))
+            commands = [_command(MOVE_TO, 1), _zigzag(int(tx)), _zigzag(int(ty))]
+            layer.add(POINT, commands, self.airport_properties[i])
+        return layer
+
+    def tile(self, z: int, x: int, y: int) -> bytes:
+        """Encoded vector tile; empty layers are left out"""
+        layers = [self.boundary_layer(z, x, y), self.airport_layer(z, x, y)]
+        return b''.join(layer.encode() for layer in layers if layer.features)
+
+
+def source_key(sources: Dict[str, Optional[str]]) -> str:
+    """Short hash naming the data a set of tiles was cut from"""
+    digest = hashlib.sha256(json.dumps(sources, sort_keys=True).encode('utf-8')).hexdigest()
+    return digest[:12]
+
+
+def tile_path(directory: Path, z: int, x: int, y: int) -> Path:
+    return Path(directory) / str(z) / str(x) / f"{y}.mvt"
+
+
+class TileCache:
+    """Least-recently-used directory of tiles, at most max_tiles files
+
+    Recency is kept in memory, seeded from file modification times so a
+    restarted server keeps the warm tiles. Each directory is named by the
+    source_key() of its data, so tiles cut from old data are never served.
+    """
+
+    def __init__(self, directory: Path, max_tiles: int = MAX_CACHED_TILES):
+        self.directory = Path(directory)
+        self.max_tiles = max_tiles
+        self._lock = threading.Lock()
+        self._order: 'OrderedDict[Tuple[int, int, int], None]' = OrderedDict()
+
+        found = []
+        if self.directory.exists():
+            for path in self.directory.glob('*/*/*.mvt'):
+                try:
+                    key = (int(path.parent.parent.name), int(path.parent.name), int(path.stem))
+                    found.append((path.stat().st_mtime, key))
+                except (OSError, ValueError):
+                    continue
+        for _, key in sorted(found):
+            self._order[key] = None
+
+    def get(self, z: int, x: int, y: int) -> Optional[bytes]:
+        key = (z, x, y)
+        with self._lock:
+            if key not in self._order:
+                return None
+            self._order.move_to_end(key)
+        path = tile_path(self.directory, z, x, y)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # recency survives a restart
+            return data
+        except OSError:
+            with self._lock:
+                self._order.pop(key, None)  # evicted by another worker
+            return None
+
+    def put(self, z: int, x: int, y: int, data: bytes):
+        write_atomic(tile_path(self.directory, z, x, y), data)
+        with self._lock:
+            self._order[(z, x, y)] = None
+            self._order.move_to_end((z, x, y))
+            evicted = []
+            while len(self._order) > self.max_tiles:
+                evicted.append(self._order.popitem(last=False)[0])
+        for key in evicted:
+            tile_path(self.directory, *key).unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+def remove_stale_caches(cache_dir: Path, key: str, max_age: float = STALE_CACHE_SECONDS):
+    """Delete the cache directories of other data versions that nothing used for max_age seconds
+
+    TileCache.get touches every tile it serves and put writes one, so a
+    directory still in use by another process always has a recent file.
+    """
+    if not cache_dir.exists():
+        return
+    cutoff = time.time() - max_age
+    for directory in cache_dir.iterdir():
+        if directory.name == key or not directory.is_dir():
+            continue
+        try:
+            newest = max([directory.stat().st_mtime] + [path.stat().st_mtime for path in directory.rglob('*')])
+        except OSError:
+            continue  # changing under us, so in use
+        if newest < cutoff:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+class TileStore:
+    """Tiles for one version of the data: pregenerated, cached or cut now
+
+    The TileSource is only built (projecting every boundary) on the first
+    tile that is neither pregenerated nor cached.
+    """
+
+    def __init__(self, key: str, build_source, pregenerated_dir: Optional[Path], cache_dir: Path,
+                 max_cached: int = MAX_CACHED_TILES):
+        self.key = key
+        self._build_source = build_source
+        self._source: Optional[TileSource] = None
+        self._source_lock = threading.Lock()
+        self.pregenerated_dir = pregenerated_dir
+        self.cache = TileCache(Path(cache_dir) / key, max_cached)
+
+        # Tiles cut from earlier versions of the data are never served again
+        remove_stale_caches(Path(cache_dir), key)
+
+    @property
+    def source(self) -> TileSource:
+        with self._source_lock:
+            if self._source is None:
+                self._source = self._build_source()
+            return self._source
+
+    def get(self, z: int, x: int, y: int) -> Tuple[bytes, str]:
+        """(tile, 'pregenerated' | 'cache' | 'generated')"""
+        if self.pregenerated_dir is not None and z <= PREGENERATED_MAX_ZOOM:
+            try:
+                return tile_path(self.pregenerated_dir, z, x, y).read_bytes(), 'pregenerated'
+            except OSError:
+                pass
+        data = self.cache.get(z, x, y)
+        if data is not None:
+            return data, 'cache'
+        data = self.source.tile(z, x, y)
+        self.cache.put(z, x, y, data)
+        return data, 'generated'
+
+
+def pregenerated_matches(directory: Path, key: str) -> bool:
+    """Whether scripts/12_export_tiles.py wrote directory from the data named by key"""
+    try:
+        with open(Path(directory) / TILE_METADATA, 'r', encoding='utf-8') as f:
+            return json.load(f).get('source') == key
+    except (OSError, ValueError):
+        return False
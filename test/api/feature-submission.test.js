@@ -1,4 +1,5 @@
 const {
+  API_URL,
   submitFeature,
   getFeatures,
   sleep
@@ -76,7 +77,6 @@ describe('Feature Submission', () => {
       // Note: Our helper function requires title, so we'd need to call API directly
       // This tests the API contract
       const fetch = require('node-fetch');
-      const API_URL = 'https://script.google.com/macros/s/AKfycbxTt6OqQBMj5DeSmQ-yMMUrnAvcuKQJa-pNx7h8KNgAp37PR8GsfaCkQIqOH3vWhWQ-/exec';
 
       const formData = new URLSearchParams();
       formData.append('description', 'Description without title');
@@ -95,7 +95,6 @@ describe('Feature Submission', () => {
     test('should require description', async () => {
       // Test API contract directly
       const fetch = require('node-fetch');
-      const API_URL = 'https://script.google.com/macros/s/AKfycbxTt6OqQBMj5DeSmQ-yMMUrnAvcuKQJa-pNx7h8KNgAp37PR8GsfaCkQIqOH3vWhWQ-/exec';
 
       const formData = new URLSearchParams();
       formData.append('title', 'Title without description');
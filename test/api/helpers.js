@@ -1,7 +1,7 @@
 const fetch = require('node-fetch');
 
 // Atlas Logged Roadmap API URL
-const API_URL = 'https://script.google.com/macros/s/AKfycbxTt6OqQBMj5DeSmQ-yMMUrnAvcuKQJa-pNx7h8KNgAp37PR8GsfaCkQIqOH3vWhWQ-/exec';
+const API_URL = process.env.API_URL || 'https://script.google.com/macros/s/AKfycbxTt6OqQBMj5DeSmQ-yMMUrnAvcuKQJa-pNx7h8KNgAp37PR8GsfaCkQIqOH3vWhWQ-/exec';
 
 /**
  * Generate a unique user identifier for testing
@@ -0,0 +1,16 @@
+"""
+pytest setup for the atlas Python modules
+
+The viewer and pipeline modules import each other as top-level modules
+(serve.py and the numbered scripts run from their own directory), so both
+directories go on sys.path here.
+"""
+
+import sys
+from pathlib import Path
+
+ATLAS_DIR = Path(__file__).resolve().parent.parent.parent / 'atlas'
+
+for directory in (ATLAS_DIR / 'viewer', ATLAS_DIR / 'scripts'):
+    if str(directory) not in sys.path:
+        sys.path.insert(0, str(directory))
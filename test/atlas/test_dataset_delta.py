@@ -0,0 +1,103 @@
+"""Dataset delta patches: apply_patch(old, diff_builds(old, new)) == new"""
+
+import copy
+import json
+
+import pytest
+
+from dataset_delta import apply_patch, diff_builds, diff_objects
+
+
+def build(version, **entities):
+    return {'version': version, 'generated_at': f'2025-11-0{version[-1]}', 'entities': entities}
+
+
+OLD = build('2.0.0',
+            GB={'name': 'United Kingdom', 'people': {'population': {'total': 68000000}},
+                'economy': {'gdp': {'value': None, 'note': 'estimate'}}, 'languages': ['English']},
+            FR={'name': 'France', 'area': 551695},
+            AN={'name': 'Netherlands Antilles'})
+
+NEW = build('2.0.1',
+            GB={'name': 'United Kingdom', 'people': {'population': {'total': 69138192}},
+                'economy': {'gdp': {'value': 3.1e12}}, 'languages': ['English', 'Welsh']},
+            FR={'name': 'France', 'area': 551695.0},
+            XK={'name': 'Kosovo', 'flag': None})
+
+
+def round_trip(old, new):
+    patch = diff_builds(old, new, old['version'], new['version'])
+    # Patches are served as JSON
+    patch = json.loads(json.dumps(patch))
+    assert apply_patch(old, patch) == new
+    return patch
+
+
+def test_patch_turns_old_into_new():
+    patch = round_trip(OLD, NEW)
+    assert patch['from'] == '2.0.0' and patch['to'] == '2.0.1'
+    assert patch['removed'] == ['AN']
+    assert list(patch['added']) == ['XK']
+    assert set(patch['changed']) == {'GB', 'FR'}
+
+
+def test_changes_are_listed_per_path():
+    gb = diff_builds(OLD, NEW, 'a', 'b')['changed']['GB']
+    assert [['people', 'population', 'total'], 69138192] in gb['set']
+    assert [['economy', 'gdp', 'value'], 3.1e12] in gb['set']
+    # Arrays are replaced as a whole
+    assert [['languages'], ['English', 'Welsh']] in gb['set']
+    assert gb['unset'] == [['economy', 'gdp', 'note']]
+
+
+def test_type_changes_are_kept():
+    # 551695 == 551695.0, but the patch must still turn the int into a float
+    patch = round_trip(OLD, NEW)
+    assert patch['changed']['FR'] == {'set': [[['area'], 551695.0]], 'unset': []}
+    assert type(apply_patch(OLD, patch)['entities']['FR']['area']) is float
+    assert diff_objects({'a': 1}, {'a': True}) == {'set': [[['a'], True]], 'unset': []}
+
+
+def test_null_values_are_unambiguous():
+    old = build('2.0.0', GB={'capital': 'London', 'motto': None})
+    new = build('2.0.1', GB={'capital': None})
+    patch = round_trip(old, new)
+    assert patch['changed']['GB'] == {'set': [[['capital'], None]], 'unset': [['motto']]}
+    assert 'motto' not in apply_patch(old, patch)['entities']['GB']
+
+
+def test_identical_builds_give_an_empty_patch():
+    patch = diff_builds(OLD, copy.deepcopy(OLD), '2.0.0', '2.0.0')
+    assert patch['added'] == {} and patch['removed'] == [] and patch['changed'] == {}
+    assert patch['meta'] == {'set': [], 'unset': []}
+
+
+def test_apply_does_not_modify_its_input():
+    old = copy.deepcopy(OLD)
+    patch = diff_builds(old, NEW, '2.0.0', '2.0.1')
+    result = apply_patch(old, patch)
+    assert old == OLD
+    result['entities']['GB']['languages'].append('Scots')
+    result['entities']['XK']['name'] = 'changed'
+    assert patch['added']['XK']['name'] == 'Kosovo'
+    assert NEW['entities']['GB']['languages'] == ['English', 'Welsh']
+
+
+def test_chain_of_patches():
+    builds = [OLD, NEW, build('2.0.2', FR={'name': 'France', 'area': 551695.0, 'capital': 'Paris'})]
+    patches = [diff_builds(a, b, a['version'], b['version']) for a, b in zip(builds, builds[1:])]
+    current = OLD
+    for patch in patches:
+        current = apply_patch(current, patch)
+    assert current == builds[-1]
+
+
+def test_patch_against_the_wrong_build_fails():
+    patch = diff_builds(OLD, NEW, '2.0.0', '2.0.1')
+    with pytest.raises(KeyError):
+        apply_patch(build('1.9.0'), patch)
+
+
+def test_whole_object_cannot_be_replaced():
+    with pytest.raises(ValueError):
+        apply_patch(OLD, {'meta': {'set': [[[], {}]]}})
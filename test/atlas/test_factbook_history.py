@@ -0,0 +1,88 @@
+"""Factbook history: weeks read back as appended, also after an interrupted append"""
+
+import pytest
+
+from factbook_history import FactbookHistory, flatten
+
+
+def extraction(day, **countries):
+    return {'extracted_at': f'2025-{day}', 'version': '1.0',
+            'countries': {code: dict(entry, code=code) for code, entry in countries.items()}}
+
+
+WEEKS = [
+    extraction('01-06',
+               GB={'people': {'population': {'total': 68000000}}, 'area': 243610.5,
+                   'languages': ['English', 'Welsh'], 'landlocked': False, 'climate': 'temperate'},
+               FR={'people': {'population': {'total': 68300000}}, 'climate': 'temperate'}),
+    # A number field gets text, a text field a number; FR leaves, DE arrives
+    extraction('01-13',
+               GB={'people': {'population': {'total': 'N/A'}}, 'area': 243610.5,
+                   'languages': ['English'], 'landlocked': False, 'climate': 7},
+               DE={'people': {'population': {'total': 84400000}}, 'area': 357022}),
+    extraction('01-20',
+               GB={'people': {'population': {'total': 69138192}}, 'area': 243610,
+                   'climate': 'temperate'},
+               FR={'people': {'population': {'total': ['68.4', 'million']}}},
+               DE={'people': {'population': {'total': 84500000}}, 'landlocked': False}),
+]
+
+
+def record(directory, weeks):
+    for week in weeks:
+        FactbookHistory(directory).append(week)
+    return FactbookHistory(directory)
+
+
+def flat(snapshot):
+    return {code: flatten(entry) for code, entry in snapshot.items()}
+
+
+def test_every_week_reads_back_with_its_types(tmp_path):
+    history = record(tmp_path, WEEKS)
+    assert history.weeks == ['2025-W02', '2025-W03', '2025-W04']
+    for w, week in enumerate(WEEKS):
+        assert flat(history.snapshot(w)) == flat(week['countries'])
+
+    gb = history.snapshot('2025-W02')['GB']
+    assert type(gb['people']['population']['total']) is int
+    assert gb['languages'] == ['English', 'Welsh']
+    assert gb['landlocked'] is False
+    assert history.snapshot(1)['GB']['climate'] == 7
+    # area had a float, so it reads back as floats
+    assert type(history.snapshot(2)['GB']['area']) is float
+
+
+def test_series_window(tmp_path):
+    history = record(tmp_path, WEEKS)
+    series = history.series('people.population.total', last=2, codes=['GB', 'FR', 'XX'])
+    assert series['weeks'] == ['2025-W03', '2025-W04']
+    assert series['values'] == {'GB': ['N/A', 69138192], 'FR': [None, ['68.4', 'million']]}
+    assert history.series('landlocked')['values']['DE'] == [None, None, False]
+    with pytest.raises(KeyError):
+        history.series('people.population.growth')
+
+
+def test_interrupted_append_is_cut_off(tmp_path):
+    record(tmp_path, WEEKS[:2])
+    # A crash after the column files were written but before the manifest
+    for name in ('present.col', 'people.population.total.num', 'people.population.total.other.txt',
+                 'people.population.total.other.dict', 'climate.txt', 'climate.dict'):
+        with open(tmp_path / name, 'ab') as f:
+            f.write(b'torn"\n')
+
+    history = FactbookHistory(tmp_path)
+    assert flat(history.snapshot(-1)) == flat(WEEKS[1]['countries'])
+    history = record(tmp_path, WEEKS[2:])
+    for w, week in enumerate(WEEKS):
+        assert flat(history.snapshot(w)) == flat(week['countries'])
+
+
+def test_recorded_and_older_weeks(tmp_path):
+    history = record(tmp_path, WEEKS[1:])
+    assert history.append(WEEKS[1]) is None
+    with pytest.raises(ValueError):
+        history.append(WEEKS[0])
+    with pytest.raises(ValueError):
+        history.append({'countries': {}})
+    assert len(FactbookHistory(tmp_path)) == 2
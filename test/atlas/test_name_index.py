@@ -0,0 +1,60 @@
+"""Country name resolution: each kind of match, and the saved index"""
+
+import json
+
+import pytest
+
+from name_index import NameIndex
+
+NAMES = [
+    ('Taiwan', 'CN-TW', 'natural_earth'),
+    ('The Bahamas', 'BS', 'natural_earth'),
+    ('Bahamas', 'BS', 'fips_mapping'),
+    ('St. Kitts and Nevis', 'KN', 'natural_earth'),
+    ('Åland', 'AX', 'natural_earth'),
+    ('United Kingdom', 'GB', 'natural_earth'),
+    ('Micronesia', 'FM', 'natural_earth'),
+    ('Federated States of Micronesia', 'FM', 'fips_mapping'),
+    # Two countries claim "Congo", so it resolves to neither
+    ('Congo', 'CG', 'natural_earth'),
+    ('Congo', 'CD', 'fips_mapping'),
+    ('Dem. Rep. Congo', 'CD', 'natural_earth'),
+]
+
+CASES = [
+    ('taiwan', 'CN-TW', 'exact'),
+    ('Ã…land', 'AX', 'exact'),
+    ('burma', 'MM', 'alias'),
+    ('saint-kitts-and-nevis', 'KN', 'expanded'),
+    ('bahamas-the', 'BS', 'loose'),
+    ('micronesia-federated-states-of', 'FM', 'loose'),
+    ('democratic-republic-of-congo', 'CD', 'loose'),
+    ('untied kingdom', 'GB', 'trigram'),
+    ('congo', None, None),
+    ('world', None, None),
+    ('atlantis', None, None),
+]
+
+
+@pytest.fixture(scope='module')
+def index():
+    return NameIndex(NAMES)
+
+
+@pytest.mark.parametrize('name, iso, match', CASES)
+def test_resolve(index, name, iso, match):
+    result = index.resolve(name)
+    assert (result and result['iso'], result and result['match']) == (iso, match)
+
+
+def test_trigram_confidence_is_below_the_key_matches(index):
+    assert index.resolve('taiwan')['confidence'] == 1.0
+    assert 0 < index.resolve('untied kingdom')['confidence'] < index.resolve('bahamas-the')['confidence']
+
+
+def test_saved_index_resolves_alike(index):
+    loaded = NameIndex.from_dict(json.loads(json.dumps(index.to_dict())))
+    for name, _, _ in CASES:
+        assert loaded.resolve(name) == index.resolve(name)
+    with pytest.raises(ValueError):
+        NameIndex.from_dict({'name_index_version': 0})
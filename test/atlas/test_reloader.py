@@ -0,0 +1,53 @@
+"""Generation swaps: a rebuilding reloader and a follower of its snapshot"""
+
+import json
+
+from indexes import COUNTRIES_FILE
+from reloader import ResourceReloader
+
+
+def write_countries(base_dir, codes):
+    path = base_dir / COUNTRIES_FILE
+    path.parent.mkdir(exist_ok=True)
+    path.write_text(json.dumps({'entities': {code: {'name': code} for code in codes}}))
+
+
+def test_reload_swaps_only_on_change(tmp_path):
+    write_countries(tmp_path, ['GB'])
+    reloader = ResourceReloader(tmp_path)
+    first = reloader.current
+    assert reloader.reload() is False
+    assert reloader.current is first
+
+    write_countries(tmp_path, ['GB', 'FR'])
+    assert reloader.reload() is True
+    assert reloader.current.number == 2
+    # A request holding the old generation keeps seeing its data
+    assert first['rank'].codes == ['GB']
+    assert reloader.current['rank'].codes == ['FR', 'GB']
+
+
+def test_follower_maps_the_rebuilt_snapshot(tmp_path):
+    write_countries(tmp_path, ['GB'])
+    builder = ResourceReloader(tmp_path)
+    follower = ResourceReloader(tmp_path)
+    assert follower.current.how == 'snapshot'
+    assert follower.reload_snapshot() is False
+
+    write_countries(tmp_path, ['GB', 'FR'])
+    builder.reload()
+    assert follower.reload_snapshot() is True
+    assert follower.current.how == 'snapshot'
+    assert follower.current.fingerprint == builder.current.fingerprint
+    assert follower.current['rank'].codes == ['FR', 'GB']
+    assert follower.reload_snapshot() is False
+
+
+def test_capped_cache_refuses_new_keys_when_full(tmp_path):
+    write_countries(tmp_path, ['GB'])
+    generation = ResourceReloader(tmp_path).current
+    for n in range(2):
+        assert generation.can_cache(('variant', n), max_entries=2)
+        generation.cached(('variant', n), lambda n=n: n, max_entries=2)
+    assert generation.can_cache(('variant', 0), max_entries=2)
+    assert not generation.can_cache(('variant', 2), max_entries=2)
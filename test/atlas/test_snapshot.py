@@ -0,0 +1,110 @@
+"""Index snapshot: round-trip through the memory-mapped file and rejection of stale snapshots"""
+
+import json
+import mmap
+
+import pytest
+
+import snapshot
+from indexes import COUNTRIES_FILE, Column
+
+
+@pytest.fixture
+def indexes():
+    return {'values': Column('d', [1.5, -2.0, 3.25]),
+            'codes': Column('H', [7, 0, 65535]),
+            'names': ['GB', 'FR', 'DE'],
+            'nested': {'search': {'lon': [0, 2]}, 'empty': None}}
+
+
+@pytest.fixture
+def fingerprint():
+    return {'snapshot_version': snapshot.SNAPSHOT_VERSION, 'index_version': 1,
+            'sources': {'resources/countries_v2.json': 'a' * 64, 'resources/airports_iata.json': None}}
+
+
+def test_round_trip(tmp_path, indexes, fingerprint):
+    path = tmp_path / 'index_snapshot.bin'
+    size = snapshot.save_snapshot(path, indexes, fingerprint)
+    assert size == path.stat().st_size
+
+    loaded = snapshot.load_snapshot(path, fingerprint)
+    assert loaded['values'].values.tolist() == [1.5, -2.0, 3.25]
+    assert loaded['codes'].values.tolist() == [7, 0, 65535]
+    assert loaded['names'] == indexes['names']
+    assert loaded['nested'] == indexes['nested']
+
+
+def test_columns_are_views_over_the_mapping(tmp_path, indexes, fingerprint):
+    path = tmp_path / 'index_snapshot.bin'
+    snapshot.save_snapshot(path, indexes, fingerprint)
+    loaded = snapshot.load_snapshot(path, fingerprint)
+    assert isinstance(loaded['values'].values.obj, mmap.mmap)
+    assert loaded['values'].typecode == 'd'
+
+
+def test_replacing_keeps_loaded_snapshot_valid(tmp_path, indexes, fingerprint):
+    path = tmp_path / 'index_snapshot.bin'
+    snapshot.save_snapshot(path, indexes, fingerprint)
+    loaded = snapshot.load_snapshot(path, fingerprint)
+
+    snapshot.save_snapshot(path, {'values': Column('d', [9.0])}, fingerprint)
+    assert loaded['values'].values.tolist() == [1.5, -2.0, 3.25]
+    assert snapshot.load_snapshot(path, fingerprint)['values'].values.tolist() == [9.0]
+
+
+@pytest.mark.parametrize('change', [
+    {'index_version': 2},
+    {'snapshot_version': snapshot.SNAPSHOT_VERSION + 1},
+    {'sources': {'resources/countries_v2.json': 'b' * 64, 'resources/airports_iata.json': None}},
+    {'sources': {'resources/countries_v2.json': 'a' * 64, 'resources/airports_iata.json': 'c' * 64}},
+])
+def test_stale_fingerprint_is_rejected(tmp_path, indexes, fingerprint, change):
+    path = tmp_path / 'index_snapshot.bin'
+    snapshot.save_snapshot(path, indexes, fingerprint)
+    assert snapshot.load_snapshot(path, dict(fingerprint, **change)) is None
+
+
+@pytest.mark.parametrize('damage', [
+    lambda data: b'',
+    lambda data: data[:4],
+    lambda data: b'NOTSNP' + data[6:],
+    lambda data: data[:snapshot.HEADER.size + 10],
+])
+def test_damaged_file_is_rejected(tmp_path, indexes, fingerprint, damage):
+    path = tmp_path / 'index_snapshot.bin'
+    snapshot.save_snapshot(path, indexes, fingerprint)
+    path.write_bytes(damage(path.read_bytes()))
+    assert snapshot.load_snapshot(path, fingerprint) is None
+
+
+def test_missing_file(tmp_path, fingerprint):
+    assert snapshot.load_snapshot(tmp_path / 'missing.bin', fingerprint) is None
+
+
+def test_load_or_build_rebuilds_when_a_source_changes(tmp_path):
+    countries = tmp_path / COUNTRIES_FILE
+    countries.parent.mkdir()
+    countries.write_text(json.dumps({'entities': {'GB': {'name': 'United Kingdom'}}}))
+
+    indexes, how = snapshot.load_or_build(tmp_path)
+    assert how == 'rebuilt'
+    assert (tmp_path / snapshot.SNAPSHOT_FILE).exists()
+    assert snapshot.load_or_build(tmp_path)[1] == 'snapshot'
+
+    countries.write_text(json.dumps({'entities': {'GB': {'name': 'United Kingdom'}, 'FR': {'name': 'France'}}}))
+    indexes, how = snapshot.load_or_build(tmp_path)
+    assert how == 'rebuilt'
+    assert indexes['rank'].codes == ['FR', 'GB']
+    indexes, how = snapshot.load_or_build(tmp_path)
+    assert how == 'snapshot'
+    assert indexes['rank'].rank('population.total')['with_value'] == 0
+    assert indexes['rank'].rank('population.total')['note'].startswith('No data')
+
+
+def test_unreadable_snapshot_is_rebuilt(tmp_path):
+    snapshot_file = tmp_path / snapshot.SNAPSHOT_FILE
+    snapshot_file.parent.mkdir(parents=True)
+    snapshot_file.write_bytes(b'garbage' * 100)
+    assert snapshot.load_or_build(tmp_path)[1] == 'rebuilt'
+    assert snapshot.load_or_build(tmp_path)[1] == 'snapshot'
@@ -0,0 +1,60 @@
+"""Tile cache cleanup and per-zoom airport thinning"""
+
+import os
+import time
+
+from tiles import MAX_ZOOM, TileSource, TileStore, airport_min_zooms, project, tile_path
+
+AIRPORTS = {
+    'LHR': {'iata': 'LHR', 'name': 'Heathrow', 'country': 'GB', 'lat': 51.47, 'lon': -0.45},
+    'LGW': {'iata': 'LGW', 'name': 'Gatwick', 'country': 'GB', 'lat': 51.15, 'lon': -0.18},
+    'CDG': {'iata': 'CDG', 'name': 'Charles de Gaulle', 'country': 'FR', 'lat': 49.01, 'lon': 2.55},
+}
+
+
+def airport_names(tile: bytes):
+    return {iata for iata in AIRPORTS if iata.encode() in tile}
+
+
+def test_min_zooms_come_from_the_first_level_an_airport_represents():
+    levels = [{'airport': ['LHR']}, {'airport': ['LHR', 'CDG']}, {'airport': ['LHR', 'LGW', 'CDG']}]
+    assert airport_min_zooms(levels) == {'LHR': 0, 'CDG': 1, 'LGW': 2}
+
+
+def test_every_airport_is_in_some_tile_at_max_zoom():
+    # Cluster levels go deeper than the tiles: Gatwick joins only at zoom 13
+    levels = [{'airport': ['LHR', 'CDG']}] * 13 + [{'airport': ['LHR', 'LGW', 'CDG']}]
+    min_zooms = airport_min_zooms(levels)
+    assert min_zooms == {'LHR': 0, 'CDG': 0, 'LGW': MAX_ZOOM}
+
+    source = TileSource(None, AIRPORTS, min_zooms)
+    found = set()
+    for airport in AIRPORTS.values():
+        wx, wy = project(airport['lon'], airport['lat'])
+        found |= airport_names(source.tile(MAX_ZOOM, int(wx * 2 ** MAX_ZOOM), int(wy * 2 ** MAX_ZOOM)))
+    assert found == set(AIRPORTS)
+
+
+def test_low_zooms_only_hold_cluster_representatives():
+    source = TileSource(None, AIRPORTS, {'LHR': 0, 'CDG': 1, 'LGW': 2})
+    assert airport_names(source.tile(0, 0, 0)) == {'LHR'}
+    assert airport_names(source.tile(1, 0, 0)) == {'LHR'}
+    assert airport_names(source.tile(1, 1, 0)) == {'CDG'}
+    assert airport_names(source.tile(2, 1, 1) + source.tile(2, 2, 1)) == {'LHR', 'LGW', 'CDG'}
+    # Without cluster levels every zoom holds every airport
+    assert airport_names(TileSource(None, AIRPORTS).tile(0, 0, 0)) == set(AIRPORTS)
+
+
+def test_only_unused_caches_of_other_versions_are_removed(tmp_path):
+    for key in ('old', 'busy'):
+        tile_path(tmp_path / key, 0, 0, 0).parent.mkdir(parents=True)
+        tile_path(tmp_path / key, 0, 0, 0).write_bytes(b'tile')
+    an_hour_ago = time.time() - 3600
+    for path in (tmp_path / 'old').rglob('*'):
+        os.utime(path, (an_hour_ago, an_hour_ago))
+    os.utime(tmp_path / 'old', (an_hour_ago, an_hour_ago))
+
+    TileStore('new', lambda: TileSource(None, AIRPORTS), None, tmp_path)
+    assert not (tmp_path / 'old').exists()
+    # Another process may still be serving this version
+    assert (tmp_path / 'busy').exists()
@@ -0,0 +1,87 @@
+"""Shared-arc topology: grid round-trip and simplified levels"""
+
+import importlib
+import json
+import math
+
+import pytest
+
+from topology import build_topology, delta_decode, topology_to_geojson
+
+build_levels = importlib.import_module('11_export_lod').build_levels
+
+STEPS = 8
+# Cells a fifth of a degree wide, so the coarsest level (0.5°) drops all but the junctions
+SIZE = 0.2
+
+
+def edge(a, b):
+    """Points from a to b (b excluded), wiggled by their absolute position so neighbours agree"""
+    points = []
+    for k in range(STEPS):
+        x = a[0] + (b[0] - a[0]) * k / STEPS
+        y = a[1] + (b[1] - a[1]) * k / STEPS
+        if k and a[1] == b[1]:
+            y += SIZE * 0.05 * math.sin(37 * x + 13 * y)
+        elif k:
+            x += SIZE * 0.05 * math.sin(37 * y + 13 * x)
+        points.append([round(x, 6), round(y, 6)])
+    return points
+
+
+def cell(column, row):
+    x, y = column * SIZE, row * SIZE
+    corners = [(x, y), (x + SIZE, y), (x + SIZE, y + SIZE), (x, y + SIZE), (x, y)]
+    ring = [p for a, b in zip(corners, corners[1:]) for p in edge(a, b)]
+    return ring + [ring[0]]
+
+
+def grid(columns, rows):
+    return {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': {'name': f'{x},{y}'},
+         'geometry': {'type': 'Polygon', 'coordinates': [cell(x, y)]}}
+        for y in range(rows) for x in range(columns)]}
+
+
+def rings(geometry, arcs):
+    """Point set of every ring of a topology geometry"""
+    found = geometry['arcs'] if geometry['type'] == 'Polygon' else [r for p in geometry['arcs'] for r in p]
+    return [{p for i in ring for p in arcs[i if i >= 0 else ~i]} for ring in found]
+
+
+def same_ring(ring, expected, tolerance):
+    """Closed rings with the same points in the same order, from any start, within tolerance"""
+    ring, expected = ring[:-1], expected[:-1]
+    start = min(range(len(ring)), key=lambda i: math.dist(ring[i], expected[0]))
+    ring = ring[start:] + ring[:start]
+    return len(ring) == len(expected) and all(math.dist(a, b) <= tolerance for a, b in zip(ring, expected))
+
+
+def test_grid_round_trip():
+    collection = grid(3, 3)
+    topology = json.loads(json.dumps(build_topology(collection)))
+    # Every interior edge is stored once, not twice
+    assert sum(len(arc) - 1 for arc in topology['arcs']) == (3 * 4 + 3 * 4) * STEPS
+
+    decoded = topology_to_geojson(topology)
+    # Half a grid step in each direction
+    tolerance = math.hypot(*topology['transform']['scale']) / 2
+    for original, feature in zip(collection['features'], decoded['features']):
+        assert feature['properties'] == original['properties']
+        ring, = feature['geometry']['coordinates']
+        expected, = original['geometry']['coordinates']
+        assert ring[0] == ring[-1]
+        assert same_ring(ring, expected, tolerance)
+
+
+@pytest.mark.parametrize('columns', [1, 2, 3])
+def test_no_ring_collapses_at_any_level(columns):
+    document = build_levels(grid(columns, 1), 'countries')
+    geometries = document['objects']['countries']['geometries']
+    points = [level['points'] for level in document['levels']]
+    assert points == sorted(points) and points[0] < points[-1]
+    for level in document['levels']:
+        arcs = [delta_decode(arc) for arc in level['arcs']]
+        for geometry in geometries:
+            # Cells with one neighbour have only two junctions; they must not collapse to a line
+            assert all(len(ring) >= 3 for ring in rings(geometry, arcs))
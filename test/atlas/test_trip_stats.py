@@ -0,0 +1,79 @@
+"""Vectorized trip statistics: distances, stays, bad codes and batch boundaries"""
+
+import math
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from records import AirportTable  # noqa: E402
+from trip_stats import EARTH_RADIUS_KM, AirportIndex, TripStats, read_trip_log  # noqa: E402
+
+AIRPORTS = {
+    code: {'iata': code, 'icao': icao, 'name': code, 'country': country, 'lat': lat, 'lon': lon}
+    for code, icao, country, lat, lon in (
+        ('LHR', 'EGLL', 'GB', 51.4700, -0.4543),
+        ('MAN', 'EGCC', 'GB', 53.3537, -2.2750),
+        ('JFK', 'KJFK', 'US', 40.6413, -73.7781),
+        ('CDG', 'LFPG', 'FR', 49.0097, 2.5479),
+    )
+}
+
+LOG = """trip,from,to,to_lat,to_lon,depart,arrive
+atlantic,LHR,JFK,,,2025-01-01T08:00:00Z,2025-01-01T16:00:00Z
+atlantic,jfk,CDG,,,2025-01-03T16:00:00Z,2025-01-04T05:00:00Z
+domestic,MAN,LHR,,,2025-01-02T10:00:00Z,2025-01-02T11:00:00Z
+domestic,LHR,,49.02,2.55,2025-01-02T13:00:00Z,2025-01-02T14:00:00Z
+bad,LHRX,JFK,,,,
+bad,Zürich,CDG,,,,
+"""
+
+
+def km(a, b):
+    """Haversine distance between two airports, written out independently"""
+    phi1, phi2 = math.radians(AIRPORTS[a]['lat']), math.radians(AIRPORTS[b]['lat'])
+    dphi, dlam = phi2 - phi1, math.radians(AIRPORTS[b]['lon'] - AIRPORTS[a]['lon'])
+    h = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def run(path, batch_legs):
+    labels = {}
+    stats = TripStats(AirportIndex(AirportTable(AIRPORTS)))
+    for batch in read_trip_log(path, labels, batch_legs):
+        stats.add(**batch)
+    return stats.result(list(labels))
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / 'trips.csv'
+    path.write_text(LOG, encoding='utf-8')
+    return path
+
+
+def test_distances_stays_and_longest_leg(log):
+    result = run(log, 1 << 20)
+    summary, trips = result['summary'], result['trips']
+    assert summary['legs'] == 6
+    assert summary['unresolved_legs'] == 2
+    assert trips['trip'] == ['atlantic', 'domestic', 'bad']
+    assert trips['unresolved_legs'] == [0, 0, 2]
+    assert trips['distance_km'][0] == pytest.approx(km('LHR', 'JFK') + km('JFK', 'CDG'), abs=0.1)
+    # The second leg ends at coordinates, which snap to CDG
+    assert trips['longest_leg_to'][1] == 'CDG'
+    assert trips['longest_leg_km'][1] == pytest.approx(km('LHR', 'CDG'), abs=1.0)
+    assert (summary['longest_leg']['from'], summary['longest_leg']['to']) == ('JFK', 'CDG')
+    assert summary['longest_leg']['distance_km'] == pytest.approx(km('JFK', 'CDG'), abs=0.1)
+
+    countries = dict(zip(result['countries']['country'], zip(result['countries']['departures'],
+                                                             result['countries']['domestic_legs'],
+                                                             result['countries']['hours'])))
+    # 48 hours in the US before JFK-CDG, 2 at LHR between the domestic legs
+    assert countries == {'GB': (3, 1, 2.0), 'US': (1, 0, 48.0), 'FR': (0, 0, 0.0)}
+
+
+def test_batch_size_does_not_change_results(log):
+    expected = run(log, 1 << 20)
+    for batch_legs in (1, 2, 3, 5):
+        assert run(log, batch_legs) == expected
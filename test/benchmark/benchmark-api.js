@@ -5,7 +5,7 @@ const fs = require('fs');
 const path = require('path');
 const chalk = require('chalk');
 
-const API_URL = 'https://script.google.com/macros/s/AKfycbxTt6OqQBMj5DeSmQ-yMMUrnAvcuKQJa-pNx7h8KNgAp37PR8GsfaCkQIqOH3vWhWQ-/exec';
+const API_URL = process.env.API_URL || 'https://script.google.com/macros/s/AKfycbxTt6OqQBMj5DeSmQ-yMMUrnAvcuKQJa-pNx7h8KNgAp37PR8GsfaCkQIqOH3vWhWQ-/exec';
 
 // Configuration
 const RUNS = 5; // Number of times to run each test
@@ -167,6 +167,7 @@ function saveResults(results) {
 
   const data = {
     timestamp: new Date().toISOString(),
+    target: API_URL,
     runs: RUNS,
     results
   };
@@ -182,6 +183,7 @@ function saveResults(results) {
  */
 async function runBenchmark() {
   console.log(chalk.bold('\n🚀 Atlas Logged Roadmap API Benchmark\n'));
+  console.log(`Target: ${API_URL}`);
   console.log(`Running ${RUNS} iterations per scenario...\n`);
 
   const results = [];
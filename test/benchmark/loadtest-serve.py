@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+
+"""
+Load test for the atlas data server (atlas/viewer/serve.py)
+
+Replays the globe viewer's startup fetch pattern and a mix of API queries at
+a configurable concurrency, then records throughput and latency percentiles
+to test/results/loadtest-YYYY-MM-DD.json. If a baseline exists
+(test/results/loadtest-BASELINE.json) the run is compared against it and the
+script exits non-zero on a regression.
+
+Usage:
+    python3 test/benchmark/loadtest-serve.py --start-server
+    python3 test/benchmark/loadtest-serve.py --url http://localhost:8888 -c 16 -d 30
+    python3 test/benchmark/loadtest-serve.py --start-server --save-baseline
+"""
+
+import argparse
+import json
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent
+RESULTS_DIR = ROOT_DIR / 'test' / 'results'
+SERVE_PY = ROOT_DIR / 'atlas' / 'viewer' / 'serve.py'
+BASELINE_FILE = RESULTS_DIR / 'loadtest-BASELINE.json'
+
+# Sequential fetches made by atlas/globe.js loadData() on startup
+GLOBE_STARTUP = [
+    '/resources/countries_v2.json',
+    '/resources/countries_50m.geojson',
+    '/resources/airports_iata.json',
+]
+
+SEARCH_TERMS = ['lon', 'paris', 'new york', 'tok', 'united', 'fra', 'syd', 'heathrow',
+                'berlin', 'ca', 'jfk', 'lax', 'madrid', 'int', 'sao']
+
+# (weight, generator) for the API mix
+API_MIX = [
+    (6, lambda rng: f"/api/search?q={urllib.request.quote(rng.choice(SEARCH_TERMS))}"),
+    (3, lambda rng: f"/api/airports/nearby?lat={rng.uniform(-60, 70):.3f}"
+                    f"&lon={rng.uniform(-180, 180):.3f}&radius={rng.choice([50, 200, 500])}"),
+    (1, lambda rng: "/api/version"),
+]
+
+# A run regresses if p95 grows or throughput drops by more than this fraction
+DEFAULT_TOLERANCE = 0.20
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def fetch(base_url: str, path: str, timeout: float) -> int:
+    """GET path and read the whole body; returns bytes received"""
+    with urllib.request.urlopen(base_url + path, timeout=timeout) as response:
+        return len(response.read())
+
+
+class Scenario:
+    """One named workload; each iteration is timed as a whole"""
+
+    def __init__(self, name: str, iteration: Callable[[random.Random], int]):
+        self.name = name
+        self.iteration = iteration
+        self.latencies: List[float] = []
+        self.failed = 0
+        self.bytes = 0
+        self.errors: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def run_once(self, rng: random.Random):
+        start = time.perf_counter()
+        try:
+            received = self.iteration(rng)
+        except (urllib.error.URLError, OSError) as e:
+            error = type(e).__name__ if not isinstance(e, urllib.error.HTTPError) else f"HTTP {e.code}"
+            with self.lock:
+                self.failed += 1
+                self.errors[error] = self.errors.get(error, 0) + 1
+            return
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.latencies.append(elapsed)
+            self.bytes += received
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        values = sorted(self.latencies)
+
+        def ms(v):
+            return None if v is None else round(v * 1000, 2)
+
+        return {
+            'name': self.name,
+            'requests': len(values) + self.failed,
+            'successful': len(values),
+            'failed': self.failed,
+            'throughput_rps': round(len(values) / duration, 1) if duration else None,
+            'bytes': self.bytes,
+            'min': ms(values[0] if values else None),
+            'avg': ms(sum(values) / len(values) if values else None),
+            'p50': ms(percentile(values, 0.50)),
+            'p95': ms(percentile(values, 0.95)),
+            'p99': ms(percentile(values, 0.99)),
+            'max': ms(values[-1] if values else None),
+            'errors': self.errors
+        }
+
+
+def available_startup_paths(base_url: str, timeout: float) -> List[str]:
+    """Startup files the server actually has (some are generated locally)"""
+    paths = []
+    for path in GLOBE_STARTUP:
+        try:
+            fetch(base_url, path, timeout)
+            paths.append(path)
+        except urllib.error.HTTPError as e:
+            print(f"  ⚠️  Skipping {path} (HTTP {e.code} - not generated?)")
+    return paths
+
+
+def run_scenario(scenario: Scenario, concurrency: int, duration: float, seed: int) -> float:
+    """Run scenario from concurrency threads for duration seconds"""
+    deadline = time.perf_counter() + duration
+
+    def user(n: int):
+        rng = random.Random(seed + n)
+        while time.perf_counter() < deadline:
+            scenario.run_once(rng)
+
+    threads = [threading.Thread(target=user, args=(n,)) for n in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def start_server(workers: int) -> Tuple[subprocess.Popen, str]:
+    """Start serve.py headless on a free port and wait until it answers"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+
+    process = subprocess.Popen(
+        [sys.executable, str(SERVE_PY), '--headless', '--port', str(port), '--workers', str(workers)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+
+    for _ in range(200):
+        try:
+            fetch(base_url, '/api/version', 1.0)
+            return process, base_url
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError(f"serve.py exited with {process.returncode}")
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("serve.py did not start within 20s")
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> int:
+    """Print a comparison table; returns the number of regressions"""
+    print(f"\n📊 Comparison with baseline ({baseline['timestamp']})")
+    print('═' * 90)
+    print(f"{'Scenario':<24}{'Metric':<16}{'Baseline':>14}{'Current':>14}{'Change':>12}")
+    print('─' * 90)
+
+    regressions = 0
+    for before in baseline['results']:
+        after = next((r for r in current['results'] if r['name'] == before['name']), None)
+        if after is None:
+            print(f"{before['name']:<24}not run")
+            continue
+
+        for metric, higher_is_worse in (('p95', True), ('p99', True), ('throughput_rps', False)):
+            old, new = before.get(metric), after.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change > tolerance if higher_is_worse else change < -tolerance
+            flag = '  ❌' if worse else ''
+            regressions += worse
+            print(f"{before['name']:<24}{metric:<16}{old:>14}{new:>14}{change * 100:>+11.1f}%{flag}")
+
+    print('═' * 90)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test atlas/viewer/serve.py')
+    parser.add_argument('--url', default='http://localhost:8888', help='Server to test')
+    parser.add_argument('--start-server', action='store_true',
+                        help='Start serve.py on a free port for the duration of the test')
+    parser.add_argument('--workers', type=int, default=1, help='--workers for a started server')
+    parser.add_argument('-c', '--concurrency', type=int, default=8, help='Concurrent virtual users')
+    parser.add_argument('-d', '--duration', type=float, default=10, help='Seconds per scenario')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the API mix')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout (s)')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed fractional change before flagging a regression')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help=f'Store this run as {BASELINE_FILE.name}')
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url.rstrip('/')
+    if args.start_server:
+        server, base_url = start_server(args.workers)
+
+    try:
+        print(f"\n🚀 Atlas Data Server Load Test - {base_url}")
+        print(f"   {args.concurrency} concurrent users, {args.duration:g}s per scenario\n")
+
+        startup_paths = available_startup_paths(base_url, args.timeout)
+        weights = [w for w, _ in API_MIX]
+        generators = [g for _, g in API_MIX]
+
+        def globe_startup(rng):
+            return sum(fetch(base_url, path, args.timeout) for path in startup_paths)
+
+        def api_mix(rng):
+            path = rng.choices(generators, weights)[0](rng)
+            return fetch(base_url, path, args.timeout)
+
+        def api_search(rng):
+            return fetch(base_url, generators[0](rng), args.timeout)
+
+        scenarios = [Scenario('Globe Startup', globe_startup),
+                     Scenario('API Mix', api_mix),
+                     Scenario('API Search', api_search)]
+
+        results = []
+        for scenario in scenarios:
+            print(f"📊 Testing: {scenario.name}")
+            elapsed = run_scenario(scenario, args.concurrency, args.duration, args.seed)
+            results.append(scenario.summary(elapsed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=15)
+
+    print('\n' + 'Load Test Results')
+    print('═' * 96)
+    print(f"{'Scenario':<18}{'Req/s':>10}{'OK':>8}{'Fail':>6}{'p50':>11}{'p95':>11}{'p99':>11}{'Max':>11}")
+    print('─' * 96)
+    for r in results:
+        def col(v):
+            return f"{v}ms" if v is not None else 'N/A'
+        print(f"{r['name']:<18}{r['throughput_rps'] or 0:>10}{r['successful']:>8}{r['failed']:>6}"
+              f"{col(r['p50']):>11}{col(r['p95']):>11}{col(r['p99']):>11}{col(r['max']):>11}")
+    print('═' * 96)
+
+    data = {
+        'timestamp': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+        'target': base_url if not args.start_server else f"serve.py --workers {args.workers}",
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'startup_paths': startup_paths,
+        'results': results
+    }
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output_file = RESULTS_DIR / f"loadtest-{datetime.now().strftime('%Y-%m-%d')}.json"
+    output_file.write_text(json.dumps(data, indent=2) + '\n')
+    print(f"✓ Results saved to {output_file.name}")
+
+    if args.save_baseline:
+        BASELINE_FILE.write_text(json.dumps(data, indent=2) + '\n')
+        print(f"✓ Baseline saved to {BASELINE_FILE.name}")
+        return 0
+
+    if BASELINE_FILE.exists():
+        baseline = json.loads(BASELINE_FILE.read_text())
+        regressions = compare(baseline, data, args.tolerance)
+        if regressions:
+            print(f"❌ {regressions} performance regression(s) detected!")
+            return 1
+        print("✓ No regressions detected")
+    else:
+        print(f"ℹ️  No baseline yet - run with --save-baseline to create {BASELINE_FILE.name}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
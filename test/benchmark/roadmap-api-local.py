@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+
+"""
+Local stand-in for the Atlas Logged Roadmap API (apps-script/Code.js)
+
+Serves the same contract as the deployed Apps Script web app - doGet with
+action=vote/unvote/delete or the feature list, doPost for submissions - from
+an in-memory Features sheet seeded with the setupSheet() features, and a
+CacheService emulation with the same keys and TTLs (feature_list 300s,
+feature_row_<id> 1h, vote_<hash>_<id> 24h, submit_<hash> 1h). getFeatureRow
+and updateCachedFeatureList are ported line by line, quirks included: rows
+cached before a delete keep pointing at their old position.
+
+Requests are handled one at a time, so a run against the stand-in is
+deterministic. Every SpreadsheetApp and CacheService call is counted and can
+be given a fixed latency, which makes caching strategies comparable offline:
+
+    --sheet-latency 40 --cache-latency 5   # roughly what the live API pays
+    --no-row-cache                          # getFeatureRow always scans IDs
+    --invalidate-list                       # votes drop feature_list instead of updating it
+
+Outside the Apps Script contract:
+    GET  /__stats                 call and cache counters
+    POST /__reset                 reseed the sheet, clear cache and counters
+    POST /__advance?seconds=300   move the cache clock forward (expire entries)
+
+Usage:
+    python3 test/benchmark/roadmap-api-local.py --port 8787
+    API_URL=http://127.0.0.1:8787/exec npm test
+    API_URL=http://127.0.0.1:8787/exec npm run benchmark
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent
+CODE_JS = ROOT_DIR / 'apps-script' / 'Code.js'
+
+HEADERS = ['ID', 'Title', 'Description', 'Votes', 'Status', 'Submitted', 'Email']
+BACKUP_HEADERS = {
+    'Backup_Submissions': ['Timestamp', 'Feature ID', 'Title', 'Description', 'Status', 'Email'],
+    'Backup_Votes': ['Timestamp', 'Action', 'Feature ID', 'Feature Title', 'New Vote Count', 'Status'],
+    'Backup_Deletes': ['Timestamp', 'Feature ID', 'Title', 'Description', 'Final Votes', 'Status',
+                       'Original Submission', 'Email'],
+}
+MAX_TITLE_LENGTH = 100
+MAX_DESCRIPTION_LENGTH = 500
+VOTE_COOLDOWN_HOURS = 24
+SUBMIT_COOLDOWN_HOURS = 1
+
+# CacheService limits: 6 hours per entry, 100KB per value
+CACHE_MAX_TTL = 21600
+CACHE_MAX_VALUE = 100 * 1024
+
+# One row of the features array in setupSheet()
+SEED_ROW = re.compile(r"\[(\d+), '((?:[^'\\]|\\.)*)', '((?:[^'\\]|\\.)*)', (\d+), '([^']*)', "
+                      r"new Date\('([\d-]+)'\), '([^']*)'\]")
+
+
+def seed_features() -> List[list]:
+    """Feature rows of setupSheet() in Code.js, so the stand-in starts where a fresh deployment does"""
+    source = CODE_JS.read_text(encoding='utf-8')
+    rows = []
+    for match in SEED_ROW.finditer(source):
+        id_, title, description, votes, status, submitted, email = match.groups()
+        rows.append([int(id_), title.replace("\\'", "'"), description.replace("\\'", "'"), int(votes),
+                     status, datetime.strptime(submitted, '%Y-%m-%d').replace(tzinfo=timezone.utc), email])
+    if not rows:
+        raise RuntimeError(f"No setupSheet() features found in {CODE_JS}")
+    return rows
+
+
+def js_date(value: datetime) -> str:
+    """A Date as JSON.stringify writes it"""
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.') + f"{value.microsecond // 1000:03d}Z"
+
+
+def stringify(value: Any) -> str:
+    """JSON.stringify: compact, non-ASCII kept, Dates as ISO strings"""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False,
+                      default=lambda v: js_date(v) if isinstance(v, datetime) else str(v))
+
+
+def parse_int(text: Any) -> Optional[int]:
+    """parseInt(text): the leading integer, None for NaN"""
+    match = re.match(r'\s*([+-]?\d+)', '' if text is None else str(text))
+    return int(match.group(1)) if match else None
+
+
+def utf16_units(text: str) -> List[int]:
+    """Code units as seen by String.length and charCodeAt"""
+    data = text.encode('utf-16-le')
+    return [int.from_bytes(data[i:i + 2], 'little') for i in range(0, len(data), 2)]
+
+
+def _int32(value: int) -> int:
+    value &= 0xFFFFFFFF
+    return value - 0x100000000 if value & 0x80000000 else value
+
+
+def user_hash(params: Dict[str, str]) -> str:
+    """getUserHash() with JavaScript's 32-bit shift semantics"""
+    text = (params.get('userAgent') or 'unknown') + (params.get('ipAddress') or 'unknown')
+    h = 2166136261
+    for unit in utf16_units(text):
+        # ^ and << truncate to int32; the += is a plain (double) addition
+        h = _int32(h) ^ unit
+        h += sum(_int32(h << shift) for shift in (1, 4, 7, 8, 24))
+    h &= 0xFFFFFFFF
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    out = ''
+    while True:
+        h, digit = divmod(h, 36)
+        out = digits[digit] + out
+        if not h:
+            return out
+
+
+class Counters:
+    """Service calls made while handling requests"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.sheet_calls = 0
+        self.cells_read = 0
+        self.cells_written = 0
+        self.cache_gets = 0
+        self.cache_hits = 0
+        self.cache_puts = 0
+        self.cache_removes = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+class Sheet:
+    """In-memory sheet with the 1-based row/column addressing of SpreadsheetApp"""
+
+    def __init__(self, headers: List[str], counters: Counters, latency: float = 0.0):
+        self.rows: List[list] = [list(headers)]
+        self.width = len(headers)
+        self.counters = counters
+        self.latency = latency
+
+    def _call(self):
+        self.counters.sheet_calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_last_row(self) -> int:
+        self._call()
+        return len(self.rows)
+
+    def get_values(self, row: int, column: int, num_rows: int, num_columns: int) -> List[list]:
+        """getRange(...).getValues(); cells past the data read as ''"""
+        self._call()
+        self.counters.cells_read += num_rows * num_columns
+        values = []
+        for r in range(row - 1, row - 1 + num_rows):
+            source = self.rows[r] if r < len(self.rows) else []
+            values.append([source[c] if c < len(source) else ''
+                           for c in range(column - 1, column - 1 + num_columns)])
+        return values
+
+    def get_data_values(self) -> List[list]:
+        """getDataRange().getValues()"""
+        return self.get_values(1, 1, len(self.rows), self.width)
+
+    def set_value(self, row: int, column: int, value: Any):
+        self._call()
+        self.counters.cells_written += 1
+        while len(self.rows) < row:
+            self.rows.append([''] * self.width)
+        self.rows[row - 1][column - 1] = value
+
+    def append_row(self, values: list):
+        self._call()
+        self.counters.cells_written += len(values)
+        self.rows.append(list(values))
+
+    def delete_row(self, row: int):
+        self._call()
+        del self.rows[row - 1]
+
+
+class ScriptCache:
+    """CacheService.getScriptCache(): string values with a TTL in seconds"""
+
+    def __init__(self, counters: Counters, latency: float = 0.0, clock: Callable[[], float] = time.monotonic):
+        self.entries: Dict[str, tuple] = {}
+        self.counters = counters
+        self.latency = latency
+        self.clock = clock
+        self.offset = 0.0
+
+    def now(self) -> float:
+        return self.clock() + self.offset
+
+    def _call(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def live_entries(self) -> int:
+        now = self.now()
+        return sum(expires > now for _, expires in self.entries.values())
+
+    def get(self, key: str) -> Optional[str]:
+        self._call()
+        self.counters.cache_gets += 1
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires <= self.now():
+            del self.entries[key]
+            return None
+        self.counters.cache_hits += 1
+        return value
+
+    def put(self, key: str, value: str, ttl: int = 600):
+        self._call()
+        if len(value.encode('utf-8')) > CACHE_MAX_VALUE:
+            raise ValueError(f"Argument too large: {key}")
+        self.counters.cache_puts += 1
+        self.entries[key] = (value, self.now() + min(ttl, CACHE_MAX_TTL))
+
+    def remove(self, key: str):
+        self._call()
+        self.counters.cache_removes += 1
+        self.entries.pop(key, None)
+
+
+class RoadmapApi:
+    """Code.js ported to Python; each handler returns the response text"""
+
+    def __init__(self, sheet_latency: float = 0.0, cache_latency: float = 0.0,
+                 row_cache: bool = True, update_list: bool = True):
+        self.sheet_latency = sheet_latency
+        self.cache_latency = cache_latency
+        self.row_cache = row_cache
+        self.update_list = update_list
+        self.counters = Counters()
+        self.cache = ScriptCache(self.counters, cache_latency)
+        self.reset()
+
+    def reset(self):
+        """Fresh sheet as left by setupSheet(), empty cache and counters"""
+        self.sheet = Sheet(HEADERS, self.counters, self.sheet_latency)
+        self.sheet.rows.extend(seed_features())
+        self.backups = {}
+        self.cache.entries.clear()
+        self.cache.offset = 0.0
+        self.counters.reset()
+
+    @staticmethod
+    def create_response(success: bool, message: str, data: Any = None) -> str:
+        response = {'success': success, 'message': message}
+        if data is not None:
+            response['data'] = data
+        return stringify(response)
+
+    def do_post(self, params: Dict[str, str]) -> str:
+        try:
+            title, description = params.get('title'), params.get('description')
+            if not title or not description:
+                return self.create_response(False, 'Title and description are required')
+            if len(utf16_units(title)) > MAX_TITLE_LENGTH:
+                return self.create_response(False, f'Title must be less than {MAX_TITLE_LENGTH} characters')
+            if len(utf16_units(description)) > MAX_DESCRIPTION_LENGTH:
+                return self.create_response(
+                    False, f'Description must be less than {MAX_DESCRIPTION_LENGTH} characters')
+
+            submit_key = 'submit_' + user_hash(params)
+            if self.cache.get(submit_key):
+                return self.create_response(False, 'Please wait before submitting another feature')
+
+            new_id = self.sheet.get_last_row()
+            email = params.get('email') or 'Anonymous'
+            self.sheet.append_row([new_id, title, description, 0, 'Under Review',
+                                   datetime.now(timezone.utc), email])
+            self.cache.put(submit_key, 'true', SUBMIT_COOLDOWN_HOURS * 3600)
+            self.cache.remove('feature_list')
+
+            self.write_to_backup('SUBMIT', {'id': new_id, 'title': title, 'description': description,
+                                            'status': 'Under Review', 'email': email})
+            return self.create_response(True, 'Feature submitted successfully!', {'id': new_id})
+        except Exception:
+            return self.create_response(False, 'An error occurred. Please try again.')
+
+    def do_get(self, params: Dict[str, str]) -> str:
+        try:
+            action = params.get('action')
+            if action == 'vote':
+                return self.handle_vote(params)
+            if action == 'unvote':
+                return self.handle_unvote(params)
+            if action == 'delete':
+                return self.handle_delete(params)
+
+            cached = self.cache.get('feature_list')
+            if cached:
+                return cached
+
+            last_row = self.sheet.get_last_row()
+            if last_row <= 1:
+                return self.create_response(True, 'No features yet', [])
+            rows = self.sheet.get_values(2, 1, last_row - 1, 7)
+            features = [{'id': row[0], 'title': row[1], 'description': row[2], 'votes': row[3] or 0,
+                         'status': row[4], 'submitted': row[5], 'email': row[6]}
+                        for row in rows if row[4] != 'Declined']
+            features.sort(key=lambda f: -f['votes'])
+
+            response = self.create_response(True, 'Features retrieved', features)
+            self.cache.put('feature_list', response, 300)
+            return response
+        except Exception:
+            return self.create_response(False, 'An error occurred')
+
+    def _change_vote(self, params: Dict[str, str], action: str) -> str:
+        """handleVote / handleUnvote"""
+        feature_id = parse_int(params.get('id'))
+        if not feature_id:
+            return self.create_response(False, 'Invalid feature ID')
+
+        vote_key = f"vote_{user_hash(params)}_{feature_id}"
+        voted = self.cache.get(vote_key)
+        if action == 'VOTE' and voted:
+            return self.create_response(False, 'You already voted for this feature')
+        if action == 'UNVOTE' and not voted:
+            return self.create_response(False, 'You have not voted for this feature')
+
+        row_index = self.get_feature_row(feature_id)
+        if row_index == -1:
+            return self.create_response(False, 'Feature not found')
+
+        feature_row = self.sheet.get_values(row_index, 1, 1, 7)[0]
+        current_votes = self.sheet.get_values(row_index, 4, 1, 1)[0][0] or 0
+        new_votes = current_votes + 1 if action == 'VOTE' else max(0, current_votes - 1)
+        self.sheet.set_value(row_index, 4, new_votes)
+
+        if action == 'VOTE':
+            self.cache.put(vote_key, 'true', VOTE_COOLDOWN_HOURS * 3600)
+        else:
+            self.cache.remove(vote_key)
+
+        self.write_to_backup(action, {'id': feature_id, 'title': feature_row[1], 'votes': new_votes,
+                                      'status': feature_row[4]})
+        if not self.update_cached_feature_list(feature_id, new_votes):
+            self.cache.remove('feature_list')
+
+        message = 'Vote recorded!' if action == 'VOTE' else 'Vote removed!'
+        return self.create_response(True, message, {'featureId': feature_id, 'newVotes': new_votes})
+
+    def handle_vote(self, params: Dict[str, str]) -> str:
+        try:
+            return self._change_vote(params, 'VOTE')
+        except Exception:
+            return self.create_response(False, 'Voting error')
+
+    def handle_unvote(self, params: Dict[str, str]) -> str:
+        try:
+            return self._change_vote(params, 'UNVOTE')
+        except Exception:
+            return self.create_response(False, 'Unvoting error')
+
+    def handle_delete(self, params: Dict[str, str]) -> str:
+        try:
+            feature_id = parse_int(params.get('id'))
+            if not feature_id:
+                return self.create_response(False, 'Invalid feature ID')
+
+            data = self.sheet.get_data_values()
+            for i in range(1, len(data)):
+                if data[i][0] == feature_id:
+                    title = data[i][1]
+                    # Only test features may be deleted
+                    if not isinstance(title, str) or 'E2E Test Feature' not in title:
+                        return self.create_response(False, 'Delete operation only allowed for test features')
+
+                    self.write_to_backup('DELETE', {'id': feature_id, 'title': title, 'description': data[i][2],
+                                                    'votes': data[i][3], 'status': data[i][4],
+                                                    'submitted': data[i][5], 'email': data[i][6]})
+                    self.sheet.delete_row(i + 1)
+                    self.cache.remove('feature_list')
+                    return self.create_response(True, 'Feature deleted successfully', {'featureId': feature_id})
+            return self.create_response(False, 'Feature not found')
+        except Exception:
+            return self.create_response(False, 'Delete error')
+
+    def get_feature_row(self, feature_id: int) -> int:
+        """Sheet row of a feature ID, cached for an hour; -1 if not found"""
+        cache_key = f"feature_row_{feature_id}"
+        if self.row_cache:
+            cached_row = self.cache.get(cache_key)
+            if cached_row is not None:
+                return parse_int(cached_row)
+
+        last_row = self.sheet.get_last_row()
+        if last_row <= 1:
+            return -1
+        ids = self.sheet.get_values(2, 1, last_row - 1, 1)
+        for i, (value,) in enumerate(ids):
+            if value == feature_id:
+                if self.row_cache:
+                    self.cache.put(cache_key, str(i + 2), 3600)
+                return i + 2
+        return -1
+
+    def update_cached_feature_list(self, feature_id: int, new_votes: int) -> bool:
+        """Patch the vote count in the cached feature_list and re-sort; False if there is none"""
+        if not self.update_list:
+            return False
+        cached = self.cache.get('feature_list')
+        if not cached:
+            return False
+        try:
+            parsed = json.loads(cached)
+            features = parsed['data']
+            for feature in features:
+                if feature['id'] == feature_id:
+                    feature['votes'] = new_votes
+                    break
+            features.sort(key=lambda f: -f['votes'])
+            self.cache.put('feature_list', stringify(parsed), 300)
+            return True
+        except Exception:
+            return False
+
+    def write_to_backup(self, action: str, feature: Dict[str, Any]):
+        """Append-only backup rows; a new backup sheet is created with its headers"""
+        now = datetime.now(timezone.utc)
+        if action == 'SUBMIT':
+            name = 'Backup_Submissions'
+            row = [now, feature.get('id') or '', feature.get('title') or '', feature.get('description') or '',
+                   feature.get('status') or '', feature.get('email') or '']
+        elif action in ('VOTE', 'UNVOTE'):
+            name = 'Backup_Votes'
+            row = [now, action, feature.get('id') or '', feature.get('title') or '',
+                   feature.get('votes') or 0, feature.get('status') or '']
+        else:
+            name = 'Backup_Deletes'
+            row = [now, feature.get('id') or '', feature.get('title') or '', feature.get('description') or '',
+                   feature.get('votes') or 0, feature.get('status') or '', feature.get('submitted') or '',
+                   feature.get('email') or '']
+        if name not in self.backups:
+            self.backups[name] = Sheet(BACKUP_HEADERS[name], self.counters, self.sheet_latency)
+        self.backups[name].append_row(row)
+
+
+def make_handler(api: RoadmapApi, lock: threading.Lock, verbose: bool):
+
+    class Handler(BaseHTTPRequestHandler):
+        def _params(self, body: bytes = b'') -> Dict[str, str]:
+            """e.parameter: query string and form body, first value of each name"""
+            params: Dict[str, str] = {}
+            query = urllib.parse.urlsplit(self.path).query
+            for text in (query, body.decode('utf-8', errors='replace')):
+                for name, value in urllib.parse.parse_qsl(text, keep_blank_values=True):
+                    params.setdefault(name, value)
+            return params
+
+        def _send(self, text: str, status: int = 200):
+            body = text.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _control(self, method: str, path: str) -> Optional[str]:
+            """Response of a /__ control path; None for the API itself"""
+            if method == 'GET' and path == '/__stats':
+                return stringify({**api.counters.to_dict(), 'cache_entries': api.cache.live_entries(),
+                                  'features': len(api.sheet.rows) - 1})
+            if method == 'POST' and path == '/__reset':
+                api.reset()
+                return stringify({'success': True})
+            if method == 'POST' and path == '/__advance':
+                seconds = float(self._params().get('seconds', 0))
+                api.cache.offset += seconds
+                return stringify({'success': True, 'advanced': seconds})
+            return None
+
+        def do_GET(self):
+            path = urllib.parse.urlsplit(self.path).path
+            with lock:
+                text = self._control('GET', path)
+                if text is None:
+                    api.counters.requests += 1
+                    text = api.do_get(self._params())
+            self._send(text)
+
+        def do_POST(self):
+            path = urllib.parse.urlsplit(self.path).path
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            with lock:
+                text = self._control('POST', path)
+                if text is None:
+                    api.counters.requests += 1
+                    text = api.do_post(self._params(body))
+            self._send(text)
+
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the Roadmap Apps Script API')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=8787, help='Port to listen on')
+    parser.add_argument('--sheet-latency', type=float, default=0, metavar='MS',
+                        help='Delay added to every SpreadsheetApp call')
+    parser.add_argument('--cache-latency', type=float, default=0, metavar='MS',
+                        help='Delay added to every CacheService call')
+    parser.add_argument('--no-row-cache', action='store_true',
+                        help='getFeatureRow scans the ID column on every vote')
+    parser.add_argument('--invalidate-list', action='store_true',
+                        help='Votes remove feature_list instead of updating it')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    try:
+        api = RoadmapApi(sheet_latency=args.sheet_latency / 1000, cache_latency=args.cache_latency / 1000,
+                         row_cache=not args.no_row_cache, update_list=not args.invalidate_list)
+    except (OSError, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(api, threading.Lock(), args.verbose))
+    print(f"\n🚀 Roadmap API stand-in - http://{args.host}:{server.server_port}/exec")
+    print(f"   {len(api.sheet.rows) - 1} features, sheet latency {args.sheet_latency:g}ms, "
+          f"cache latency {args.cache_latency:g}ms")
+    print(f"   row cache {'off' if args.no_row_cache else 'on'}, "
+          f"feature_list {'invalidated' if args.invalidate_list else 'updated'} on vote")
+    print(f"   API_URL=http://{args.host}:{server.server_port}/exec npm test\n")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n📊 " + ', '.join(f"{k} {v}" for k, v in api.counters.to_dict().items()))
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+
+"""
+Content-hash fingerprinting for the static site
+
+Copies the site to dist/ and gives every static asset a second name that
+includes a hash of its content (css/style.css -> css/style.3f2a9c1e07b4.css).
+References in the HTML pages, stylesheets and scripts are rewritten to the
+fingerprinted names, so a changed asset always has a new URL and unchanged
+ones can be cached forever (Cache-Control: immutable).
+
+Assets are processed leaves first: images and atlas resources, then
+stylesheets (which may reference images), then scripts (which may fetch
+resources). A file's hash is taken after its own references were rewritten,
+so a change to an image also changes the name of the stylesheet using it.
+The original names are kept as well, for links from outside the site.
+
+References are resolved relative to the file containing them and only
+rewritten if they point at a fingerprinted asset; absolute URLs are left
+alone. dist/asset-manifest.json maps original to fingerprinted paths.
+
+Usage:
+    python3 tools/fingerprint-assets.py
+    python3 tools/fingerprint-assets.py --output /tmp/site
+"""
+
+import argparse
+import hashlib
+import json
+import posixpath
+import re
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# Assets that get fingerprinted, as globs relative to the site root
+ASSET_PATTERNS = [
+    'assets/*',
+    'css/*.css',
+    'js/*.js',
+    'atlas/resources/*',
+    'atlas/*.js',
+    'atlas/viewer/*.js',
+]
+
+# Pages whose references are rewritten (their own URLs must stay stable)
+PAGES = [
+    'index.html',
+    'welcome.html',
+    'changelog.html',
+    'atlas/index.html',
+    'atlas/viewer/globe.html',
+    'atlas/viewer/index.html',
+]
+
+# Not part of the deployed site
+EXCLUDE = {'.git', '.github', 'node_modules', 'dist', 'test', 'apps-script', '__pycache__',
+           'data', 'package.json', 'package-lock.json', 'jest.config.js', 'playwright.config.js',
+           'playwright.slow.config.js', 'requests.jsonl', 'deploy.sh'}
+
+# Hex digits of the SHA-256 in fingerprinted names (matches serve.py)
+HASH_LENGTH = 12
+
+# Already content-addressed (e.g. resources/shards/GB.a1494541f680.json)
+FINGERPRINTED = re.compile(r'\.[0-9a-f]{%d}\.[A-Za-z0-9]+$' % HASH_LENGTH)
+
+# Quoted strings and url(...) values that look like relative file paths
+REFERENCE = re.compile(r'''(?P<open>["'(])(?P<ref>[^"'()\s<>]+?\.[A-Za-z0-9]{2,8})(?P<suffix>[?#][^"'()\s]*)?(?=["')])''')
+
+TEXT_SUFFIXES = {'.html', '.css', '.js'}
+
+
+def fingerprinted_name(path: str, data: bytes) -> str:
+    """style.css -> style.<hash>.css"""
+    stem, dot, ext = posixpath.basename(path).rpartition('.')
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    return posixpath.join(posixpath.dirname(path), f"{stem}.{digest}.{ext}")
+
+
+def resolve(reference: str, from_file: str) -> str:
+    """Site-relative path a reference in from_file points at ('' for external URLs)"""
+    if '://' in reference or reference.startswith(('//', 'data:', 'mailto:')):
+        return ''
+    if reference.startswith('/'):
+        return posixpath.normpath(reference.lstrip('/'))
+    return posixpath.normpath(posixpath.join(posixpath.dirname(from_file), reference))
+
+
+def rewrite_references(text: str, from_file: str, mapping: Dict[str, str]) -> str:
+    """Point references to fingerprinted assets at their new names"""
+    def replace(match):
+        ref = match.group('ref')
+        target = mapping.get(resolve(ref, from_file))
+        if target is None:
+            return match.group(0)
+        new_ref = posixpath.join(posixpath.dirname(ref), posixpath.basename(target))
+        return match.group('open') + new_ref + (match.group('suffix') or '')
+
+    return REFERENCE.sub(replace, text)
+
+
+def asset_order(path: str) -> int:
+    """Leaves first, then stylesheets, then scripts"""
+    return {'.css': 1, '.js': 2}.get(posixpath.splitext(path)[1], 0)
+
+
+def collect_assets(root: Path) -> List[str]:
+    assets = set()
+    for pattern in ASSET_PATTERNS:
+        for path in root.glob(pattern):
+            relative = path.relative_to(root).as_posix()
+            if path.is_file() and not FINGERPRINTED.search(relative) and not path.name.startswith('.'):
+                assets.add(relative)
+    return sorted(assets, key=lambda p: (asset_order(p), p))
+
+
+def copy_site(root: Path, output: Path):
+    def ignore(directory, names):
+        return [n for n in names if n in EXCLUDE or n.endswith(('.pyc', '.log'))]
+
+    if output.exists():
+        shutil.rmtree(output)
+    shutil.copytree(root, output, ignore=ignore)
+
+
+def build(root: Path, output: Path) -> Dict[str, str]:
+    """Copy root to output with fingerprinted assets; returns the path mapping"""
+    copy_site(root, output)
+
+    mapping: Dict[str, str] = {}
+    for asset in collect_assets(output):
+        path = output / asset
+        data = path.read_bytes()
+        if path.suffix in TEXT_SUFFIXES:
+            data = rewrite_references(data.decode('utf-8'), asset, mapping).encode('utf-8')
+            path.write_bytes(data)  # the original name gets the rewritten content too
+        target = fingerprinted_name(asset, data)
+        (output / target).write_bytes(data)
+        mapping[asset] = target
+
+    for page in PAGES:
+        path = output / page
+        if path.exists():
+            path.write_text(rewrite_references(path.read_text(encoding='utf-8'), page, mapping),
+                            encoding='utf-8')
+
+    (output / 'asset-manifest.json').write_text(json.dumps(mapping, indent=2) + '\n', encoding='utf-8')
+    return mapping
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Copy the site to dist/ with content-hashed asset names')
+    parser.add_argument('--output', type=Path, default=ROOT_DIR / 'dist', help='Output directory')
+    args = parser.parse_args()
+
+    output = args.output.resolve()
+    if output == ROOT_DIR or ROOT_DIR.is_relative_to(output):
+        print(f"❌ Refusing to replace {output}")
+        return 1
+
+    mapping = build(ROOT_DIR, output)
+
+    print(f"✅ Fingerprinted {len(mapping)} assets into {output}")
+    for original, target in sorted(mapping.items()):
+        if asset_order(original) or original.startswith('assets/'):
+            print(f"   {original} -> {posixpath.basename(target)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())